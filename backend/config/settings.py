@@ -46,6 +46,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 DATABASES = {
     "default": {
@@ -76,6 +77,26 @@ USE_TZ = True
 STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+RULES_ROOT = BASE_DIR.parent / "rules"
+RULE_PACK_CACHE_SIZE = int(os.getenv("RULE_PACK_CACHE_SIZE", "32"))
+# Load and compile every pack under RULES_ROOT in CoreConfig.ready (gunicorn.conf.py turns it on); a broken pack
+# then stops the boot instead of failing the first request that uses it.
+RULE_PACK_PRELOAD = os.getenv("RULE_PACK_PRELOAD", "0") == "1"
+RULE_EVALUATION_WORKERS = int(os.getenv("RULE_EVALUATION_WORKERS", "4"))
+# BACKEND: "inprocess" (per-worker LRU), "django" (CACHES[ALIAS], shared between workers) or "none".
+RULE_RESULT_CACHE = {
+    "BACKEND": os.getenv("RULE_RESULT_CACHE_BACKEND", "inprocess"),
+    "ALIAS": "default",
+    "MAXSIZE": int(os.getenv("RULE_RESULT_CACHE_SIZE", "4096")),
+    "TTL": int(os.getenv("RULE_RESULT_CACHE_TTL", "300")),
+}
+# Per-rule timings and predicate counters exposed at /api/metrics/ (adds overhead to every evaluation).
+RULE_ENGINE_PROFILING = os.getenv("RULE_ENGINE_PROFILING", "0") == "1"
+# DocumentVersion keeps a full payload every N versions (bounds delta chains); reconstructed payloads are cached
+# per document for the most recently used documents.
+HISTORY_SNAPSHOT_INTERVAL = int(os.getenv("HISTORY_SNAPSHOT_INTERVAL", "32"))
+HISTORY_CACHE_DOCUMENTS = int(os.getenv("HISTORY_CACHE_DOCUMENTS", "256"))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
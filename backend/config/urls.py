@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from core.views import ProcedureViewSet, RuleEvaluationView
+from core.async_views import AsyncRuleEvaluationView
+from core.views import CoverageView, ProcedureViewSet, RuleEngineMetricsView, RuleEvaluationBatchView, RuleEvaluationView
 
 router = DefaultRouter()
 router.register("procedures", ProcedureViewSet, basename="procedure")
@@ -11,4 +12,8 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include(router.urls)),
     path("api/rules/evaluate/", RuleEvaluationView.as_view(), name="rules-evaluate"),
+    path("api/rules/evaluate/async/", AsyncRuleEvaluationView.as_view(), name="rules-evaluate-async"),
+    path("api/rules/evaluate/batch/", RuleEvaluationBatchView.as_view(), name="rules-evaluate-batch"),
+    path("api/coverage/", CoverageView.as_view(), name="coverage"),
+    path("api/metrics/", RuleEngineMetricsView.as_view(), name="rule-engine-metrics"),
 ]
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.conf import settings
+
+        if settings.RULE_PACK_PRELOAD:
+            from core.rule_packs import preload_rule_packs
+
+            preload_rule_packs()
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from core.models import Document, DocumentVersion, RuleEvaluationResult
+from core.rule_packs import PROFILER, RESULT_CACHE, RULE_PACKS
+from core.serializers import AsyncRuleEvaluationInputSerializer
+from core.services import evaluation_record
+from engine import RuleEvaluator
+
+# Evaluation holds the GIL, so this bounds how many requests evaluate concurrently per process while the event
+# loop stays free to accept and answer cheap requests; scale across cores with more ASGI worker processes.
+EVALUATION_EXECUTOR = ThreadPoolExecutor(max_workers=settings.RULE_EVALUATION_WORKERS, thread_name_prefix="rule-eval")
+
+
+def _evaluate(data: dict) -> dict:
+    evaluator = RuleEvaluator(RULE_PACKS.compiled(data["rule_pack"]), debug=data["debug"], result_cache=RESULT_CACHE, profiler=PROFILER)
+    return evaluator.evaluate(data["payload"], previous_payload=data["previous_payload"])
+
+
+def _persist(data: dict, result: dict) -> None:
+    """Store ``result`` for the validated document version; the document status follows its latest version."""
+    version = DocumentVersion.objects.filter(pk=data["document_version"]).values("version")
+    newer = DocumentVersion.objects.filter(document=OuterRef("pk"), version__gt=Subquery(version))
+    with transaction.atomic():
+        RuleEvaluationResult.objects.create(
+            document_id=data["document"],
+            document_version_id=data["document_version"],
+            rule_set_id=data["rule_set"],
+            **evaluation_record(result),
+        )
+        Document.objects.filter(pk=data["document"]).exclude(Exists(newer)).update(
+            status=result["status"], updated_at=timezone.now()
+        )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncRuleEvaluationView(View):
+    http_method_names = ["post"]
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            body = json.loads(request.body or b"{}")
+        except ValueError as exc:
+            return JsonResponse({"detail": f"JSON parse error - {exc}"}, status=400)
+        serializer = AsyncRuleEvaluationInputSerializer(data=body)
+        # Validation checks document_version against the database.
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=400)
+        data = serializer.validated_data
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(EVALUATION_EXECUTOR, partial(_evaluate, data))
+        if data["document"] is not None:
+            await sync_to_async(_persist)(data, result)
+        return JsonResponse(result)
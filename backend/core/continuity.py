@@ -0,0 +1,184 @@
+"""Continuity/expiry scheduling for welder qualifications (ISO 9606-1).
+
+``Qualification.continuity_confirmed_on`` is the last continuity confirmation and the only stored input: the period
+it covers is the ``gt`` threshold of the pack's rule on ``months_since_last_continuity``, and the day it runs out is
+derived at run time, so rows written through ``update()``/``bulk_update()`` or a changed pack never leave a stale
+due date behind. Crossings are monotonic in the confirmation date, so "due by today" is an indexed
+``continuity_confirmed_on <= cutoff`` range read. ``continuity_checked_for`` records the confirmation the last
+scheduled evaluation covered; a new confirmation queues the qualification again.
+"""
+
+import heapq
+from datetime import date, timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import F, OuterRef
+from django.utils import timezone
+
+from core.history import latest_payload
+from core.models import Qualification
+from core.rule_packs import RULE_PACKS
+from engine import RuleEvaluator
+
+CONTINUITY_PACK = "iso_9606_1/rules.json"
+CONTINUITY_VARIABLE = "months_since_last_continuity"
+
+
+def continuity_period_months() -> int:
+    """Months a continuity confirmation stays valid: the ``gt`` threshold of the pack's rule on the variable."""
+    field_path = f"inputs.{CONTINUITY_VARIABLE}"
+    thresholds = {
+        predicate.value
+        for rule in RULE_PACKS.compiled(CONTINUITY_PACK).rules
+        for predicate in rule.condition.iter_predicates()
+        if predicate.field == field_path and predicate.op == "gt"
+    }
+    if len(thresholds) != 1:
+        raise ImproperlyConfigured(f"{CONTINUITY_PACK} must have one 'gt' threshold on {field_path}, found {sorted(thresholds)}.")
+    return thresholds.pop()
+
+
+def months_between(start: date, end: date) -> int:
+    months = (end.year - start.year) * 12 + end.month - start.month
+    return months - 1 if end.day < start.day else months
+
+
+def add_months(day: date, months: int) -> date:
+    """First day with ``months_between(day, result) >= months``: same day of month, or the 1st of the next month
+    when that day does not exist."""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    try:
+        return date(year, month + 1, day.day)
+    except ValueError:
+        year, month = divmod(month_index + 1, 12)
+        return date(year, month + 1, 1)
+
+
+def continuity_dates(confirmed_on: date | None, period_months: int) -> tuple[date | None, date | None]:
+    """``(continuity_until, crossing)``: the last day ``confirmed_on`` covers and the first day the period is exceeded."""
+    if confirmed_on is None:
+        return None, None
+    crossing = add_months(confirmed_on, period_months + 1)
+    return crossing - timedelta(days=1), crossing
+
+
+def confirmed_cutoff(today: date, period_months: int) -> date:
+    """Latest confirmation date whose period is exceeded by ``today`` (``crossing`` is non-decreasing in it)."""
+    month_index = today.year * 12 + today.month - 1 - (period_months + 1)
+    year, month = divmod(month_index, 12)
+    cutoff = date(year, month + 1, min(today.day, 28))
+    while add_months(cutoff + timedelta(days=1), period_months + 1) <= today:
+        cutoff += timedelta(days=1)
+    while add_months(cutoff, period_months + 1) > today:
+        cutoff -= timedelta(days=1)
+    return cutoff
+
+
+def qualification_payload(confirmed_on: date, procedure_payload: dict | None, today: date) -> dict:
+    """WPQ payload for the ISO 9606-1 pack: procedure inputs plus the last continuity confirmation as of ``today``."""
+    inputs = dict((procedure_payload or {}).get("inputs", {}))
+    inputs["continuity_last_date"] = confirmed_on.isoformat()
+    inputs[CONTINUITY_VARIABLE] = months_between(confirmed_on, today)
+    return {"doc_type": "WPQ", "inputs": inputs, "context": dict((procedure_payload or {}).get("context", {}))}
+
+
+def due_on(confirmed_on: date | None, checked_for: date | None, period_months: int) -> date | None:
+    """Day the current confirmation's scheduled evaluation is due, or ``None`` once it has been evaluated."""
+    if confirmed_on is None or checked_for == confirmed_on:
+        return None
+    return continuity_dates(confirmed_on, period_months)[1]
+
+
+def pending_qualifications():
+    """Qualifications whose current confirmation has not had its scheduled evaluation yet."""
+    return Qualification.objects.filter(continuity_confirmed_on__isnull=False).exclude(
+        continuity_checked_for=F("continuity_confirmed_on")
+    )
+
+
+def due_qualifications(today: date, period_months: int):
+    return (
+        pending_qualifications()
+        .filter(continuity_confirmed_on__lte=confirmed_cutoff(today, period_months))
+        .order_by("continuity_confirmed_on", "pk")
+        .annotate(procedure_payload=latest_payload(OuterRef("procedure__document_id")))
+    )
+
+
+def evaluate_qualifications(qualifications: list[Qualification], today: date, period_months: int) -> int:
+    """Evaluate ``qualifications`` in one batch and bulk-write status, findings and the confirmation covered."""
+    if not qualifications:
+        return 0
+    evaluator = RuleEvaluator(RULE_PACKS.compiled(CONTINUITY_PACK))
+    payloads = [qualification_payload(q.continuity_confirmed_on, q.procedure_payload, today) for q in qualifications]
+    now = timezone.now()
+    for qualification, result in zip(qualifications, evaluator.evaluate_many(payloads)):
+        qualification.status = result["status"]
+        qualification.findings = result["findings"]
+        qualification.evaluated_at = now
+        # Evaluated ahead of its crossing day (a future ``today``): stays pending.
+        if timezone.localdate(now) >= due_on(qualification.continuity_confirmed_on, None, period_months):
+            qualification.continuity_checked_for = qualification.continuity_confirmed_on
+        qualification.updated_at = now
+    with transaction.atomic():
+        Qualification.objects.bulk_update(
+            qualifications, ["status", "findings", "evaluated_at", "continuity_checked_for", "updated_at"], batch_size=500
+        )
+    return len(qualifications)
+
+
+def process_due(today: date, batch_size: int = 500, ids: list[int] | None = None) -> int:
+    """Evaluate every qualification due by ``today`` (optionally only ``ids``), ``batch_size`` at a time."""
+    period_months = continuity_period_months()
+    queryset = due_qualifications(today, period_months)
+    processed, last = 0, None
+    while True:
+        batch = queryset if ids is None else queryset.filter(pk__in=ids)
+        if last is not None:
+            batch = batch.filter(continuity_confirmed_on__gte=last[0]).exclude(
+                continuity_confirmed_on=last[0], pk__lte=last[1]
+            )
+        batch = list(batch[:batch_size])
+        if not batch:
+            return processed
+        # Keyset pagination: rows evaluated ahead of their crossing day stay pending and must not be read again.
+        last = (batch[-1].continuity_confirmed_on, batch[-1].pk)
+        processed += evaluate_qualifications(batch, today, period_months)
+
+
+class ExpiryQueue:
+    """Indexed min-priority queue of ``qualification id -> due date`` with O(log n) push/update and lazy removal."""
+
+    def __init__(self):
+        self._heap: list[tuple[date, int]] = []
+        self._due: dict[int, date] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def push(self, key: int, due: date | None) -> None:
+        if due is None:
+            self._due.pop(key, None)
+            return
+        if self._due.get(key) == due:
+            return
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+
+    def peek(self) -> date | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, today: date) -> list[int]:
+        keys = []
+        while (due := self.peek()) is not None and due <= today:
+            _, key = heapq.heappop(self._heap)
+            del self._due[key]
+            keys.append(key)
+        return keys
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
@@ -0,0 +1,114 @@
+"""Process-wide coverage index over the latest ``RuleEvaluationResult`` of each document.
+
+The index is loaded on first use and then follows results by ``created_at``, so rows written by any process (API,
+``reevaluate_documents`` bulk inserts) are picked up without signals. Primary keys and timestamps are assigned
+before commit, so each sync re-reads ``SYNC_OVERLAP`` behind the newest row seen (a row committed late by a slower
+transaction is still found) and skips the rows it already applied; the index is rebuilt every
+``REBUILD_INTERVAL_SECONDS`` for transactions open longer than that. Documents with new rows get their latest
+current result re-read, so the order rows are found in does not matter.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+from django.db.models import Max, OuterRef, Subquery
+
+from core.history import latest_payload, version_payload
+from core.models import Document, RuleEvaluationResult
+from engine.coverage import CoverageEntry, CoverageIndex, coverage_entry
+
+SYNC_INTERVAL_SECONDS = 1.0
+SYNC_OVERLAP = timedelta(seconds=60)
+REBUILD_INTERVAL_SECONDS = 600.0
+DOCUMENT_CHUNK = 500
+
+
+def _with_payload(queryset):
+    return queryset.select_related("document_version").annotate(latest_payload=latest_payload(OuterRef("document"))).order_by("pk")
+
+
+def _latest_results(documents=None):
+    """The latest current result of each document (of ``documents`` only, when given)."""
+    latest = RuleEvaluationResult.objects.current().filter(document=OuterRef("document")).order_by("-created_at", "-pk")
+    rows = RuleEvaluationResult.objects.filter(pk=Subquery(latest.values("pk")[:1]))
+    if documents is not None:
+        rows = rows.filter(document_id__in=documents)
+    return _with_payload(rows)
+
+
+def result_entry(result: RuleEvaluationResult) -> CoverageEntry | None:
+    """Coverage of one stored evaluation; invalid documents cover nothing."""
+    if result.status == Document.STATUS_INVALID:
+        return None
+    payload = version_payload(result.document_version) if result.document_version_id else result.latest_payload
+    return coverage_entry({"computed": result.computed}, payload or {})
+
+
+class CoverageRegistry:
+    def __init__(self, sync_interval: float = SYNC_INTERVAL_SECONDS, rebuild_interval: float = REBUILD_INTERVAL_SECONDS):
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._index: CoverageIndex | None = None
+        self._since = None
+        self._applied: dict[int, object] = {}  # pk -> created_at of rows inside the overlap window
+        self._synced_at = self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self) -> CoverageIndex:
+        # Take the high-water mark first: rows inserted while loading are replayed by the next sync.
+        self._since = RuleEvaluationResult.objects.aggregate(last=Max("created_at"))["last"]
+        self._applied = {}
+        if self._since is not None:
+            visible = RuleEvaluationResult.objects.filter(created_at__gte=self._since - SYNC_OVERLAP)
+            self._applied = dict(visible.values_list("pk", "created_at"))
+        entries = {}
+        for result in _latest_results().iterator(chunk_size=2000):
+            entry = result_entry(result)
+            if entry is not None:
+                entries[result.document_id] = entry
+        return CoverageIndex(entries)
+
+    def sync(self) -> int:
+        """Apply results written since the last sync; returns how many documents were refreshed."""
+        rows = RuleEvaluationResult.objects.all()
+        if self._since is not None:
+            rows = rows.filter(created_at__gte=self._since - SYNC_OVERLAP)
+        documents = set()
+        for pk, document_id, created_at in rows.values_list("pk", "document_id", "created_at").iterator(chunk_size=2000):
+            if pk not in self._applied:
+                self._applied[pk] = created_at
+                documents.add(document_id)
+                self._since = created_at if self._since is None else max(self._since, created_at)
+        if self._since is not None:
+            horizon = self._since - SYNC_OVERLAP
+            self._applied = {pk: created_at for pk, created_at in self._applied.items() if created_at >= horizon}
+
+        pending = sorted(documents)
+        for start in range(0, len(pending), DOCUMENT_CHUNK):
+            chunk = pending[start:start + DOCUMENT_CHUNK]
+            latest = {result.document_id: result for result in _latest_results(chunk)}
+            for document_id in chunk:
+                result = latest.get(document_id)
+                self._index.update(document_id, result_entry(result) if result is not None else None)
+        return len(documents)
+
+    def index(self) -> CoverageIndex:
+        with self._lock:
+            now = time.monotonic()
+            if self._index is None or now - self._loaded_at >= self.rebuild_interval:
+                self._index = self._load()
+                self._loaded_at = now
+            elif now - self._synced_at >= self.sync_interval:
+                self.sync()
+            else:
+                return self._index
+            self._synced_at = now
+            return self._index
+
+    def reset(self) -> None:
+        with self._lock:
+            self._index = None
+
+
+COVERAGE = CoverageRegistry()
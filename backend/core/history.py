@@ -0,0 +1,193 @@
+"""Delta-encoded ``DocumentVersion`` history.
+
+Versions are stored as reverse deltas: the latest version always holds the full payload (so ``latest_payload``
+reads ``DocumentVersion.payload`` directly), every ``HISTORY_SNAPSHOT_INTERVAL``-th version keeps a full
+snapshot, and the others hold only the patch from the next version back to theirs. Rebuilding any version walks
+back from the nearest full version above it, so at most ``HISTORY_SNAPSHOT_INTERVAL - 1`` patches are applied.
+Rebuilt payloads share unchanged sub-objects with each other and are cached per document; treat them as read-only.
+"""
+
+import copy
+import itertools
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from core.models import Document, DocumentVersion
+from engine.hashing import canonical_json
+from engine.patch import Patch, apply_patch, diff
+
+
+class StoredVersion(NamedTuple):
+    version_id: int
+    version: int
+    payload: dict[str, Any]
+    is_delta: bool
+
+
+class VersionPair(NamedTuple):
+    document_id: int
+    version_id: int
+    version: int
+    payload: dict[str, Any]
+    previous_payload: dict[str, Any] | None
+
+
+class PayloadCache:
+    """Rebuilt payloads by version for the most recently used documents. Versions never change once written, so
+    entries do not go stale."""
+
+    def __init__(self, max_documents: int):
+        self.max_documents = max_documents
+        self._documents: OrderedDict[int, dict[int, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def versions(self, document_id: int) -> dict[int, dict[str, Any]]:
+        with self._lock:
+            payloads = self._documents.get(document_id)
+            if payloads is None:
+                return {}
+            self._documents.move_to_end(document_id)
+            return dict(payloads)
+
+    def store(self, document_id: int, payloads: dict[int, dict[str, Any]]) -> None:
+        if self.max_documents <= 0 or not payloads:
+            return
+        with self._lock:
+            self._documents.setdefault(document_id, {}).update(payloads)
+            self._documents.move_to_end(document_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+    def forget(self, document_id: int) -> None:
+        with self._lock:
+            self._documents.pop(document_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+
+
+HISTORY_CACHE = PayloadCache(settings.HISTORY_CACHE_DOCUMENTS)
+
+
+def stored_delta(version: int, payload: dict[str, Any], next_payload: dict[str, Any]) -> Patch | None:
+    """How a non-latest version should be stored: its patch from ``next_payload``, or None to keep it full (snapshot
+    versions, and versions whose patch would not be smaller than the payload)."""
+    if version % settings.HISTORY_SNAPSHOT_INTERVAL == 0:
+        return None
+    patch = diff(next_payload, payload)
+    return patch if len(canonical_json(patch)) < len(canonical_json(payload)) else None
+
+
+def latest_payload(document_id) -> Subquery:
+    """Subquery for the full payload of a document's latest version, e.g. ``latest_payload(OuterRef("document"))``.
+
+    The latest version is never a delta, so this reads ``payload`` without rebuilding anything.
+    """
+    return Subquery(
+        DocumentVersion.objects.filter(document_id=document_id).order_by("-version").values("payload")[:1]
+    )
+
+
+def _rows(document_ids: Iterable[int], start: int | None, end: int | None):
+    rows = DocumentVersion.objects.filter(document_id__in=document_ids)
+    if start is not None and start > 1:
+        rows = rows.filter(version__gte=start - 1)
+    if end is not None:
+        # Stop at the first full version at or after ``end``; past the latest version every row is needed.
+        anchor = (
+            DocumentVersion.objects.filter(document=OuterRef("document"), version__gte=end, delta__isnull=True)
+            .order_by("version")
+            .values("version")[:1]
+        )
+        rows = rows.filter(version__lte=Coalesce(Subquery(anchor), Value(end)))
+    return rows.order_by("document_id", "-version").values_list("document_id", "pk", "version", "payload", "delta")
+
+
+def iter_documents(
+    document_ids: Iterable[int], start: int | None = None, end: int | None = None
+) -> Iterator[tuple[int, list[StoredVersion]]]:
+    """Per document, the rebuilt versions from ``start - 1`` up to the full version that anchors ``end``, oldest first.
+
+    One query for all ``document_ids``; cached payloads are reused and the rebuilt ones cached.
+    """
+    rows = _rows(list(document_ids), start, end).iterator(chunk_size=500)
+    for document_id, document_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        cached = HISTORY_CACHE.versions(document_id)
+        rebuilt, current = [], None
+        for _, version_id, version, payload, delta in document_rows:
+            if version in cached:
+                current = cached[version]
+            elif delta is None:
+                current = payload
+            elif current is None:
+                raise ValueError(f"Version {version} of document {document_id} has no later full payload.")
+            else:
+                current = apply_patch(current, delta)
+            rebuilt.append(StoredVersion(version_id, version, current, delta is not None))
+        rebuilt.reverse()
+        HISTORY_CACHE.store(document_id, {stored.version: stored.payload for stored in rebuilt})
+        yield document_id, rebuilt
+
+
+def iter_version_pairs(
+    document_ids: Iterable[int], start: int | None = None, end: int | None = None
+) -> Iterator[VersionPair]:
+    """``(payload, previous_payload)`` for versions ``start..end`` (default: all) of each document, in one pass."""
+    for document_id, versions in iter_documents(document_ids, start, end):
+        previous = None
+        for stored in versions:
+            in_range = (start is None or stored.version >= start) and (end is None or stored.version <= end)
+            if in_range:
+                yield VersionPair(document_id, stored.version_id, stored.version, stored.payload, previous)
+            previous = stored.payload
+
+
+def version_pairs(document_id: int, start: int | None = None, end: int | None = None) -> list[VersionPair]:
+    return list(iter_version_pairs([document_id], start, end))
+
+
+def payload_at(document_id: int, version: int) -> dict[str, Any]:
+    cached = HISTORY_CACHE.versions(document_id).get(version)
+    if cached is not None:
+        return cached
+    for _, versions in iter_documents([document_id], version, version):
+        for stored in versions:
+            if stored.version == version:
+                return stored.payload
+    raise DocumentVersion.DoesNotExist(f"Document {document_id} has no version {version}.")
+
+
+def version_payload(version: DocumentVersion) -> dict[str, Any]:
+    """Full payload of a loaded ``DocumentVersion`` row."""
+    if version.delta is None:
+        return version.payload
+    return payload_at(version.document_id, version.version)
+
+
+def append_version(document: Document, payload: dict[str, Any], changed_by) -> DocumentVersion:
+    """Store ``payload`` as the next version of ``document``; the previous latest version becomes a delta."""
+    with transaction.atomic():
+        # Lock the document so concurrent writers append one after the other.
+        Document.objects.select_for_update().only("pk").get(pk=document.pk)
+        latest = DocumentVersion.objects.filter(document=document).order_by("-version").first()
+        created = DocumentVersion.objects.create(
+            document=document,
+            version=latest.version + 1 if latest else 1,
+            payload=payload,
+            changed_by=changed_by,
+        )
+        if latest is not None:
+            delta = stored_delta(latest.version, latest.payload, payload)
+            if delta is not None:
+                DocumentVersion.objects.filter(pk=latest.pk).update(payload={}, delta=delta)
+        snapshot = copy.deepcopy(payload)
+        transaction.on_commit(lambda: HISTORY_CACHE.store(document.pk, {created.version: snapshot}))
+    return created
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.history import iter_documents, stored_delta
+from core.models import Document, DocumentVersion
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite DocumentVersion rows into the delta layout of core.history: full payloads on the latest version and "
+        "every HISTORY_SNAPSHOT_INTERVAL-th version, patches elsewhere. Safe to re-run, e.g. after changing the interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=200, help="Documents per chunk.")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        totals = {"documents": 0, "to_delta": 0, "to_full": 0}
+        last_document_id = 0
+        while True:
+            chunk = list(
+                Document.objects.filter(pk__gt=last_document_id).order_by("pk").values_list("pk", flat=True)[: options["chunk_size"]]
+            )
+            if not chunk:
+                break
+            updates = []
+            for _, versions in iter_documents(chunk):
+                for stored, following in zip(versions, versions[1:] + [None]):
+                    delta = stored_delta(stored.version, stored.payload, following.payload) if following else None
+                    if (delta is not None) == stored.is_delta:
+                        continue
+                    totals["to_delta" if delta is not None else "to_full"] += 1
+                    payload = {} if delta is not None else stored.payload
+                    updates.append(DocumentVersion(pk=stored.version_id, payload=payload, delta=delta))
+            with transaction.atomic():
+                DocumentVersion.objects.bulk_update(updates, ["payload", "delta"], batch_size=500)
+            totals["documents"] += len(chunk)
+            last_document_id = chunk[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {totals['documents']} documents, {totals['to_delta']} versions stored as deltas, "
+            f"{totals['to_full']} restored to full payloads."
+        ))
@@ -0,0 +1,177 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from core.history import iter_version_pairs
+from core.models import Document, DocumentVersion, RuleEvaluationResult, RuleSet
+from core.rule_packs import RULE_PACKS
+from core.services import evaluation_record, rule_pack_path
+from engine import RuleEvaluator
+from engine.impact import pack_impacts
+
+
+def _init_worker() -> None:
+    import django
+
+    django.setup()
+
+
+def evaluate_version(task: tuple) -> tuple:
+    document_id, version_id, pack_path, payload, previous_payload = task
+    result = RuleEvaluator(RULE_PACKS.compiled(pack_path)).evaluate(payload, previous_payload=previous_payload)
+    return document_id, version_id, result
+
+
+def iter_version_tasks(documents: list[tuple[int, str]]):
+    """Yield one task per version of ``documents``, each paired with its predecessor's payload."""
+    pack_paths = {document_id: rule_pack_path(slug) for document_id, slug in documents}
+    for pair in iter_version_pairs(pack_paths):
+        yield pair.document_id, pair.version_id, pack_paths[pair.document_id], pair.payload, pair.previous_payload
+
+
+class Command(BaseCommand):
+    help = "Re-evaluate every DocumentVersion against its document's active rule set and refresh document status."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=200, help="Documents per chunk.")
+        parser.add_argument("--rule-set", help="Only documents whose active rule set has this slug.")
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            help="File holding the run start and the last fully written document id; an existing one resumes after it.",
+        )
+        parser.add_argument(
+            "--old-rules-root",
+            type=Path,
+            help="Rules tree before an edit: only versions whose result can differ under the current packs are re-evaluated.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--workers and --chunk-size must be positive.")
+        checkpoint = options["checkpoint"]
+        last_document_id, started_at = self._read_checkpoint(checkpoint)
+        # Written before the first chunk so a crash between a chunk's commit and its checkpoint can be detected.
+        self._write_checkpoint(checkpoint, last_document_id, started_at)
+
+        documents = Document.objects.order_by("pk")
+        if options["rule_set"]:
+            documents = documents.filter(active_rule_set__slug=options["rule_set"])
+        impacts = None
+        if options["old_rules_root"]:
+            impacts = self._impacts(options["old_rules_root"])
+            slugs = [slug for slug in RuleSet.objects.values_list("slug", flat=True) if rule_pack_path(slug) in impacts]
+            documents = documents.filter(active_rule_set__slug__in=slugs)
+
+        executor = None
+        totals = {"documents": 0, "versions": 0, "skipped": 0}
+        try:
+            while True:
+                chunk = list(
+                    documents.filter(pk__gt=last_document_id).values_list("pk", "active_rule_set__slug")[: options["chunk_size"]]
+                )
+                if not chunk:
+                    break
+                # Versions this run already wrote: a crash after a chunk committed but before its checkpoint.
+                written = self._written_since(chunk, started_at)
+                tasks = [task for task in iter_version_tasks(chunk) if task[1] not in written]
+                if impacts is not None:
+                    selected = [task for task in tasks if impacts[task[2]].may_affect(task[3], task[4])]
+                    totals["skipped"] += len(tasks) - len(selected)
+                    tasks = selected
+                if executor is None and options["workers"] > 1:
+                    # The pool forks its workers on the first map, after the chunk queries above opened a
+                    # connection: close it so the children do not inherit it.
+                    connections.close_all()
+                    executor = ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker)
+                if executor is None:
+                    outcomes = map(evaluate_version, tasks)
+                else:
+                    outcomes = executor.map(evaluate_version, tasks, chunksize=max(1, len(tasks) // (options["workers"] * 4)))
+                totals["versions"] += self._write(chunk, outcomes)
+                totals["documents"] += len(chunk)
+                last_document_id = chunk[-1][0]
+                self._write_checkpoint(checkpoint, last_document_id, started_at)
+                self.stdout.write(f"Re-evaluated {totals['documents']} documents ({totals['versions']} versions).")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if checkpoint and checkpoint.exists():
+            checkpoint.unlink()
+        done = f"Done: {totals['documents']} documents, {totals['versions']} versions"
+        if impacts is not None:
+            done += f", {totals['skipped']} unaffected versions skipped"
+        self.stdout.write(self.style.SUCCESS(done + "."))
+
+    def _impacts(self, old_rules_root: Path) -> dict:
+        """Impact per rule pack path, keeping only the packs that changed."""
+        slugs = list(RuleSet.objects.values_list("slug", flat=True))
+        impacts = pack_impacts(old_rules_root, settings.RULES_ROOT, [rule_pack_path(slug) for slug in slugs])
+        changed = {rule_pack: impact for rule_pack, impact in impacts.items() if impact}
+        for rule_pack, impact in changed.items():
+            self.stdout.write(f"{rule_pack}: {len(impact.changes)} changed entries, fields {sorted(impact.fields)}.")
+        return changed
+
+    def _write(self, chunk, outcomes) -> int:
+        latest_version = DocumentVersion.objects.filter(document=OuterRef("pk")).order_by("-version").values("pk")[:1]
+        documents = (
+            Document.objects.filter(pk__in=[pk for pk, _ in chunk])
+            .annotate(latest_version=Subquery(latest_version))
+            .values_list("pk", "active_rule_set_id", "latest_version")
+        )
+        rule_sets, latest_versions = {}, {}
+        for pk, rule_set_id, version_id in documents:
+            rule_sets[pk], latest_versions[pk] = rule_set_id, version_id
+        rows, latest = [], {}
+        for document_id, version_id, result in outcomes:
+            rows.append(RuleEvaluationResult(
+                document_id=document_id,
+                document_version_id=version_id,
+                rule_set_id=rule_sets[document_id],
+                **evaluation_record(result),
+            ))
+            # With --old-rules-root the latest version may have been skipped; its status is then unchanged.
+            if version_id == latest_versions[document_id]:
+                latest[document_id] = result["status"]
+
+        now = timezone.now()
+        documents = [Document(pk=pk, status=status, updated_at=now) for pk, status in latest.items()]
+        with transaction.atomic():
+            RuleEvaluationResult.objects.bulk_create(rows, batch_size=500)
+            Document.objects.bulk_update(documents, ["status", "updated_at"], batch_size=500)
+        return len(rows)
+
+    def _written_since(self, chunk, started_at: datetime) -> set[int]:
+        """Versions of ``chunk`` with a result under their document's active rule set created since ``started_at``."""
+        return set(
+            RuleEvaluationResult.objects.filter(
+                document_id__in=[pk for pk, _ in chunk],
+                created_at__gte=started_at,
+                rule_set_id=F("document__active_rule_set_id"),
+            ).values_list("document_version_id", flat=True)
+        )
+
+    def _read_checkpoint(self, checkpoint: Path | None) -> tuple[int, datetime]:
+        if not checkpoint or not checkpoint.exists():
+            return 0, timezone.now()
+        state = json.loads(checkpoint.read_text(encoding="utf-8"))
+        self.stdout.write(f"Resuming after document {state['last_document_id']}.")
+        return state["last_document_id"], datetime.fromisoformat(state["started_at"])
+
+    def _write_checkpoint(self, checkpoint: Path | None, last_document_id: int, started_at: datetime) -> None:
+        if not checkpoint:
+            return
+        tmp = checkpoint.with_suffix(checkpoint.suffix + ".tmp")
+        state = {"last_document_id": last_document_id, "started_at": started_at.isoformat()}
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(checkpoint)
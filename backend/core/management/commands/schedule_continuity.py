@@ -0,0 +1,70 @@
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from core.continuity import (
+    ExpiryQueue,
+    confirmed_cutoff,
+    continuity_period_months,
+    due_on,
+    pending_qualifications,
+    process_due,
+)
+from core.models import Qualification
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate welder qualifications whose continuity period ran out since the last run against ISO 9606-1. "
+        "Run once from cron, or with --loop as a long-running worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--today", type=date.fromisoformat, help="Evaluate as of this date (YYYY-MM-DD).")
+        parser.add_argument("--loop", action="store_true", help="Keep running, waking up when the next qualification is due.")
+        parser.add_argument("--interval", type=float, default=3600, help="Seconds between queue refreshes in --loop mode.")
+        parser.add_argument("--horizon-days", type=int, default=7, help="How far ahead --loop keeps due dates in memory.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["interval"] <= 0 or options["horizon_days"] < 0:
+            raise CommandError("--batch-size, --interval and --horizon-days must be positive.")
+        if not options["loop"]:
+            today = options["today"] or timezone.localdate()
+            processed = process_due(today, options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Evaluated {processed} qualifications due by {today}."))
+            return
+        self._loop(options)
+
+    def _loop(self, options):
+        queue = ExpiryQueue()
+        refreshed_at = None
+        while True:
+            today = timezone.localdate()
+            started = timezone.now()
+            period_months = continuity_period_months()
+            # Pending rows entering the horizon, plus rows changed since the previous refresh (their due date may have
+            # moved or been cleared).
+            horizon = confirmed_cutoff(today + timedelta(days=options["horizon_days"]), period_months)
+            window = Q(pk__in=pending_qualifications().filter(continuity_confirmed_on__lte=horizon).values("pk"))
+            if refreshed_at is not None:
+                window |= Q(updated_at__gte=refreshed_at)
+            rows = Qualification.objects.filter(window).values_list("pk", "continuity_confirmed_on", "continuity_checked_for")
+            for pk, confirmed_on, checked_for in rows.iterator(chunk_size=2000):
+                queue.push(pk, due_on(confirmed_on, checked_for, period_months))
+            refreshed_at = started
+
+            due_ids = queue.pop_due(today)
+            if due_ids:
+                processed = process_due(today, options["batch_size"], ids=due_ids)
+                self.stdout.write(f"{timezone.now():%Y-%m-%d %H:%M} evaluated {processed} qualifications.")
+
+            next_due = queue.peek()
+            wait = options["interval"]
+            if next_due is not None:
+                wake = timezone.make_aware(datetime.combine(next_due, datetime.min.time()))
+                wait = min(wait, max(1.0, (wake - timezone.now()).total_seconds()))
+            time.sleep(wait)
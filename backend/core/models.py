@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import OuterRef, Q, Subquery
 
 User = get_user_model()
 
@@ -46,13 +47,31 @@ class Document(TimeStampedModel):
 
 
 class DocumentVersion(TimeStampedModel):
+    """One revision of a document. The latest version and every ``HISTORY_SNAPSHOT_INTERVAL``-th one store the full
+    ``payload``; the others store ``delta``, the patch turning the next version's payload into theirs, and an empty
+    ``payload``. Read payloads through ``core.history``."""
+
     document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="versions")
     version = models.PositiveIntegerField()
     payload = models.JSONField(default=dict)
+    delta = models.JSONField(null=True, blank=True)
     changed_by = models.ForeignKey(User, on_delete=models.PROTECT)
 
     class Meta:
         unique_together = ("document", "version")
+        indexes = [models.Index(fields=["document", "-version"], name="docversion_latest_idx")]
+
+
+class ProcedureQuerySet(models.QuerySet):
+    def with_latest(self):
+        """Procedures with their rule set joined and the latest version/evaluation annotated, in one query."""
+        versions = DocumentVersion.objects.filter(document=OuterRef("document")).order_by("-version")
+        results = RuleEvaluationResult.objects.current().filter(document=OuterRef("document")).order_by("-created_at", "-pk")
+        return self.select_related("document", "document__active_rule_set").annotate(
+            latest_version=Subquery(versions.values("version")[:1]),
+            latest_evaluation_status=Subquery(results.values("status")[:1]),
+            latest_evaluated_at=Subquery(results.values("created_at")[:1]),
+        )
 
 
 class Procedure(TimeStampedModel):
@@ -65,6 +84,8 @@ class Procedure(TimeStampedModel):
     procedure_type = models.CharField(max_length=4, choices=TYPE_CHOICES)
     parent_procedure = models.ForeignKey("self", null=True, blank=True, on_delete=models.SET_NULL)
 
+    objects = ProcedureQuerySet.as_manager()
+
 
 class Welder(TimeStampedModel):
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
@@ -75,13 +96,49 @@ class Welder(TimeStampedModel):
 class Qualification(TimeStampedModel):
     welder = models.ForeignKey(Welder, on_delete=models.CASCADE, related_name="qualifications")
     procedure = models.ForeignKey(Procedure, on_delete=models.PROTECT)
+    # Last continuity confirmation; the day it runs out is derived from it and the pack (core.continuity).
+    continuity_confirmed_on = models.DateField(null=True, blank=True, db_index=True)
+    # Entered by hand for qualifications without a confirmation date.
     continuity_until = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Document.STATUS_CHOICES, default=Document.STATUS_VALID)
+    findings = models.JSONField(default=list)
+    evaluated_at = models.DateTimeField(null=True, blank=True)
+    # Confirmation the last scheduled evaluation covered; schedule_continuity skips it until a new one is recorded.
+    continuity_checked_for = models.DateField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["welder", "-continuity_until"], name="qualification_welder_idx")]
+
+
+class RuleEvaluationResultQuerySet(models.QuerySet):
+    def current(self):
+        """Results describing their document as it is now: of its latest version, or recorded without a version.
+
+        Re-evaluating old versions (``reevaluate_documents``) writes newer rows for them; those never count as the
+        document's latest evaluation.
+        """
+        latest_version = DocumentVersion.objects.filter(document=OuterRef("document")).order_by("-version").values("pk")[:1]
+        return self.filter(Q(document_version__isnull=True) | Q(document_version=Subquery(latest_version)))
 
 
 class RuleEvaluationResult(TimeStampedModel):
     document = models.ForeignKey(Document, on_delete=models.CASCADE)
+    document_version = models.ForeignKey(
+        DocumentVersion, null=True, blank=True, on_delete=models.SET_NULL, related_name="evaluations"
+    )
     rule_set = models.ForeignKey(RuleSet, on_delete=models.PROTECT)
     status = models.CharField(max_length=10, choices=Document.STATUS_CHOICES)
     errors = models.JSONField(default=list)
     warnings = models.JSONField(default=list)
     explanations = models.JSONField(default=list)
+    approval_ranges = models.JSONField(default=list)
+    computed = models.JSONField(default=dict)
+
+    objects = RuleEvaluationResultQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["document", "-created_at"], name="evaluation_latest_idx"),
+            # Coverage sync reads results by creation time.
+            models.Index(fields=["created_at"], name="evaluation_created_idx"),
+        ]
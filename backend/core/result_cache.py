@@ -0,0 +1,27 @@
+from django.core.cache import caches
+
+from engine import EvaluationCache, InProcessResultBackend
+
+
+class DjangoCacheResultBackend:
+    """Stores evaluation results in a Django cache so every worker process shares them."""
+
+    def __init__(self, alias: str = "default", timeout: float | None = 300, prefix: str = "rule-eval:"):
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+
+    def get(self, key: str):
+        return caches[self.alias].get(self.prefix + key)
+
+    def set(self, key: str, value) -> None:
+        caches[self.alias].set(self.prefix + key, value, timeout=self.timeout)
+
+
+def build_result_cache(config: dict) -> EvaluationCache | None:
+    backend = config.get("BACKEND", "inprocess")
+    if backend == "none":
+        return None
+    if backend == "django":
+        return EvaluationCache(DjangoCacheResultBackend(alias=config.get("ALIAS", "default"), timeout=config.get("TTL")))
+    return EvaluationCache(InProcessResultBackend(maxsize=config.get("MAXSIZE", 4096), ttl=config.get("TTL")))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.result_cache import build_result_cache
+from engine import EvaluationProfiler, RulePackCache
+from engine.cache import PackLoadStat
+from engine.schema import RuleSchemaError
+
+RULE_PACKS = RulePackCache(settings.RULES_ROOT, maxsize=settings.RULE_PACK_CACHE_SIZE)
+RESULT_CACHE = build_result_cache(settings.RULE_RESULT_CACHE)
+PROFILER = EvaluationProfiler() if settings.RULE_ENGINE_PROFILING else None
+PRELOADED: list[PackLoadStat] = []
+
+
+def preload_rule_packs() -> list[PackLoadStat]:
+    """Load and compile every pack into ``RULE_PACKS``; raises ``ImproperlyConfigured`` for a broken pack."""
+    try:
+        stats = RULE_PACKS.preload()
+    except RuleSchemaError as exc:
+        raise ImproperlyConfigured(f"Rule pack failed to load: {exc}") from exc
+    PRELOADED[:] = stats
+    return stats
@@ -1,16 +1,122 @@
 from rest_framework import serializers
 
-from core.models import Procedure
+from core.history import version_pairs
+from core.models import Document, DocumentVersion, Procedure
+from core.rule_packs import RULE_PACKS
+from core.services import rule_pack_path
+from engine.hashing import canonical_json
+from engine.schema import RuleSchemaError
+
+
+def validate_rule_pack(value: str) -> None:
+    try:
+        path = RULE_PACKS.pack_file(value)
+    except RuleSchemaError as exc:
+        raise serializers.ValidationError(str(exc)) from exc
+    if not path.is_file():
+        raise serializers.ValidationError(f"Unknown rule pack: {value!r}")
+
+
+class PayloadField(serializers.JSONField):
+    """A JSON object: the evaluator reads payloads by key."""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Must be a JSON object.")
+        return value
 
 
 class ProcedureSerializer(serializers.ModelSerializer):
+    # Read from Procedure.objects.with_latest(): the joined document/rule set and the latest version/evaluation.
+    status = serializers.CharField(source="document.status", read_only=True)
+    rule_set = serializers.SlugRelatedField(source="document.active_rule_set", slug_field="slug", read_only=True)
+    latest_version = serializers.IntegerField(read_only=True, allow_null=True)
+    latest_evaluation_status = serializers.CharField(read_only=True, allow_null=True)
+    latest_evaluated_at = serializers.DateTimeField(read_only=True, allow_null=True)
+
     class Meta:
         model = Procedure
-        fields = ["id", "document", "procedure_type", "parent_procedure", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "document",
+            "procedure_type",
+            "parent_procedure",
+            "status",
+            "rule_set",
+            "latest_version",
+            "latest_evaluation_status",
+            "latest_evaluated_at",
+            "created_at",
+            "updated_at",
+        ]
 
 
 class RuleEvaluationInputSerializer(serializers.Serializer):
-    rule_pack = serializers.CharField(help_text="Relative path, e.g. iso_15614_1/rules.json")
-    payload = serializers.JSONField()
-    previous_payload = serializers.JSONField(required=False, default=None)
+    rule_pack = serializers.CharField(help_text="Relative path, e.g. iso_15614_1/rules.json", validators=[validate_rule_pack])
+    payload = PayloadField()
+    previous_payload = PayloadField(required=False, default=None, allow_null=True)
     debug = serializers.BooleanField(required=False, default=False)
+
+
+class AsyncRuleEvaluationInputSerializer(RuleEvaluationInputSerializer):
+    document = serializers.IntegerField(required=False, default=None, help_text="Persist the result for this document.")
+    document_version = serializers.IntegerField(required=False, default=None, help_text="Defaults to the latest version.")
+
+    def validate(self, attrs):
+        """With ``document``, the request must evaluate a stored version as-is: the document's active rule set, the
+        version's payload and its predecessor's. ``document_version`` and ``previous_payload`` are resolved here."""
+        if attrs["document"] is None:
+            if attrs["document_version"] is not None:
+                raise serializers.ValidationError({"document": "Required with document_version."})
+            return attrs
+        document = Document.objects.select_related("active_rule_set").filter(pk=attrs["document"]).first()
+        if document is None:
+            raise serializers.ValidationError({"document": "Unknown document."})
+        if attrs["rule_pack"] != rule_pack_path(document.active_rule_set):
+            raise serializers.ValidationError({"rule_pack": "Must be the document's active rule set."})
+        versions = DocumentVersion.objects.filter(document=document)
+        if attrs["document_version"] is None:
+            version = versions.order_by("-version").first()
+        else:
+            version = versions.filter(pk=attrs["document_version"]).first()
+        if version is None:
+            raise serializers.ValidationError({"document_version": "Not a version of this document."})
+        (pair,) = version_pairs(document.pk, version.version, version.version)
+        if canonical_json(attrs["payload"]) != canonical_json(pair.payload):
+            raise serializers.ValidationError({"payload": "Does not match the stored version."})
+        previous = attrs["previous_payload"]
+        if previous is not None and canonical_json(previous) != canonical_json(pair.previous_payload):
+            raise serializers.ValidationError({"previous_payload": "Does not match the previous stored version."})
+        return {**attrs, "document_version": version.pk, "previous_payload": pair.previous_payload, "rule_set": document.active_rule_set_id}
+
+
+class RuleEvaluationBatchInputSerializer(serializers.Serializer):
+    rule_pack = serializers.CharField(help_text="Relative path, e.g. iso_9606_1/rules.json", validators=[validate_rule_pack])
+    payloads = serializers.ListField(child=PayloadField(), allow_empty=True)
+    previous_payloads = serializers.ListField(child=PayloadField(allow_null=True), required=False, default=None)
+    debug = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        previous = attrs.get("previous_payloads")
+        if previous is not None and len(previous) != len(attrs["payloads"]):
+            raise serializers.ValidationError("previous_payloads must have the same length as payloads.")
+        return attrs
+
+
+class RuleEvaluationStreamParamsSerializer(serializers.Serializer):
+    rule_pack = serializers.CharField(help_text="Relative path, e.g. iso_9606_1/rules.json", validators=[validate_rule_pack])
+    debug = serializers.BooleanField(required=False, default=False)
+
+
+class CoverageQuerySerializer(serializers.Serializer):
+    process = serializers.CharField(required=False, default=None)
+    thickness = serializers.FloatField(required=False, default=None, help_text="mm")
+    diameter = serializers.FloatField(required=False, default=None, help_text="mm")
+    position = serializers.CharField(required=False, default=None)
+    limit = serializers.IntegerField(required=False, default=500, min_value=1, max_value=5000)
+
+    def validate(self, attrs):
+        if all(attrs[name] is None for name in ("process", "thickness", "diameter", "position")):
+            raise serializers.ValidationError("Give at least one of process, thickness, diameter or position.")
+        return attrs
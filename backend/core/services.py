@@ -0,0 +1,22 @@
+from core.models import RuleSet
+
+
+def rule_pack_path(rule_set: RuleSet | str) -> str:
+    slug = rule_set if isinstance(rule_set, str) else rule_set.slug
+    return f"{slug}/rules.json"
+
+
+def evaluation_record(result: dict) -> dict:
+    """Map an engine result onto the ``RuleEvaluationResult`` columns."""
+    findings = result.get("findings", [])
+    return {
+        "status": result["status"],
+        "errors": [f for f in findings if f.get("severity") == "ERROR"],
+        "warnings": [f for f in findings if f.get("severity") == "WARNING"],
+        "explanations": [
+            {"rule_id": f["rule_id"], "message": f.get("message"), "reference": f.get("reference")}
+            for f in findings
+        ],
+        "approval_ranges": result.get("approval_ranges", []),
+        "computed": result.get("computed", {}),
+    }
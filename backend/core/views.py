@@ -1,19 +1,41 @@
-from pathlib import Path
+import json
 
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import status, viewsets
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from core.models import Procedure
-from core.serializers import ProcedureSerializer, RuleEvaluationInputSerializer
-from engine import RuleEvaluator, RulePackLoader
+from core.continuity import continuity_dates, continuity_period_months
+from core.coverage import COVERAGE
+from core.models import Document, Procedure, Qualification
+from core.rule_packs import PRELOADED, PROFILER, RESULT_CACHE, RULE_PACKS
+from core.serializers import (
+    CoverageQuerySerializer,
+    ProcedureSerializer,
+    RuleEvaluationBatchInputSerializer,
+    RuleEvaluationInputSerializer,
+    RuleEvaluationStreamParamsSerializer,
+)
+from engine import RuleEvaluator
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+class ProcedureCursorPagination(CursorPagination):
+    # Keyset on the primary key: constant cost per page however deep the client scrolls.
+    ordering = "-pk"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
 
 
 class ProcedureViewSet(viewsets.ModelViewSet):
-    queryset = Procedure.objects.select_related("document").all()
+    queryset = Procedure.objects.with_latest()
     serializer_class = ProcedureSerializer
     permission_classes = [AllowAny]
+    pagination_class = ProcedureCursorPagination
 
 
 class RuleEvaluationView(APIView):
@@ -23,13 +45,133 @@ class RuleEvaluationView(APIView):
         serializer = RuleEvaluationInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        rules_root = Path(__file__).resolve().parents[2] / "rules"
-        loader = RulePackLoader(rules_root)
-        pack = loader.load(serializer.validated_data["rule_pack"])
+        pack = RULE_PACKS.compiled(serializer.validated_data["rule_pack"])
 
-        evaluator = RuleEvaluator(pack, debug=serializer.validated_data["debug"])
+        evaluator = RuleEvaluator(pack, debug=serializer.validated_data["debug"], result_cache=RESULT_CACHE, profiler=PROFILER)
         result = evaluator.evaluate(
             serializer.validated_data["payload"],
             previous_payload=serializer.validated_data["previous_payload"],
         )
         return Response(result, status=status.HTTP_200_OK)
+
+
+class RuleEvaluationBatchView(APIView):
+    """Evaluate many payloads against one pack.
+
+    JSON bodies (``{"rule_pack", "payloads", "previous_payloads"}``) get an ordered ``results`` list back.
+    NDJSON bodies (one ``{"payload", "previous_payload"}`` object per line, ``rule_pack`` in the query
+    string) are evaluated as they are read and streamed back as NDJSON in input order.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        if request.content_type.startswith(NDJSON_CONTENT_TYPE):
+            return self._stream(request)
+
+        serializer = RuleEvaluationBatchInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        pack = RULE_PACKS.compiled(serializer.validated_data["rule_pack"])
+        evaluator = RuleEvaluator(pack, debug=serializer.validated_data["debug"], result_cache=RESULT_CACHE, profiler=PROFILER)
+        results = list(evaluator.evaluate_many(
+            serializer.validated_data["payloads"],
+            previous_payloads=serializer.validated_data["previous_payloads"],
+        ))
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    def _stream(self, request):
+        params = RuleEvaluationStreamParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        pack = RULE_PACKS.compiled(params.validated_data["rule_pack"])
+        evaluator = RuleEvaluator(pack, debug=params.validated_data["debug"], result_cache=RESULT_CACHE, profiler=PROFILER)
+        lines = request.stream or []
+
+        def results():
+            for line_number, raw in enumerate(lines, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    payload, previous_payload = _stream_item(json.loads(raw))
+                    result = evaluator.evaluate(payload, previous_payload=previous_payload)
+                except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                    result = {"line": line_number, "error": str(exc)}
+                yield json.dumps(result) + "\n"
+
+        return StreamingHttpResponse(results(), content_type=NDJSON_CONTENT_TYPE)
+
+
+def _stream_item(item) -> tuple[dict, dict | None]:
+    if not isinstance(item, dict) or not isinstance(item.get("payload"), dict):
+        raise TypeError("Each line must be an object with a 'payload' object.")
+    previous_payload = item.get("previous_payload")
+    if previous_payload is not None and not isinstance(previous_payload, dict):
+        raise TypeError("'previous_payload' must be an object or null.")
+    return item["payload"], previous_payload
+
+
+class CoverageView(APIView):
+    """Procedures whose latest evaluation covers the joint, and the welders qualified on them."""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        params = CoverageQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = dict(params.validated_data)
+        limit = query.pop("limit")
+        documents = COVERAGE.index().query(**query, limit=limit)
+
+        procedures = {
+            p["document"]: p
+            for p in Procedure.objects.filter(document_id__in=documents).values("id", "document", "procedure_type")
+        }
+        qualifications = (
+            Qualification.objects.filter(procedure__document_id__in=documents)
+            .exclude(status=Document.STATUS_INVALID)
+            .select_related("welder")
+            .order_by("welder_id", "pk")
+        )
+        period_months = continuity_period_months() if qualifications else None
+        welders = [
+            {
+                "welder": q.welder_id,
+                "full_name": q.welder.full_name,
+                "identifier": q.welder.identifier,
+                "qualification": q.pk,
+                "procedure": q.procedure_id,
+                "continuity_until": continuity_dates(q.continuity_confirmed_on, period_months)[0] or q.continuity_until,
+            }
+            for q in qualifications
+        ]
+        return Response({
+            "procedures": [procedures[d] for d in documents if d in procedures],
+            "welders": welders,
+        })
+
+
+class RuleEngineMetricsView(APIView):
+    """Prometheus text exposition of the rule engine profiler and result cache counters."""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        body = PROFILER.render_prometheus() if PROFILER is not None else ""
+        if RESULT_CACHE is not None:
+            for name, value in RESULT_CACHE.stats().items():
+                body += (
+                    f"# HELP rule_engine_result_cache_{name}_total Evaluation result cache {name}.\n"
+                    f"# TYPE rule_engine_result_cache_{name}_total counter\n"
+                    f"rule_engine_result_cache_{name}_total {value}\n"
+                )
+        if PRELOADED:
+            body += "# HELP rule_engine_pack_preload_seconds Time to load and compile each pack at startup.\n"
+            body += "# TYPE rule_engine_pack_preload_seconds gauge\n"
+            body += "".join(f'rule_engine_pack_preload_seconds{{pack="{s.path}"}} {s.seconds}\n' for s in PRELOADED)
+            body += "# HELP rule_engine_pack_preload_rss_bytes Process RSS growth while preloading each pack.\n"
+            body += "# TYPE rule_engine_pack_preload_rss_bytes gauge\n"
+            body += "".join(
+                f'rule_engine_pack_preload_rss_bytes{{pack="{s.path}"}} {s.rss_bytes}\n' for s in PRELOADED if s.rss_bytes is not None
+            )
+        return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
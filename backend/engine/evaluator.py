@@ -1,39 +1,27 @@
-from engine.explanations import build_explanations
-from engine.loader import load_ruleset
+from engine import RuleEvaluator
 
+from .explanations import build_explanations
+from .loader import RULES_BASE_PATH, LegacyRulesetCache, flat_payload
 
-def _evaluate_rule(rule: dict, current: dict, previous: dict) -> dict | None:
-    trigger = rule.get("trigger", {})
-    variable = trigger.get("variable")
+LEGACY_RULESETS = LegacyRulesetCache(RULES_BASE_PATH)
 
-    if trigger.get("change") and previous.get(variable) == current.get(variable):
-        return None
-
-    if "equals" in trigger and current.get(variable) != trigger["equals"]:
-        return None
-
-    effect = rule.get("effect", {})
-    severity = "error" if effect.get("require_new_test") else "warning"
 
+def _legacy_result(finding: dict) -> dict:
     return {
-        "rule_id": rule.get("id"),
-        "severity": severity,
-        "variable": variable,
-        "message": rule.get("message", "Rule triggered"),
-        "reference": rule.get("reference"),
+        "rule_id": finding["rule_id"],
+        "severity": finding["severity"].lower(),
+        "variable": finding["field"],
+        "message": finding["message"],
+        "reference": finding.get("reference"),
     }
 
 
 def evaluate_rules(standard_slug: str, current: dict, previous: dict | None = None) -> dict:
-    previous = previous or {}
-    ruleset = load_ruleset(standard_slug)
-
-    triggered = []
-    for rule in ruleset.get("rules", []):
-        result = _evaluate_rule(rule, current, previous)
-        if result:
-            triggered.append(result)
+    """Evaluate a legacy ruleset through the cached, compiled rule engine and return the legacy result shape."""
+    evaluator = RuleEvaluator(LEGACY_RULESETS.compiled(standard_slug))
+    result = evaluator.evaluate(flat_payload(current), previous_payload=flat_payload(previous or {}))
 
+    triggered = [_legacy_result(finding) for finding in result["findings"]]
     errors = [r for r in triggered if r["severity"] == "error"]
     warnings = [r for r in triggered if r["severity"] == "warning"]
 
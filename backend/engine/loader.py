@@ -1,6 +1,10 @@
 import json
 from pathlib import Path
 
+from engine.cache import CachedPack, RulePackCache, stamp_file
+from engine.compiler import compile_pack
+from engine.schema import RuleSchemaError
+
 RULES_BASE_PATH = Path(__file__).resolve().parent / "rules"
 
 
@@ -8,3 +12,68 @@ def load_ruleset(standard_slug: str) -> dict:
     rules_path = RULES_BASE_PATH / standard_slug / "rules.json"
     with rules_path.open("r", encoding="utf-8") as file:
         return json.load(file)
+
+
+def field_key(variable: str) -> str:
+    """One path segment for a flat legacy key: rule pack paths split on dots, legacy variable names may hold them."""
+    return variable.replace("~", "~0").replace(".", "~1")
+
+
+def flat_payload(payload: dict) -> dict:
+    """``payload`` with its keys as ``field_key`` segments; returned as-is when no key needs escaping."""
+    if not any("." in key or "~" in key for key in payload):
+        return payload
+    return {field_key(key): value for key, value in payload.items()}
+
+
+def translate_rule(rule: dict) -> dict:
+    """Legacy ``trigger``/``effect`` rule -> rule pack rule (``changed``/``eq`` predicates and an add_finding)."""
+    trigger = rule.get("trigger", {})
+    variable = trigger.get("variable")
+    if not rule.get("id") or not variable:
+        raise RuleSchemaError(f"Legacy rule {rule.get('id')!r} needs an id and a trigger.variable")
+
+    predicates = []
+    if trigger.get("change"):
+        predicates.append({"field": field_key(variable), "op": "changed", "value": True})
+    if "equals" in trigger:
+        predicates.append({"field": field_key(variable), "op": "eq", "value": trigger["equals"]})
+
+    severity = "ERROR" if rule.get("effect", {}).get("require_new_test") else "WARNING"
+    return {
+        "id": rule["id"],
+        "when": {"all": predicates},
+        "then": {
+            "add_finding": {
+                "severity": severity,
+                "field": variable,
+                "message": rule.get("message", "Rule triggered"),
+                "reference": rule.get("reference"),
+            }
+        },
+    }
+
+
+def translate_ruleset(ruleset: dict) -> dict:
+    """Rule pack equivalent of a legacy ruleset; evaluate it against ``flat_payload`` of the legacy payloads."""
+    return {
+        "standard": ruleset.get("standard", ""),
+        "part": "",
+        "version": ruleset.get("version", ""),
+        "scope": ruleset.get("scope", ""),
+        "variables": [],
+        "rules": [translate_rule(rule) for rule in ruleset.get("rules", [])],
+        "ranges": [],
+        "tests": [],
+        "validations": [],
+    }
+
+
+class LegacyRulesetCache(RulePackCache):
+    """RulePackCache keyed by standard slug that translates ``<slug>/rules.json`` from the legacy format."""
+
+    def _build(self, standard_slug: str) -> CachedPack:
+        path = self.rules_root / standard_slug / "rules.json"
+        sources = {path: stamp_file(path)}
+        pack = translate_ruleset(json.loads(path.read_text(encoding="utf-8")))
+        return CachedPack(pack=pack, compiled=compile_pack(pack), sources=sources)
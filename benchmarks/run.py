@@ -0,0 +1,222 @@
+"""Benchmark the loader, compiler, evaluator and DRF endpoint on synthetic packs.
+
+    python -m benchmarks.run --rules 5000 --include-depth 4 --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.15
+
+With ``--baseline``, every case whose median time grew by more than ``--threshold`` (relative) is reported
+as a regression and the command exits with status 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import payload_corpus, write_synthetic_tree  # noqa: E402
+from engine import RuleEvaluator, RulePackCache, RulePackLoader, compile_pack  # noqa: E402
+from engine.schema import clear_validation_cache  # noqa: E402
+
+DEFAULT_THRESHOLD = 0.15
+
+
+def time_case(func: Callable[[], Any], repeat: int, number: int = 1, setup: Callable[[], Any] | None = None) -> dict[str, Any]:
+    """Run ``func`` ``number`` times per sample, ``repeat`` samples; times are seconds per call."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((perf_counter() - started) / number)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min": samples[0],
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p95": samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def compare(cases: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], threshold: float) -> list[dict[str, Any]]:
+    """Median-to-median ratios against ``baseline``; cases missing on either side are ignored."""
+    comparison = []
+    for name, stats in sorted(cases.items()):
+        previous = baseline.get(name)
+        if not previous or "median" not in stats or not previous.get("median"):
+            continue
+        ratio = stats["median"] / previous["median"]
+        comparison.append({
+            "case": name,
+            "baseline": previous["median"],
+            "current": stats["median"],
+            "ratio": ratio,
+            "regressed": ratio > 1 + threshold,
+        })
+    return comparison
+
+
+@contextmanager
+def _api_client(rules_root: Path, settings_module: str):
+    sys.path.insert(0, str(ROOT / "backend"))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+    from unittest import mock
+
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    # The endpoint resolves packs through the process-wide cache rooted at settings.RULES_ROOT; point it at the
+    # synthetic tree and disable result memoization/profiling so every request really evaluates.
+    with mock.patch.multiple("core.views", RULE_PACKS=RulePackCache(rules_root), RESULT_CACHE=None, PROFILER=None):
+        yield Client()
+
+
+def run(options: argparse.Namespace) -> dict[str, Any]:
+    cases: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="rule-bench-") as tmp:
+        rules_root = Path(tmp)
+        pack_path = write_synthetic_tree(
+            rules_root,
+            rules=options.rules,
+            include_depth=options.include_depth,
+            seed=options.seed,
+            regex_ratio=options.regex_ratio,
+            in_size=options.in_size,
+        )
+        payloads, previous = payload_corpus(options.payloads, seed=options.seed)
+        repeat = options.repeat
+
+        cases["loader.load"] = time_case(
+            lambda: RulePackLoader(rules_root).load(pack_path), repeat, setup=clear_validation_cache
+        )
+        pack = RulePackLoader(rules_root).load(pack_path)
+        cases["compiler.compile_pack"] = time_case(lambda: compile_pack(pack), repeat)
+
+        evaluator = RuleEvaluator(compile_pack(pack))
+
+        def evaluate_each():
+            for payload, previous_payload in zip(payloads, previous):
+                evaluator.evaluate(payload, previous_payload=previous_payload)
+
+        stats = time_case(evaluate_each, repeat)
+        cases["evaluator.evaluate"] = {**stats, **{k: stats[k] / len(payloads) for k in ("min", "median", "mean", "p95", "stdev")}}
+        cases["evaluator.evaluate_many"] = time_case(lambda: list(evaluator.evaluate_many(payloads, previous)), repeat)
+
+        try:
+            from engine.vectorized import ColumnarEvaluator
+
+            columnar = ColumnarEvaluator(evaluator.plan)
+        except (ImportError, RuntimeError) as exc:
+            cases["vectorized.evaluate_batch"] = {"skipped": str(exc)}
+        else:
+            cases["vectorized.evaluate_batch"] = time_case(lambda: columnar.evaluate_batch(payloads, previous), repeat)
+
+        if options.skip_api:
+            cases["api.rules_evaluate"] = {"skipped": "--skip-api"}
+        else:
+            try:
+                with _api_client(rules_root, options.django_settings) as client:
+                    from django.urls import reverse
+
+                    url = reverse("rules-evaluate")
+                    bodies = [
+                        json.dumps({"rule_pack": pack_path, "payload": p, **({"previous_payload": q} if q else {})})
+                        for p, q in zip(payloads[: options.api_requests], previous[: options.api_requests])
+                    ]
+
+                    def post_all():
+                        for body in bodies:
+                            response = client.post(url, data=body, content_type="application/json")
+                            if response.status_code != 200:
+                                raise RuntimeError(f"rules-evaluate returned {response.status_code}: {response.content[:200]!r}")
+
+                    stats = time_case(post_all, repeat)
+                    cases["api.rules_evaluate"] = {
+                        **stats, **{k: stats[k] / len(bodies) for k in ("min", "median", "mean", "p95", "stdev")}
+                    }
+            except ImportError as exc:
+                cases["api.rules_evaluate"] = {"skipped": str(exc)}
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "rules": options.rules,
+            "include_depth": options.include_depth,
+            "regex_ratio": options.regex_ratio,
+            "in_size": options.in_size,
+            "payloads": options.payloads,
+            "seed": options.seed,
+        },
+        "cases": cases,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=1000, help="Rules across the whole include chain (e.g. 100 to 50000).")
+    parser.add_argument("--include-depth", type=int, default=3, help="Number of nested includes below the top pack.")
+    parser.add_argument("--regex-ratio", type=float, default=0.25, help="Share of predicates using the regex operator.")
+    parser.add_argument("--in-size", type=int, default=50, help="Values per `in` predicate.")
+    parser.add_argument("--payloads", type=int, default=200, help="Payloads per evaluation sample.")
+    parser.add_argument("--api-requests", type=int, default=50, help="Requests per API sample.")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per case.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-api", action="store_true", help="Do not benchmark the DRF endpoint.")
+    parser.add_argument("--django-settings", default="config.settings", help="Settings module for the API case.")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", type=Path, help="Previous --output file to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative slowdown of the median.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    options = build_parser().parse_args(argv)
+    if options.rules < 1 or options.payloads < 1 or options.repeat < 1 or options.include_depth < 0:
+        build_parser().error("--rules, --payloads and --repeat must be positive and --include-depth non-negative.")
+    results = run(options)
+
+    regressions = []
+    if options.baseline:
+        baseline = json.loads(options.baseline.read_text(encoding="utf-8"))
+        results["comparison"] = compare(results["cases"], baseline.get("cases", {}), options.threshold)
+        results["threshold"] = options.threshold
+        regressions = [row for row in results["comparison"] if row["regressed"]]
+
+    for name, stats in results["cases"].items():
+        if "skipped" in stats:
+            print(f"{name:28} skipped: {stats['skipped']}")
+        else:
+            print(f"{name:28} median {stats['median'] * 1000:10.3f} ms  p95 {stats['p95'] * 1000:10.3f} ms")
+    for row in results.get("comparison", []):
+        flag = "REGRESSION" if row["regressed"] else "ok"
+        print(f"{row['case']:28} x{row['ratio']:.2f} vs baseline  {flag}")
+
+    if options.output:
+        options.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
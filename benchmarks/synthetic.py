@@ -0,0 +1,172 @@
+"""Deterministic synthetic rule packs and payload corpora for the benchmark suite."""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+DOC_TYPES = ["PQR", "WPS", "WPQ", "pressure_dossier", "quality_dossier"]
+NUMERIC_FIELDS = [f"inputs.n{i}" for i in range(24)]
+CODE_FIELDS = [f"inputs.c{i}" for i in range(16)]
+CODE_PATTERNS = [r"^W[0-9]{2}-(A|B)[0-9]*$", r"^(135|141|111)/[A-Z]+$", r"[0-9]{3}X$", r"^P[A-F]-?\d{1,3}"]
+METADATA = {
+    "source": "synthetic",
+    "compiled_by": "benchmarks",
+    "compiled_at": "1970-01-01",
+    "coverage_notes": "Generated for benchmarking only.",
+    "copyright_notice": "Synthetic data.",
+}
+
+
+def _code_value(rng: random.Random) -> str:
+    return rng.choice([
+        f"W{rng.randint(0, 99):02d}-{rng.choice('AB')}{rng.randint(0, 9)}",
+        f"{rng.choice(['135', '141', '111'])}/{rng.choice(['FM', 'SS', 'CS'])}",
+        f"{rng.randint(100, 999)}X",
+        f"V{rng.randint(0, 499)}",
+    ])
+
+
+def _predicate(rng: random.Random, regex_ratio: float, in_size: int) -> dict[str, Any]:
+    roll = rng.random()
+    if roll < regex_ratio:
+        return {"field": rng.choice(CODE_FIELDS), "op": "regex", "value": rng.choice(CODE_PATTERNS)}
+    if roll < regex_ratio + 0.25:
+        return {"field": rng.choice(CODE_FIELDS), "op": "in", "value": [f"V{rng.randint(0, 499)}" for _ in range(in_size)]}
+    op = rng.choice(["eq", "neq", "gt", "gte", "lt", "lte", "exists", "changed"])
+    field = rng.choice(NUMERIC_FIELDS)
+    if op in ("exists", "changed"):
+        return {"field": field, "op": op, "value": rng.random() < 0.8}
+    return {"field": field, "op": op, "value": rng.randint(0, 100)}
+
+
+def _condition(rng: random.Random, regex_ratio: float, in_size: int) -> dict[str, Any]:
+    predicates = [_predicate(rng, regex_ratio, in_size) for _ in range(rng.randint(1, 4))]
+    mode = rng.choice(["all", "all", "any"])
+    condition = {mode: predicates}
+    return {"not": condition} if rng.random() < 0.05 else condition
+
+
+def _applies_to(rng: random.Random) -> dict[str, Any]:
+    if rng.random() < 0.4:
+        return {}
+    return {"applies_to": rng.sample(DOC_TYPES, rng.randint(1, 2))}
+
+
+def synthetic_pack(
+    name: str,
+    rules: int,
+    includes: list[str] | None = None,
+    seed: int = 0,
+    regex_ratio: float = 0.25,
+    in_size: int = 50,
+) -> dict[str, Any]:
+    """One schema-valid pack with ``rules`` rules plus proportional tests, ranges and validations."""
+    rng = random.Random(f"{name}:{seed}")
+    pack: dict[str, Any] = {
+        "standard": name.upper(),
+        "part": "1",
+        "version": "synthetic",
+        "scope": "benchmark",
+        "metadata": dict(METADATA),
+        "definitions": {"doc_types": DOC_TYPES},
+        "variables": [],
+        "rules": [],
+        "ranges": [],
+        "tests": [],
+        "validations": [],
+    }
+    if includes:
+        pack["includes"] = list(includes)
+    for index in range(rules):
+        then: dict[str, Any] = {
+            "add_finding": {
+                "severity": rng.choice(["ERROR", "WARNING", "INFO"]),
+                "field": rng.choice(NUMERIC_FIELDS),
+                "message": f"{name} rule {index}",
+                "reference": "synthetic",
+                "needs_verification": False,
+            }
+        }
+        if rng.random() < 0.1:
+            then["invalidate"] = True
+        pack["rules"].append({"id": f"{name}_rule_{index}", **_applies_to(rng), "when": _condition(rng, regex_ratio, in_size), "then": then})
+    for index in range(max(1, rules // 10)):
+        pack["tests"].append({
+            "id": f"{name}_test_{index}",
+            **_applies_to(rng),
+            "when": _condition(rng, regex_ratio, in_size),
+            "require": [f"test_{rng.randint(0, 20)}"],
+        })
+    for index in range(max(1, rules // 50)):
+        pack["ranges"].append({
+            "id": f"{name}_range_{index}",
+            **_applies_to(rng),
+            "when": {"all": [{"field": NUMERIC_FIELDS[index % len(NUMERIC_FIELDS)], "op": "exists", "value": True}]},
+            "compute": {
+                "output_field": f"computed.{name}_range_{index}",
+                "expression": f"RANGE_THICKNESS({NUMERIC_FIELDS[index % len(NUMERIC_FIELDS)]}, context.product_form)",
+            },
+        })
+    for index in range(max(1, rules // 100)):
+        pack["validations"].append({
+            "id": f"{name}_validation_{index}",
+            **_applies_to(rng),
+            "require_fields": rng.sample(NUMERIC_FIELDS + CODE_FIELDS, 3),
+            "severity": rng.choice(["ERROR", "WARNING"]),
+            "message": "missing fields",
+        })
+    return pack
+
+
+def write_synthetic_tree(
+    root: Path | str,
+    rules: int = 1000,
+    include_depth: int = 3,
+    seed: int = 0,
+    regex_ratio: float = 0.25,
+    in_size: int = 50,
+) -> str:
+    """Write a chain of ``include_depth + 1`` packs sharing ``rules`` rules and return the top pack's path."""
+    root = Path(root)
+    levels = include_depth + 1
+    per_level = [rules // levels + (1 if index < rules % levels else 0) for index in range(levels)]
+    include = None
+    for level in reversed(range(levels)):
+        name = f"synthetic_{level}"
+        pack = synthetic_pack(name, per_level[level], [include] if include else None, seed, regex_ratio, in_size)
+        target = root / name / "rules.json"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(pack), encoding="utf-8")
+        include = f"{name}/rules.json"
+    return include
+
+
+def payload_corpus(count: int, seed: int = 0) -> tuple[list[dict[str, Any]], list[dict[str, Any] | None]]:
+    """``count`` payloads over the synthetic fields, each paired with a previous version (or None)."""
+    rng = random.Random(seed)
+    payloads, previous = [], []
+    for _ in range(count):
+        inputs: dict[str, Any] = {}
+        for field in NUMERIC_FIELDS:
+            if rng.random() < 0.9:
+                inputs[field.split(".", 1)[1]] = rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 2)])
+        for field in CODE_FIELDS:
+            if rng.random() < 0.9:
+                inputs[field.split(".", 1)[1]] = _code_value(rng)
+        payload = {
+            "doc_type": rng.choice(DOC_TYPES),
+            "context": {"product_form": rng.choice(["plate", "pipe"])},
+            "inputs": inputs,
+        }
+        payloads.append(payload)
+        if rng.random() < 0.5:
+            changed = json.loads(json.dumps(payload))
+            for key in rng.sample(sorted(inputs), min(3, len(inputs))):
+                changed["inputs"][key] = rng.randint(0, 100)
+            previous.append(changed)
+        else:
+            previous.append(None)
+    return payloads, previous
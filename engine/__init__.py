@@ -1,6 +1,19 @@
 """Standalone declarative rule engine for welding qualification workflows."""
 
+from .cache import RulePackCache
+from .compiler import CompiledPack, compile_pack
 from .evaluator import RuleEvaluator
 from .loader import RulePackLoader
+from .memo import EvaluationCache, InProcessResultBackend
+from .profiling import EvaluationProfiler
 
-__all__ = ["RuleEvaluator", "RulePackLoader"]
+__all__ = [
+    "CompiledPack",
+    "EvaluationCache",
+    "EvaluationProfiler",
+    "InProcessResultBackend",
+    "RuleEvaluator",
+    "RulePackCache",
+    "RulePackLoader",
+    "compile_pack",
+]
@@ -0,0 +1,240 @@
+"""Streaming validation of legacy qualification archives (NDJSON or CSV) against a rule pack.
+
+Records are read lazily, mapped to payloads, evaluated in fixed-size chunks (optionally across worker processes,
+with a bounded number of chunks in flight) and written back as NDJSON in input order, so memory stays flat
+regardless of the archive size.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import re
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any
+
+from .cache import RulePackCache
+from .evaluator import RuleEvaluator
+
+PAYLOAD_ROOTS = ("inputs", "context", "history")
+TEXT_VARIABLE_TYPES = ("select", "string", "date", "text")
+_NUMBER = re.compile(r"-?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+_INTEGER = re.compile(r"-?\d+")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class ArchiveRecordError(ValueError):
+    pass
+
+
+def detect_format(path: str) -> str:
+    return "csv" if Path(path).suffix.lower() == ".csv" else "ndjson"
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict[str, Any] | ArchiveRecordError]]:
+    """Yield ``(line_number, record)``; unparsable NDJSON lines yield an ArchiveRecordError instead."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, ArchiveRecordError(f"invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ArchiveRecordError("record is not a JSON object")
+            continue
+        yield line_number, record
+
+
+def coerce(value: Any) -> Any:
+    """Spreadsheet cells arrive as text: map empty cells to None and numeric/boolean text to numbers/booleans."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if not text:
+        return None
+    if text.lower() in _LITERALS:
+        return _LITERALS[text.lower()]
+    if _INTEGER.fullmatch(text):
+        return int(text)
+    if _NUMBER.fullmatch(text):
+        return float(text)
+    return text
+
+
+def text_fields(pack: dict[str, Any]) -> frozenset[str]:
+    """Variables the pack declares as text, whose cells must not be coerced (process "135" stays a string)."""
+    return frozenset(v["id"] for v in pack.get("variables", []) if v.get("type") in TEXT_VARIABLE_TYPES)
+
+
+def _set_path(payload: dict[str, Any], path: str, value: Any) -> None:
+    *parents, leaf = path.split(".")
+    target = payload
+    for part in parents:
+        child = target.get(part)
+        if not isinstance(child, dict):
+            child = target[part] = {}
+        target = child
+    target[leaf] = value
+
+
+def build_payload(
+    record: dict[str, Any],
+    mapping: dict[str, str],
+    doc_type: str | None = None,
+    coerce_values: bool = True,
+    keep_text: frozenset[str] = frozenset(),
+) -> tuple[Any, dict[str, Any]]:
+    """Map one archive record to ``(record_id, payload)``.
+
+    Records with a ``payload`` object are used as is. Otherwise every column goes to ``mapping[column]`` when
+    mapped, to itself when already rooted at ``inputs.``/``context.``/``history.`` and to ``inputs.<column>``
+    otherwise; ``doc_type`` and ``id`` columns are kept at the top level. Empty cells are dropped and, unless the
+    target's last segment is in ``keep_text``, numeric/boolean text is coerced.
+    """
+    if isinstance(record.get("payload"), dict):
+        payload = dict(record["payload"])
+        payload.setdefault("doc_type", doc_type)
+        return record.get("id"), payload
+
+    payload: dict[str, Any] = {}
+    record_id = None
+    for column, raw in record.items():
+        if column is None:  # CSV row with more cells than headers
+            continue
+        target = mapping.get(column)
+        if target is None:
+            if column in ("id", "doc_type") or column.split(".", 1)[0] in PAYLOAD_ROOTS:
+                target = column
+            else:
+                target = f"inputs.{column}"
+        if coerce_values and target.rsplit(".", 1)[-1] not in keep_text:
+            value = coerce(raw)
+        else:
+            value = (raw.strip() or None) if isinstance(raw, str) else raw
+        if target == "id":
+            record_id = value
+            continue
+        if value is None:
+            continue
+        _set_path(payload, target, value)
+    payload.setdefault("doc_type", doc_type)
+    return record_id, payload
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+_WORKER_EVALUATOR: RuleEvaluator | None = None
+
+
+def _init_worker(rules_root: str, rule_pack: str) -> None:
+    global _WORKER_EVALUATOR
+    _WORKER_EVALUATOR = RuleEvaluator(RulePackCache(rules_root).compiled(rule_pack), debug=True)
+
+
+def evaluate_chunk(chunk: list[tuple[int, Any, dict[str, Any] | str]], evaluator: RuleEvaluator | None = None) -> list[dict[str, Any]]:
+    """Evaluate ``(line, record_id, payload-or-error)`` items; evaluation errors become error rows."""
+    evaluator = evaluator or _WORKER_EVALUATOR
+    rows = []
+    for line, record_id, payload in chunk:
+        if isinstance(payload, str):
+            rows.append({"line": line, "id": record_id, "error": payload})
+            continue
+        try:
+            result = evaluator.evaluate(payload)
+        except Exception as exc:
+            rows.append({"line": line, "id": record_id, "error": f"{type(exc).__name__}: {exc}"})
+            continue
+        rows.append({"line": line, "id": record_id, **result})
+    return rows
+
+
+class ArchiveSummary:
+    def __init__(self):
+        self.records = 0
+        self.statuses: Counter[str] = Counter()
+        self.rules: Counter[str] = Counter()
+
+    def add(self, row: dict[str, Any]) -> None:
+        self.records += 1
+        if "error" in row:
+            self.statuses["ERROR"] += 1
+            return
+        self.statuses[row["status"]] += 1
+        fired = set(row.get("debug", {}).get("triggered_rules", ()))
+        fired.update(finding.get("rule_id") for finding in row["findings"])
+        self.rules.update(fired)
+
+    def as_dict(self, top: int = 10) -> dict[str, Any]:
+        return {
+            "records": self.records,
+            "statuses": dict(sorted(self.statuses.items())),
+            "top_rules": [{"rule_id": rule_id, "count": count} for rule_id, count in self.rules.most_common(top)],
+        }
+
+
+def validate_archive(
+    records: Iterable[tuple[int, dict[str, Any] | ArchiveRecordError]],
+    rules_root: Path | str,
+    rule_pack: str,
+    output: IO[str],
+    mapping: dict[str, str] | None = None,
+    doc_type: str | None = None,
+    workers: int = 1,
+    chunk_size: int = 500,
+    debug: bool = False,
+    coerce_values: bool = True,
+) -> ArchiveSummary:
+    """Evaluate ``records`` and write one NDJSON result row per record to ``output``, in input order."""
+    mapping = mapping or {}
+    plan = RulePackCache(rules_root).compiled(rule_pack)
+    keep_text = text_fields(plan.pack)
+
+    def tasks() -> Iterator[tuple[int, Any, dict[str, Any] | str]]:
+        for line, record in records:
+            if isinstance(record, ArchiveRecordError):
+                yield line, None, str(record)
+                continue
+            record_id, payload = build_payload(record, mapping, doc_type, coerce_values, keep_text)
+            yield line, record_id, payload
+
+    summary = ArchiveSummary()
+
+    def emit(rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            summary.add(row)
+            if not debug:
+                row.pop("debug", None)
+            output.write(json.dumps(row, default=str) + "\n")
+
+    chunks = chunked(tasks(), chunk_size)
+    if workers <= 1:
+        evaluator = RuleEvaluator(plan, debug=True)
+        for chunk in chunks:
+            emit(evaluate_chunk(chunk, evaluator))
+        return summary
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(rules_root), rule_pack)) as pool:
+        # At most two chunks per worker are read ahead, so memory does not grow with the archive.
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(evaluate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return summary
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import struct
+from dataclasses import astuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from . import loader, schema
+from .cache import FileStamp, stamp_file
+from .hashing import content_hash
+from .loader import RulePackLoader
+
+ARTIFACT_SUFFIX = ".compiled"
+FORMAT_VERSION = 1
+_MAGIC = b"WRPK"
+_HEADER = struct.Struct(">4sH32s")
+
+
+class ArtifactError(ValueError):
+    pass
+
+
+@lru_cache(maxsize=1)
+def engine_version() -> str:
+    """SHA-256 of the JSON schema and the loader/validator sources: the code that produced an aggregated pack."""
+    digest = hashlib.sha256()
+    for path in (schema.SCHEMA_PATH, Path(schema.__file__), Path(loader.__file__)):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class _DataUnpickler(pickle.Unpickler):
+    """Artifacts only hold dicts, lists, tuples and scalars: refuse any global, so a planted file cannot run code."""
+
+    def find_class(self, module: str, name: str):
+        raise pickle.UnpicklingError(f"artifact references {module}.{name}")
+
+
+def artifact_path(rules_root: Path | str, relative_rule_path: str) -> Path:
+    return Path(rules_root) / Path(relative_rule_path).with_suffix(ARTIFACT_SUFFIX)
+
+
+def build_artifact(rules_root: Path | str, relative_rule_path: str) -> Path:
+    """Resolve includes/overrides, validate once and write ``<pack>.compiled`` next to the pack.
+
+    The artifact is a pickle of the aggregated pack plus the stamps of every source file and the
+    ``engine_version()`` that built it, behind a header carrying the format version and the SHA-256 of the body,
+    which is checked before unpickling. Unpickling only rebuilds plain containers and scalars; a body referencing
+    any class or function is rejected.
+    """
+    root = Path(rules_root)
+    loader = RulePackLoader(root)
+    pack = loader.load(relative_rule_path)
+    body = pickle.dumps(
+        {
+            "relative_path": relative_rule_path,
+            "engine_version": engine_version(),
+            "content_hash": content_hash(pack),
+            "pack": pack,
+            "sources": {
+                os.path.relpath(path, root.resolve()): astuple(stamp_file(path))
+                for path in sorted(loader.loaded_files)
+            },
+        },
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    target = artifact_path(root, relative_rule_path)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    with tmp.open("wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, hashlib.sha256(body).digest()))
+        handle.write(body)
+    tmp.replace(target)
+    return target
+
+
+def read_artifact(path: Path | str, rules_root: Path | str) -> tuple[dict[str, Any], dict[Path, FileStamp]]:
+    """Memory-map an artifact and return ``(pack, sources)``; raises ArtifactError if it is unusable."""
+    root = Path(rules_root).resolve()
+    try:
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < _HEADER.size:
+                raise ArtifactError(f"{path}: truncated artifact")
+            magic, version, digest = _HEADER.unpack_from(mapped)
+            if magic != _MAGIC or version != FORMAT_VERSION:
+                raise ArtifactError(f"{path}: unsupported artifact format {magic!r} v{version}")
+            with memoryview(mapped)[_HEADER.size:] as body:
+                if hashlib.sha256(body).digest() != digest:
+                    raise ArtifactError(f"{path}: content hash mismatch")
+                data = _DataUnpickler(io.BytesIO(body)).load()
+        if data["engine_version"] != engine_version():
+            raise ArtifactError(f"{path}: built by another engine version")
+        pack = data["pack"]
+        if not isinstance(pack, dict):
+            raise ArtifactError(f"{path}: malformed artifact body")
+        sources = {root / relative: FileStamp(*stamp) for relative, stamp in data["sources"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, pickle.UnpicklingError) as exc:
+        if isinstance(exc, ArtifactError):
+            raise
+        raise ArtifactError(f"{path}: malformed artifact: {exc!r}") from exc
+    return pack, sources
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .compiler import CompiledPack, compile_pack
+from .loader import RulePackLoader, discover_rule_packs
+from .schema import RuleSchemaError
+
+
+@dataclass(frozen=True)
+class FileStamp:
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def stamp_file(path: Path) -> FileStamp:
+    stat = os.stat(path)
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    return FileStamp(mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha256=digest)
+
+
+@dataclass(frozen=True)
+class PackLoadStat:
+    path: str
+    seconds: float
+    rss_bytes: int | None  # growth of the process RSS while loading; None where it cannot be read
+
+
+def resident_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class CachedPack:
+    pack: dict[str, Any]
+    compiled: CompiledPack
+    sources: dict[Path, FileStamp]
+
+    def is_fresh(self) -> bool:
+        for path, stamp in self.sources.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            if stat.st_mtime_ns == stamp.mtime_ns and stat.st_size == stamp.size:
+                continue
+            # Touched but possibly unchanged (checkout, copy): compare content before reloading.
+            try:
+                current = stamp_file(path)
+            except OSError:
+                return False
+            if current.sha256 != stamp.sha256:
+                return False
+            self.sources[path] = current
+        return True
+
+
+class RulePackCache:
+    """Process-wide LRU of loaded and compiled rule packs, invalidated when any source file changes."""
+
+    def __init__(self, rules_root: Path | str, maxsize: int = 32, validate_includes: bool = True):
+        self.rules_root = Path(rules_root)
+        self.maxsize = maxsize
+        self.validate_includes = validate_includes
+        self._entries: OrderedDict[str, CachedPack] = OrderedDict()
+        self._lock = threading.Lock()
+        self._path_locks: dict[str, threading.Lock] = {}
+
+    def _path_lock(self, relative_rule_path: str) -> threading.Lock:
+        with self._lock:
+            return self._path_locks.setdefault(relative_rule_path, threading.Lock())
+
+    def _lookup(self, relative_rule_path: str) -> CachedPack | None:
+        with self._lock:
+            entry = self._entries.get(relative_rule_path)
+            if entry is not None:
+                self._entries.move_to_end(relative_rule_path)
+            return entry
+
+    def _store(self, relative_rule_path: str, entry: CachedPack) -> None:
+        with self._lock:
+            self._entries[relative_rule_path] = entry
+            self._entries.move_to_end(relative_rule_path)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._path_locks.pop(evicted, None)
+
+    def _from_artifact(self, relative_rule_path: str) -> CachedPack | None:
+        from .artifact import ArtifactError, artifact_path, read_artifact
+
+        path = artifact_path(self.rules_root, relative_rule_path)
+        if not path.exists():
+            return None
+        try:
+            pack, sources = read_artifact(path, self.rules_root)
+        except ArtifactError:
+            return None
+        entry = CachedPack(pack=pack, compiled=compile_pack(pack), sources=sources)
+        # A stale artifact (sources edited after `compile`) falls back to the JSON files.
+        return entry if entry.is_fresh() else None
+
+    def _build(self, relative_rule_path: str) -> CachedPack:
+        entry = self._from_artifact(relative_rule_path)
+        if entry is not None:
+            return entry
+        loader = RulePackLoader(self.rules_root, validate_includes=self.validate_includes)
+        pack = loader.load(relative_rule_path)
+        sources = {path: stamp_file(path) for path in loader.loaded_files}
+        return CachedPack(pack=pack, compiled=compile_pack(pack), sources=sources)
+
+    def pack_file(self, relative_rule_path: str) -> Path:
+        """``rules_root / relative_rule_path``, refusing paths (``..``, absolute, symlinks) that leave the root."""
+        root = self.rules_root.resolve()
+        path = (root / relative_rule_path).resolve()
+        if not path.is_relative_to(root):
+            raise RuleSchemaError(f"Rule pack path outside the rules root: {relative_rule_path!r}")
+        return path
+
+    def entry(self, relative_rule_path: str) -> CachedPack:
+        entry = self._lookup(relative_rule_path)
+        if entry is not None and entry.is_fresh():
+            return entry
+        # Serialize rebuilds per pack so concurrent requests don't all parse the same files.
+        with self._path_lock(relative_rule_path):
+            entry = self._lookup(relative_rule_path)
+            if entry is not None and entry.is_fresh():
+                return entry
+            self.pack_file(relative_rule_path)
+            entry = self._build(relative_rule_path)
+            self._store(relative_rule_path, entry)
+            return entry
+
+    def preload(self, packs: list[str] | None = None) -> list[PackLoadStat]:
+        """Load and compile ``packs`` (default: every pack under ``rules_root``) now, e.g. before forking workers.
+
+        The cache grows to hold all of them; the first pack that fails raises ``RuleSchemaError`` naming it.
+        """
+        packs = discover_rule_packs(self.rules_root) if packs is None else packs
+        self.maxsize = max(self.maxsize, len(packs))
+        stats = []
+        for relative_rule_path in packs:
+            rss_before, started = resident_bytes(), time.perf_counter()
+            try:
+                self.entry(relative_rule_path)
+            except Exception as exc:
+                raise RuleSchemaError(f"{relative_rule_path}: {exc}") from exc
+            seconds, rss_after = time.perf_counter() - started, resident_bytes()
+            rss = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            stats.append(PackLoadStat(relative_rule_path, seconds, rss))
+        return stats
+
+    def load(self, relative_rule_path: str) -> dict[str, Any]:
+        return self.entry(relative_rule_path).pack
+
+    def compiled(self, relative_rule_path: str) -> CompiledPack:
+        return self.entry(relative_rule_path).compiled
+
+    def invalidate(self, relative_rule_path: str | None = None) -> None:
+        with self._lock:
+            if relative_rule_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(relative_rule_path, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+from .archive import detect_format, read_records, validate_archive
+from .artifact import build_artifact
+from .impact import pack_impacts
+from .loader import discover_rule_packs
+
+DEFAULT_RULES_ROOT = Path(__file__).resolve().parents[1] / "rules"
+
+
+def compile_packs(args: argparse.Namespace) -> int:
+    packs = args.packs or discover_rule_packs(args.rules_root)
+    for relative_rule_path in packs:
+        target = build_artifact(args.rules_root, relative_rule_path)
+        print(f"{relative_rule_path} -> {target}")
+    return 0
+
+
+def _mapping(args: argparse.Namespace) -> dict[str, str]:
+    mapping = json.loads(args.mapping.read_text(encoding="utf-8")) if args.mapping else {}
+    for item in args.map:
+        column, sep, target = item.partition("=")
+        if not sep or not column or not target:
+            raise SystemExit(f"--map expects COLUMN=FIELD, got {item!r}")
+        mapping[column] = target
+    return mapping
+
+
+def validate_archive_command(args: argparse.Namespace) -> int:
+    if args.workers < 1 or args.chunk_size < 1:
+        raise SystemExit("--workers and --chunk-size must be positive.")
+    fmt = args.format or detect_format(args.archive)
+    with ExitStack() as stack:
+        if args.archive == "-":
+            source = sys.stdin
+        else:
+            source = stack.enter_context(open(args.archive, encoding="utf-8", newline=""))
+        output = stack.enter_context(args.output.open("w", encoding="utf-8")) if args.output else sys.stdout
+        summary = validate_archive(
+            read_records(source, fmt),
+            args.rules_root,
+            args.rule_pack,
+            output,
+            mapping=_mapping(args),
+            doc_type=args.doc_type,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            debug=args.debug,
+            coerce_values=not args.no_coerce,
+        )
+    print(json.dumps(summary.as_dict(args.top), indent=2), file=sys.stderr)
+    return 0
+
+
+def impact_command(args: argparse.Namespace) -> int:
+    impacts = pack_impacts(args.old_rules_root, args.rules_root, args.packs or None)
+    report = {pack: impact.as_dict() for pack, impact in impacts.items() if impact or args.all}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m engine.cli", description="Rule pack tooling.")
+    parser.add_argument("--rules-root", type=Path, default=DEFAULT_RULES_ROOT)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile", help="Write validated <pack>.compiled artifacts.")
+    compile_parser.add_argument("packs", nargs="*", help="Relative pack paths; defaults to every */rules.json.")
+    compile_parser.set_defaults(handler=compile_packs)
+
+    archive_parser = commands.add_parser(
+        "validate-archive",
+        help="Evaluate an NDJSON/CSV archive, streaming NDJSON results to stdout and a summary to stderr.",
+    )
+    archive_parser.add_argument("rule_pack", help="Relative pack path, e.g. iso_9606_1/rules.json.")
+    archive_parser.add_argument("archive", help="NDJSON or CSV file, or - to read stdin (NDJSON unless --format csv).")
+    archive_parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension.")
+    archive_parser.add_argument("--map", action="append", default=[], metavar="COLUMN=FIELD", help="e.g. Processo=inputs.process")
+    archive_parser.add_argument("--mapping", type=Path, help="JSON object of column -> payload field.")
+    archive_parser.add_argument("--doc-type", help="doc_type for records that do not carry one.")
+    archive_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    archive_parser.add_argument("--chunk-size", type=int, default=500)
+    archive_parser.add_argument("--output", type=Path, help="Write NDJSON results here instead of stdout.")
+    archive_parser.add_argument("--top", type=int, default=10, help="Firing rule ids listed in the summary.")
+    archive_parser.add_argument("--debug", action="store_true", help="Keep debug.triggered_rules in each row.")
+    archive_parser.add_argument("--no-coerce", action="store_true", help="Keep CSV cells as strings.")
+    archive_parser.set_defaults(handler=validate_archive_command)
+
+    impact_parser = commands.add_parser(
+        "impact", help="List entries, fields and doc types changed between an older rules tree and --rules-root."
+    )
+    impact_parser.add_argument("--old-rules-root", type=Path, required=True, help="Rules tree before the edit.")
+    impact_parser.add_argument("packs", nargs="*", help="Relative pack paths; defaults to every */rules.json in either tree.")
+    impact_parser.add_argument("--all", action="store_true", help="Also list packs without changes.")
+    impact_parser.set_defaults(handler=impact_command)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,572 @@
+from __future__ import annotations
+
+import heapq
+import re
+from collections.abc import Hashable
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Callable
+
+from .hashing import canonical_json, content_hash
+from .schema import RuleSchemaError
+
+if TYPE_CHECKING:
+    from .evaluator import EvalContext
+    from .expressions import CompiledExpression
+
+Test = Callable[["EvalContext"], bool]
+SECTIONS = ("validations", "rules", "tests", "ranges")
+
+
+def split_path(field_path: str) -> tuple[str, ...]:
+    return tuple(field_path.split("."))
+
+
+def resolve_path(payload: Any, path: tuple[str, ...]) -> Any:
+    value = payload
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _previous(ctx: EvalContext, path: tuple[str, ...]) -> Any:
+    if not ctx.previous_payload:
+        return None
+    return resolve_path(ctx.previous_payload, path)
+
+
+def _membership(expected: Any) -> Callable[[Any], bool]:
+    if isinstance(expected, (list, tuple)) and all(isinstance(item, Hashable) for item in expected):
+        members = frozenset(expected)
+        fallback = tuple(expected)
+
+        def contains(current: Any) -> bool:
+            try:
+                return current in members
+            except TypeError:  # unhashable payload value, compare by equality like a list would
+                return current in fallback
+
+        return contains
+    return lambda current: current in expected
+
+
+def value_test(op: Any, expected: Any) -> Callable[[Any], bool]:
+    """Operator applied to an already resolved value; every operator but ``changed`` reduces to one."""
+    if op == "eq":
+        return lambda current: current == expected
+    if op == "neq":
+        return lambda current: current != expected
+    if op == "gt":
+        return lambda current: current is not None and current > expected
+    if op == "gte":
+        return lambda current: current is not None and current >= expected
+    if op == "lt":
+        return lambda current: current is not None and current < expected
+    if op == "lte":
+        return lambda current: current is not None and current <= expected
+    if op in ("in", "not_in"):
+        contains = _membership(expected)
+        if op == "in":
+            return contains
+        return lambda current: not contains(current)
+    if op == "exists":
+        flag = bool(expected)
+        return lambda current: (current is not None) is flag
+    if op == "not_exists":
+        flag = bool(expected)
+        return lambda current: (current is None) is flag
+    if op == "regex":
+        try:
+            pattern = re.compile(expected)
+        except (re.error, TypeError) as exc:
+            raise RuleSchemaError(f"Invalid regex {expected!r}: {exc}") from exc
+        return lambda current: isinstance(current, str) and bool(pattern.search(current))
+    raise RuleSchemaError(f"Unsupported operator: {op}")
+
+
+def _compile_op(op: Any, path: tuple[str, ...], expected: Any) -> Test:
+    if op == "changed":
+        flag = bool(expected)
+        return lambda ctx: (_previous(ctx, path) != resolve_path(ctx.payload, path)) is flag
+    check = value_test(op, expected)
+    if len(path) == 1:
+        key = path[0]
+        return lambda ctx: check(ctx.payload.get(key))
+    return lambda ctx: check(resolve_path(ctx.payload, path))
+
+
+@dataclass(frozen=True)
+class CompiledPredicate:
+    field: str
+    path: tuple[str, ...]
+    op: str
+    value: Any
+    test: Test
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    mode: str
+    predicates: tuple[CompiledPredicate, ...] = ()
+    negated: CompiledCondition | None = None
+    test: Test = field(default=lambda ctx: True, repr=False)
+
+    def iter_predicates(self):
+        yield from self.predicates
+        if self.negated is not None:
+            yield from self.negated.iter_predicates()
+
+
+ALWAYS = CompiledCondition(mode="always")
+
+
+def _predicate_key(predicate: dict[str, Any]) -> tuple:
+    return predicate.get("field", ""), predicate.get("op"), canonical_json(predicate.get("value"))
+
+
+def _iter_when_predicates(when: dict[str, Any]):
+    for mode in ("all", "any"):
+        yield from when.get(mode, ())
+    if "not" in when:
+        yield from _iter_when_predicates(when["not"])
+
+
+def _memoized(test: Test) -> Test:
+    slot = object()
+
+    def run(ctx: EvalContext) -> bool:
+        memo = ctx.memo
+        outcome = memo.get(slot)
+        if outcome is None:
+            outcome = memo[slot] = test(ctx)
+        return outcome
+
+    return run
+
+
+class PredicateTable:
+    """One ``CompiledPredicate`` per distinct ``(field, op, value)`` of a pack.
+
+    Predicates used by more than one condition memoize their outcome per evaluation in ``EvalContext.memo``, so
+    each runs at most once however many rules share it. ``computed.*`` predicates are not memoized: ranges fill
+    those values in during the evaluation.
+    """
+
+    def __init__(self, pack: dict[str, Any]):
+        counts: dict[tuple, int] = {}
+        for section in ("rules", "tests", "ranges"):
+            for entry in pack.get(section, []):
+                for predicate in _iter_when_predicates(entry.get("when", {})):
+                    key = _predicate_key(predicate)
+                    counts[key] = counts.get(key, 0) + 1
+        self.shared = {key for key, count in counts.items() if count > 1}
+        self.compiled: dict[tuple, CompiledPredicate] = {}
+
+
+def compile_predicate(predicate: dict[str, Any], interned: PredicateTable | None = None) -> CompiledPredicate:
+    """Compile one predicate; with ``interned``, identical predicates across a pack share one instance."""
+    field_path = predicate.get("field", "")
+    op = predicate.get("op")
+    expected = predicate.get("value")
+    key = _predicate_key(predicate) if interned is not None else None
+    if key is not None and key in interned.compiled:
+        return interned.compiled[key]
+    path = split_path(field_path)
+    test = _compile_op(op, path, expected)
+    if key is not None and key in interned.shared and not field_path.startswith(COMPUTED_PREFIX):
+        test = _memoized(test)
+    compiled = CompiledPredicate(field=field_path, path=path, op=op, value=expected, test=test)
+    if key is not None:
+        interned.compiled[key] = compiled
+    return compiled
+
+
+def _all(tests: tuple[Test, ...]) -> Test:
+    if not tests:
+        return lambda ctx: True
+    if len(tests) == 1:
+        return tests[0]
+
+    def run(ctx: EvalContext) -> bool:
+        for test in tests:
+            if not test(ctx):
+                return False
+        return True
+
+    return run
+
+
+def _any(tests: tuple[Test, ...]) -> Test:
+    if len(tests) == 1:
+        return tests[0]
+
+    def run(ctx: EvalContext) -> bool:
+        for test in tests:
+            if test(ctx):
+                return True
+        return False
+
+    return run
+
+
+def compile_when(when: dict[str, Any], interned: PredicateTable | None = None) -> CompiledCondition:
+    if "all" in when:
+        predicates = tuple(compile_predicate(p, interned) for p in when["all"])
+        return CompiledCondition(mode="all", predicates=predicates, test=_all(tuple(p.test for p in predicates)))
+    if "any" in when:
+        predicates = tuple(compile_predicate(p, interned) for p in when["any"])
+        return CompiledCondition(mode="any", predicates=predicates, test=_any(tuple(p.test for p in predicates)))
+    if "not" in when:
+        inner = compile_when(when["not"], interned)
+        inner_test = inner.test
+        return CompiledCondition(mode="not", negated=inner, test=lambda ctx: not inner_test(ctx))
+    return ALWAYS
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledEntry:
+    id: str
+    section: str
+    source: dict[str, Any]
+    applies_to: frozenset[str] | None
+    condition: CompiledCondition
+    required: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    fields: frozenset[str] = frozenset()
+    uses_changed: bool = False
+    compute: CompiledExpression | None = None
+    # Set by compile_pack: an eq/in predicate the alpha index hashes on, and the condition without it.
+    discriminator: CompiledPredicate | None = None
+    residual: Test | None = field(default=None, repr=False)
+
+    def applies(self, doc_type: Any) -> bool:
+        return self.applies_to is None or doc_type in self.applies_to
+
+
+def _entry_fields(
+    section: str, entry: dict[str, Any], condition: CompiledCondition, compute: CompiledExpression | None
+) -> frozenset[str]:
+    fields = {predicate.field for predicate in condition.iter_predicates()}
+    fields.update(entry.get("require_fields", []) if section == "validations" else ())
+    if compute is not None:
+        fields.update(compute.fields)
+    if entry.get("applies_to"):
+        fields.add("doc_type")
+    return frozenset(fields)
+
+
+def compile_entry(section: str, entry: dict[str, Any], interned: PredicateTable | None = None) -> CompiledEntry:
+    applies = entry.get("applies_to")
+    required = tuple((f, split_path(f)) for f in entry.get("require_fields", [])) if section == "validations" else ()
+    try:
+        condition = compile_when(entry.get("when", {}), interned) if section != "validations" else ALWAYS
+        compute = None
+        if section == "ranges":
+            from .expressions import compile_expression
+
+            compute = compile_expression(entry.get("compute", {}).get("expression"))
+    except RuleSchemaError as exc:
+        raise RuleSchemaError(f"{section}[{entry.get('id')}]: {exc}") from exc
+    return CompiledEntry(
+        id=entry["id"],
+        section=section,
+        source=entry,
+        applies_to=frozenset(applies) if applies else None,
+        condition=condition,
+        required=required,
+        fields=_entry_fields(section, entry, condition, compute),
+        uses_changed=any(p.op == "changed" for p in condition.iter_predicates()),
+        compute=compute,
+    )
+
+
+COMPUTED_PREFIX = "computed."
+
+
+def _overlaps(read: str, written: str) -> bool:
+    return read == written or read.startswith(written + ".") or written.startswith(read + ".")
+
+
+def order_ranges(ranges: tuple[CompiledEntry, ...]) -> tuple[CompiledEntry, ...]:
+    """Topologically sort ranges so each runs after the ranges producing the ``computed.*`` values it reads.
+
+    Independent ranges keep file order, as do ranges writing the same output (the last one still wins).
+    Raises RuleSchemaError on a dependency cycle.
+    """
+    outputs = [entry.source.get("compute", {}).get("output_field") or "" for entry in ranges]
+    depends_on: list[set[int]] = [set() for _ in ranges]
+    for index, entry in enumerate(ranges):
+        reads = [f for f in entry.fields if f.startswith(COMPUTED_PREFIX)]
+        for other, written in enumerate(outputs):
+            if not written.startswith(COMPUTED_PREFIX):
+                continue
+            if any(_overlaps(read, written) for read in reads) or (other < index and written == outputs[index]):
+                depends_on[index].add(other)
+
+    dependents: list[list[int]] = [[] for _ in ranges]
+    for index, required in enumerate(depends_on):
+        for other in required:
+            dependents[other].append(index)
+    pending = [len(required) for required in depends_on]
+    ready = [index for index, count in enumerate(pending) if count == 0]
+    heapq.heapify(ready)
+    order: list[int] = []
+    while ready:
+        index = heapq.heappop(ready)
+        order.append(index)
+        for dependent in dependents[index]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                heapq.heappush(ready, dependent)
+    if len(order) < len(ranges):
+        raise RuleSchemaError(f"Range dependency cycle: {_describe_cycle(ranges, depends_on, set(order))}")
+    return tuple(ranges[index] for index in order)
+
+
+def _describe_cycle(ranges, depends_on: list[set[int]], resolved: set[int]) -> str:
+    path: list[int] = []
+    index = next(i for i in range(len(ranges)) if i not in resolved)
+    while index not in path:
+        path.append(index)
+        index = min(other for other in depends_on[index] if other not in resolved)
+    cycle = path[path.index(index):] + [index]
+    return " -> ".join(ranges[i].id for i in reversed(cycle))
+
+
+def _reusable(entry: CompiledEntry, duplicated_ids: set[str]) -> bool:
+    """Whether an entry's outcome can be recovered from a previous result when none of its fields changed."""
+    if entry.id in duplicated_ids or entry.uses_changed:
+        return False
+    # Computed values are derived inside the evaluation, so comparing payloads cannot tell whether they changed.
+    if any(field.startswith(COMPUTED_PREFIX) for field in entry.fields):
+        return False
+    if entry.section == "rules":
+        # Only rules that emit a finding leave a trace of having fired in the output.
+        return bool(entry.source.get("then", {}).get("add_finding"))
+    return True
+
+
+# Entries with a discriminator a section needs before it is indexed. Measured crossover: the index's fixed cost per
+# evaluation (bucket lookups, merging candidates back into pack order) is repaid from 3-6 such entries, however many
+# unindexed entries the section also has; below that a linear scan is as fast. The shipped packs stay below it.
+INDEX_MIN_ENTRIES = 6
+# Ranges may discriminate on computed values produced earlier in the same loop, so they are always scanned.
+INDEXED_SECTIONS = ("rules", "tests")
+
+
+def _discriminator_values(predicate: CompiledPredicate) -> tuple | None:
+    """Values an eq/in predicate accepts, if they can all be hashed; None when it cannot be indexed."""
+    if predicate.op == "eq":
+        values = (predicate.value,)
+    elif predicate.op == "in" and isinstance(predicate.value, (list, tuple)):
+        values = tuple(predicate.value)
+    else:
+        return None
+    try:
+        hash(values)
+    except TypeError:
+        return None
+    return values
+
+
+def _with_discriminator(entry: CompiledEntry, field_counts: dict[str, int]) -> CompiledEntry:
+    """Pick the entry's indexable predicate on the field most entries of the pack discriminate on."""
+    if entry.condition.mode != "all":
+        return entry
+    candidates = [p for p in entry.condition.predicates if _discriminator_values(p) is not None]
+    if not candidates:
+        return entry
+    chosen = max(candidates, key=lambda p: (field_counts[p.field], -len(_discriminator_values(p))))
+    rest = tuple(p.test for p in entry.condition.predicates if p is not chosen)
+    return replace(entry, discriminator=chosen, residual=_all(rest))
+
+
+@dataclass(frozen=True)
+class AlphaIndex:
+    """Hash buckets from discriminator field values to the entries whose eq/in predicate accepts them.
+
+    ``candidates`` resolves each discriminating field once and returns ``(entry, test)`` pairs in pack order: bucket
+    hits with the residual test (their discriminator is already known to hold), plus every unindexed entry with its
+    full condition.
+    """
+
+    entries: tuple[CompiledEntry, ...]
+    unindexed: tuple[int, ...]
+    buckets: tuple[tuple[tuple[str, ...], dict[Any, tuple[int, ...]]], ...]
+
+    @classmethod
+    def build(cls, entries: tuple[CompiledEntry, ...]) -> AlphaIndex:
+        unindexed: list[int] = []
+        by_field: dict[tuple[str, ...], dict[Any, list[int]]] = {}
+        for position, entry in enumerate(entries):
+            if entry.discriminator is None:
+                unindexed.append(position)
+                continue
+            buckets = by_field.setdefault(entry.discriminator.path, {})
+            for value in dict.fromkeys(_discriminator_values(entry.discriminator)):
+                buckets.setdefault(value, []).append(position)
+        return cls(
+            entries=entries,
+            unindexed=tuple(unindexed),
+            buckets=tuple(
+                (path, {value: tuple(positions) for value, positions in buckets.items()})
+                for path, buckets in by_field.items()
+            ),
+        )
+
+    def candidates(self, payload: dict[str, Any]) -> list[tuple[CompiledEntry, Test]]:
+        positions = list(self.unindexed)
+        hits: set[int] = set()
+        for path, buckets in self.buckets:
+            try:
+                hit = buckets.get(resolve_path(payload, path))
+            except TypeError:  # unhashable payload value cannot equal any hashable discriminator
+                continue
+            if hit:
+                positions.extend(hit)
+                hits.update(hit)
+        positions.sort()
+        entries = self.entries
+        return [
+            (entries[i], entries[i].residual if i in hits else entries[i].condition.test)
+            for i in positions
+        ]
+
+
+@dataclass(frozen=True)
+class DocTypePlan:
+    """The entries of each section that apply to one doc_type, in pack order, with alpha indexes for large sections."""
+
+    validations: tuple[CompiledEntry, ...]
+    rules: tuple[CompiledEntry, ...]
+    tests: tuple[CompiledEntry, ...]
+    ranges: tuple[CompiledEntry, ...]
+    indexes: dict[str, AlphaIndex] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, sections: dict[str, tuple[CompiledEntry, ...]]) -> DocTypePlan:
+        indexes = {
+            section: AlphaIndex.build(entries)
+            for section, entries in sections.items()
+            if section in INDEXED_SECTIONS
+            and sum(entry.discriminator is not None for entry in entries) >= INDEX_MIN_ENTRIES
+        }
+        return cls(**sections, indexes=indexes)
+
+    @classmethod
+    def select(cls, sections: dict[str, tuple[CompiledEntry, ...]], doc_type: Any) -> DocTypePlan:
+        return cls.build({section: tuple(e for e in entries if e.applies(doc_type)) for section, entries in sections.items()})
+
+    def matching(self, section: str, payload: dict[str, Any]) -> list[tuple[CompiledEntry, Test]] | tuple:
+        """``(entry, test)`` pairs to evaluate for ``section``; ``test(ctx)`` decides whether the entry fires."""
+        index = self.indexes.get(section)
+        if index is not None:
+            return index.candidates(payload)
+        return [(entry, entry.condition.test) for entry in getattr(self, section)]
+
+
+@dataclass(frozen=True)
+class CompiledPack:
+    pack: dict[str, Any]
+    validations: tuple[CompiledEntry, ...]
+    rules: tuple[CompiledEntry, ...]
+    tests: tuple[CompiledEntry, ...]
+    ranges: tuple[CompiledEntry, ...]
+    field_paths: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    field_index: dict[str, tuple[CompiledEntry, ...]] = field(default_factory=dict)
+    reusable: frozenset[CompiledEntry] = frozenset()
+    doc_type_plans: dict[str, DocTypePlan] = field(default_factory=dict)
+    default_plan: DocTypePlan | None = None
+    changed_fields: frozenset[str] = frozenset()
+
+    @cached_property
+    def content_hash(self) -> str:
+        return content_hash(self.pack)
+
+    def for_doc_type(self, doc_type: Any) -> DocTypePlan:
+        try:
+            return self.doc_type_plans.get(doc_type, self.default_plan)
+        except TypeError:  # unhashable doc_type can only match entries without applies_to
+            return self.default_plan
+
+    def entries(self):
+        for section in SECTIONS:
+            yield from getattr(self, section)
+
+    def map_entries(self, transform: Callable[[CompiledEntry], CompiledEntry]) -> CompiledPack:
+        """Copy of the plan with every entry replaced by ``transform(entry)`` in all derived indexes."""
+        mapping = {entry: transform(entry) for entry in self.entries()}
+
+        def remap(entries):
+            return tuple(mapping[entry] for entry in entries)
+
+        def remap_plan(plan: DocTypePlan) -> DocTypePlan:
+            return DocTypePlan.build({section: remap(getattr(plan, section)) for section in SECTIONS})
+
+        return replace(
+            self,
+            **{section: remap(getattr(self, section)) for section in SECTIONS},
+            field_index={field_path: remap(entries) for field_path, entries in self.field_index.items()},
+            reusable=frozenset(remap(self.reusable)),
+            doc_type_plans={doc_type: remap_plan(plan) for doc_type, plan in self.doc_type_plans.items()},
+            default_plan=remap_plan(self.default_plan),
+        )
+
+    def affected_by(self, changed_fields) -> set[CompiledEntry]:
+        affected: set[CompiledEntry] = set()
+        for field_path in changed_fields:
+            affected.update(self.field_index.get(field_path, ()))
+        return affected
+
+
+def _check_range_arguments(pack: dict[str, Any], ranges: tuple[CompiledEntry, ...]) -> None:
+    from .expressions import check_field_types
+
+    variable_types = {v.get("id"): v.get("type") for v in pack.get("variables", [])}
+    for range_rule in ranges:
+        try:
+            check_field_types(range_rule.compute, variable_types)
+        except RuleSchemaError as exc:
+            raise RuleSchemaError(f"ranges[{range_rule.id}]: {exc}") from exc
+
+
+def compile_pack(pack: dict[str, Any]) -> CompiledPack:
+    interned = PredicateTable(pack)
+    sections = {
+        section: tuple(compile_entry(section, entry, interned) for entry in pack.get(section, [])) for section in SECTIONS
+    }
+    sections["ranges"] = order_ranges(sections["ranges"])
+    _check_range_arguments(pack, sections["ranges"])
+    field_counts: dict[str, int] = {}
+    for entries in sections.values():
+        for entry in entries:
+            if entry.condition.mode == "all":
+                for f in {p.field for p in entry.condition.predicates if _discriminator_values(p) is not None}:
+                    field_counts[f] = field_counts.get(f, 0) + 1
+    sections = {
+        section: tuple(_with_discriminator(entry, field_counts) for entry in entries) for section, entries in sections.items()
+    }
+    entries = [entry for section in SECTIONS for entry in sections[section]]
+
+    field_index: dict[str, list[CompiledEntry]] = {}
+    for entry in entries:
+        for field_path in entry.fields:
+            field_index.setdefault(field_path, []).append(entry)
+
+    doc_types = {doc_type for entry in entries if entry.applies_to for doc_type in entry.applies_to}
+
+    seen: set[str] = set()
+    duplicated = {entry.id for entry in entries if entry.id in seen or seen.add(entry.id)}
+    return CompiledPack(
+        pack=pack,
+        **sections,
+        field_paths={field_path: split_path(field_path) for field_path in field_index},
+        field_index={field_path: tuple(indexed) for field_path, indexed in field_index.items()},
+        reusable=frozenset(entry for entry in entries if _reusable(entry, duplicated)),
+        doc_type_plans={doc_type: DocTypePlan.select(sections, doc_type) for doc_type in doc_types},
+        default_plan=DocTypePlan.select(sections, None),
+        changed_fields=frozenset(
+            p.field for entry in entries for p in entry.condition.iter_predicates() if p.op == "changed"
+        ),
+    )
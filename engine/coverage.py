@@ -0,0 +1,212 @@
+"""In-memory coverage index over evaluated approval ranges.
+
+Answers "which documents cover process 135, 14 mm, position PF?" without re-running range functions: processes and
+positions map to bitsets (Python ints, one bit per slot), thickness/diameter intervals are kept as two sorted bound
+arrays with a prefix bitset every ``BLOCK`` entries, so a stabbing query is two bisects and a few bit operations.
+Updates tombstone the previous slot and append the new entry to a small linearly-scanned delta; the sorted arrays
+are rebuilt once the delta grows past ``DELTA_LIMIT``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_right
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+from .compiler import resolve_path, split_path
+
+BLOCK = 128
+DELTA_LIMIT = 256
+DEFAULT_COVERAGE_FIELDS = {
+    "process": "inputs.process",
+    "thickness": "computed.thickness_approved_mm",
+    "diameter": "computed.diameter_approved_mm",
+    "positions": "computed.positions_approved",
+}
+_ONE = re.compile("1")
+
+
+@dataclass(frozen=True)
+class CoverageEntry:
+    process: Any = None
+    thickness: tuple[float, float] | None = None
+    diameter: tuple[float, float] | None = None
+    positions: frozenset[str] = frozenset()
+
+
+def _interval(value: Any) -> tuple[float, float] | None:
+    if not isinstance(value, dict):
+        return None
+    low, high = value.get("min"), value.get("max")
+    if not isinstance(low, (int, float)) or not isinstance(high, (int, float)):
+        return None
+    return float(low), float(high)
+
+
+def _positions(value: Any) -> frozenset[str]:
+    if isinstance(value, dict):
+        value = value.get("approved")
+    return frozenset(value) if isinstance(value, (list, tuple)) else frozenset()
+
+
+def coverage_entry(
+    result: dict[str, Any], payload: dict[str, Any], fields: Mapping[str, str] = DEFAULT_COVERAGE_FIELDS
+) -> CoverageEntry:
+    """Coverage of one evaluation: ``fields`` map each dimension to a payload (``inputs.*``) or result (``computed.*``) path."""
+    source = {**payload, "computed": result.get("computed") or {}}
+
+    def read(dimension: str) -> Any:
+        return resolve_path(source, split_path(fields[dimension])) if dimension in fields else None
+
+    return CoverageEntry(
+        process=read("process"),
+        thickness=_interval(read("thickness")),
+        diameter=_interval(read("diameter")),
+        positions=_positions(read("positions")),
+    )
+
+
+def bits_of(slots: Iterable[int], size: int) -> int:
+    buffer = bytearray((size + 7) // 8)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Set bit positions in ascending order (the regex scan over the binary string runs in C)."""
+    return (match.start() for match in _ONE.finditer(bin(bits)[:1:-1]))
+
+
+class _Threshold:
+    """Slots sorted by a bound; ``upto(x)`` is the bitset of slots whose bound is <= x."""
+
+    def __init__(self, pairs: list[tuple[float, int]], size: int):
+        pairs.sort()
+        self.values = [value for value, _ in pairs]
+        self.slots = [slot for _, slot in pairs]
+        self.size = size
+        self.prefixes = [0]
+        buffer = bytearray((size + 7) // 8)
+        for count, slot in enumerate(self.slots, start=1):
+            buffer[slot >> 3] |= 1 << (slot & 7)
+            if count % BLOCK == 0:
+                self.prefixes.append(int.from_bytes(buffer, "little"))
+
+    def upto(self, value: float) -> int:
+        count = bisect_right(self.values, value)
+        block = count // BLOCK
+        return self.prefixes[block] | bits_of(self.slots[block * BLOCK:count], self.size)
+
+
+class IntervalIndex:
+    def __init__(self, intervals: Mapping[int, tuple[float, float]], size: int):
+        self.low = _Threshold([(low, slot) for slot, (low, _) in intervals.items()], size)
+        self.high = _Threshold([(-high, slot) for slot, (_, high) in intervals.items()], size)
+
+    def containing(self, value: float) -> int:
+        return self.low.upto(value) & self.high.upto(-value)
+
+
+def _covers(interval: tuple[float, float] | None, value: float) -> bool:
+    return interval is not None and interval[0] <= value <= interval[1]
+
+
+class CoverageIndex:
+    """Thread-safe coverage index keyed by any hashable (e.g. document id)."""
+
+    def __init__(self, entries: Mapping[Hashable, CoverageEntry] | None = None):
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, CoverageEntry] = dict(entries or {})
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._keys: list[Hashable] = list(self._entries)
+        self._slots = {key: slot for slot, key in enumerate(self._keys)}
+        size = len(self._keys)
+        processes: dict[Any, list[int]] = {}
+        positions: dict[str, list[int]] = {}
+        thickness, diameter = {}, {}
+        for slot, key in enumerate(self._keys):
+            entry = self._entries[key]
+            if entry.process is not None:
+                processes.setdefault(entry.process, []).append(slot)
+            for position in entry.positions:
+                positions.setdefault(position, []).append(slot)
+            if entry.thickness is not None:
+                thickness[slot] = entry.thickness
+            if entry.diameter is not None:
+                diameter[slot] = entry.diameter
+        self._processes = {value: bits_of(slots, size) for value, slots in processes.items()}
+        self._positions = {value: bits_of(slots, size) for value, slots in positions.items()}
+        self._thickness = IntervalIndex(thickness, size)
+        self._diameter = IntervalIndex(diameter, size)
+        self._alive = (1 << size) - 1
+        self._delta: dict[int, CoverageEntry] = {}
+
+    def _retire(self, slot: int) -> None:
+        mask = ~(1 << slot)
+        entry = self._entries[self._keys[slot]]
+        self._alive &= mask
+        if entry.process is not None:
+            self._processes[entry.process] &= mask
+        for position in entry.positions:
+            self._positions[position] &= mask
+        self._delta.pop(slot, None)
+
+    def update(self, key: Hashable, entry: CoverageEntry | None) -> None:
+        """Replace the coverage of ``key``; ``None`` removes it."""
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is not None:
+                self._retire(slot)
+            if entry is None:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = entry
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._slots[key] = slot
+            bit = 1 << slot
+            self._alive |= bit
+            if entry.process is not None:
+                self._processes[entry.process] = self._processes.get(entry.process, 0) | bit
+            for position in entry.positions:
+                self._positions[position] = self._positions.get(position, 0) | bit
+            self._delta[slot] = entry
+            if len(self._delta) > DELTA_LIMIT:
+                self._rebuild()
+
+    def query(
+        self,
+        process: Any = None,
+        thickness: float | None = None,
+        diameter: float | None = None,
+        position: str | None = None,
+        limit: int | None = None,
+    ) -> list[Hashable]:
+        """Keys whose entry matches every given dimension (a missing range never covers), at most ``limit``."""
+        with self._lock:
+            bits = self._alive
+            if process is not None:
+                bits &= self._processes.get(process, 0)
+            if position is not None:
+                bits &= self._positions.get(position, 0)
+            for value, index, dimension in ((thickness, self._thickness, "thickness"), (diameter, self._diameter, "diameter")):
+                if value is None or not bits:
+                    continue
+                recent = [slot for slot, entry in self._delta.items() if _covers(getattr(entry, dimension), value)]
+                bits &= index.containing(value) | bits_of(recent, len(self._keys))
+            return [self._keys[slot] for slot in islice(iter_bits(bits), limit)]
+
+    def get(self, key: Hashable) -> CoverageEntry | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
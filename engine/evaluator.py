@@ -1,155 +1,199 @@
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any
 
+from .compiler import COMPUTED_PREFIX, CompiledPack, compile_pack, resolve_path, split_path
 from .explanations import build_finding
-from .math.functions import FUNCTION_REGISTRY
+
+if TYPE_CHECKING:
+    from .memo import EvaluationCache
+    from .profiling import EvaluationProfiler
 
 
 @dataclass
 class EvalContext:
     payload: dict[str, Any]
     previous_payload: dict[str, Any] | None = None
+    # Outcomes of predicates shared between conditions, for this evaluation only (see compiler.PredicateTable).
+    memo: dict[Any, bool] = field(default_factory=dict, repr=False)
 
     def get(self, field_path: str) -> Any:
-        value: Any = self.payload
-        for part in field_path.split("."):
-            if not isinstance(value, dict):
-                return None
-            value = value.get(part)
-        return value
+        return resolve_path(self.payload, split_path(field_path))
 
     def previous(self, field_path: str) -> Any:
         if not self.previous_payload:
             return None
-        value: Any = self.previous_payload
-        for part in field_path.split("."):
-            if not isinstance(value, dict):
-                return None
-            value = value.get(part)
-        return value
+        return resolve_path(self.previous_payload, split_path(field_path))
 
 
-class RuleEvaluator:
-    def __init__(self, pack: dict[str, Any], debug: bool = False):
-        self.pack = pack
-        self.debug = debug
+def _well_formed(result: Any) -> bool:
+    if not isinstance(result, dict):
+        return False
+    for key in ("findings", "required_tests", "approval_ranges"):
+        items = result.get(key, [])
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return False
+    return all("value" in item for item in result.get("approval_ranges", []))
 
-    def _eval_predicate(self, ctx: EvalContext, predicate: dict[str, Any]) -> bool:
-        field = predicate.get("field", "")
-        op = predicate.get("op")
-        expected = predicate.get("value")
-        current = ctx.get(field)
-
-        ops = {
-            "eq": lambda: current == expected,
-            "neq": lambda: current != expected,
-            "gt": lambda: current is not None and current > expected,
-            "gte": lambda: current is not None and current >= expected,
-            "lt": lambda: current is not None and current < expected,
-            "lte": lambda: current is not None and current <= expected,
-            "in": lambda: current in expected,
-            "not_in": lambda: current not in expected,
-            "exists": lambda: (current is not None) is bool(expected),
-            "not_exists": lambda: (current is None) is bool(expected),
-            "changed": lambda: (ctx.previous(field) != current) is bool(expected),
-            "regex": lambda: isinstance(current, str) and bool(re.search(expected, current)),
-        }
-        if op not in ops:
-            raise ValueError(f"Unsupported operator: {op}")
-        return ops[op]()
-
-    def _evaluate_when(self, ctx: EvalContext, when: dict[str, Any]) -> bool:
-        if "all" in when:
-            return all(self._eval_predicate(ctx, p) for p in when["all"])
-        if "any" in when:
-            return any(self._eval_predicate(ctx, p) for p in when["any"])
-        if "not" in when:
-            return not self._evaluate_when(ctx, when["not"])
-        return True
-
-    def _apply_expression(self, expression: str, payload: dict[str, Any]) -> Any:
-        match = re.match(r"(?P<func>[A-Z_]+)\((?P<args>.*)\)", expression)
-        if not match:
-            raise ValueError(f"Invalid expression: {expression}")
-        func_name = match.group("func")
-        args_raw = [arg.strip() for arg in match.group("args").split(",") if arg.strip()]
-        func = FUNCTION_REGISTRY[func_name]
-
-        resolved_args = []
-        for arg in args_raw:
-            if arg.startswith("inputs.") or arg.startswith("context.") or arg.startswith("computed."):
-                value = payload
-                for part in arg.split("."):
-                    value = value.get(part, None) if isinstance(value, dict) else None
-                resolved_args.append(value)
-            else:
-                resolved_args.append(arg.strip("\"'"))
-        return func(*resolved_args)
 
-    def evaluate(self, payload: dict[str, Any], previous_payload: dict[str, Any] | None = None) -> dict[str, Any]:
-        ctx = EvalContext(payload=payload, previous_payload=previous_payload)
+class RuleEvaluator:
+    def __init__(
+        self,
+        pack: dict[str, Any] | CompiledPack,
+        debug: bool = False,
+        result_cache: EvaluationCache | None = None,
+        profiler: EvaluationProfiler | None = None,
+    ):
+        self.plan = pack if isinstance(pack, CompiledPack) else compile_pack(pack)
+        if profiler is not None:
+            self.plan = profiler.instrument(self.plan)
+        self.pack = self.plan.pack
+        self.debug = debug
+        self.result_cache = result_cache
+        self.profiler = profiler
+
+    def _reused_entries(
+        self,
+        payload: dict[str, Any],
+        previous_payload: dict[str, Any] | None,
+        previous_result: dict[str, Any] | None,
+    ) -> frozenset:
+        """Entries whose outcome can be copied from ``previous_result``: reusable and none of their fields changed.
+
+        ``previous_result`` must be what this pack returned for ``previous_payload``; nothing here can check that,
+        so it must never come from an untrusted caller. A malformed one only disables reuse.
+        """
+        if previous_result is None or previous_payload is None or not _well_formed(previous_result):
+            return frozenset()
+        changed = [
+            field for field, path in self.plan.field_paths.items()
+            if resolve_path(payload, path) != resolve_path(previous_payload, path)
+        ]
+        return self.plan.reusable - self.plan.affected_by(changed)
+
+    def evaluate(
+        self,
+        payload: dict[str, Any],
+        previous_payload: dict[str, Any] | None = None,
+        previous_result: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Evaluate ``payload``; given the result previously produced for ``previous_payload`` by this same pack,
+        entries untouched by the edit are carried over from it instead of being re-run."""
+        if self.result_cache is None:
+            return self._evaluate(payload, previous_payload, previous_result)
+        key = self.result_cache.key(self.plan, payload, previous_payload, self.debug)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached
+        result = self._evaluate(payload, previous_payload, previous_result)
+        # The key does not cover ``previous_result``, and a result built from one is only as right as that input.
+        if previous_result is None:
+            self.result_cache.set(key, result)
+        return result
+
+    def _evaluate(
+        self,
+        payload: dict[str, Any],
+        previous_payload: dict[str, Any] | None,
+        previous_result: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        clock = self.profiler.clock(self.plan) if self.profiler is not None else None
         findings: list[dict[str, Any]] = []
         required_tests: list[dict[str, Any]] = []
         approval_ranges: list[dict[str, Any]] = []
         computed: dict[str, Any] = {}
+        # Ranges run first, in dependency order, so every condition can read ``computed.*``.
+        ctx = EvalContext(payload={**payload, "computed": computed}, previous_payload=previous_payload)
         debug_rules: list[str] = []
         invalid = False
 
-        for validation in self.pack.get("validations", []):
-            applies = validation.get("applies_to")
-            if applies and payload.get("doc_type") not in applies:
+        reused = self._reused_entries(payload, previous_payload, previous_result)
+        if reused:
+            previous_findings = {f.get("rule_id"): f for f in previous_result.get("findings", [])}
+            previous_tests = {t.get("id"): t for t in previous_result.get("required_tests", [])}
+            previous_ranges = {r.get("id"): r for r in previous_result.get("approval_ranges", [])}
+
+        plan = self.plan.for_doc_type(payload.get("doc_type"))
+        for range_rule in plan.ranges:
+            if range_rule in reused:
+                previous_range = previous_ranges.get(range_rule.id)
+                if previous_range is None:
+                    continue
+                result = previous_range["value"]
+            elif range_rule.condition.test(ctx):
+                result = range_rule.compute.evaluate(ctx.payload)
+            else:
                 continue
-            missing = [field for field in validation.get("require_fields", []) if EvalContext(payload).get(field) is None]
+            source = range_rule.source
+            out_field = source["compute"]["output_field"]
+            if out_field.startswith(COMPUTED_PREFIX):
+                computed[out_field.split(".", 1)[1]] = result
+            approval_ranges.append({
+                "id": range_rule.id,
+                "output_field": out_field,
+                "value": result,
+                "reference": source.get("reference"),
+                "needs_verification": source.get("needs_verification", True),
+            })
+        if clock:
+            clock.lap("ranges")
+
+        for validation in plan.validations:
+            source = validation.source
+            if validation in reused:
+                missing_finding = previous_findings.get(validation.id)
+                if missing_finding is not None:
+                    findings.append(dict(missing_finding))
+                    invalid = invalid or source["severity"] == "ERROR"
+                continue
+            missing = [field for field, path in validation.required if resolve_path(ctx.payload, path) is None]
             if missing:
                 findings.append({
-                    "severity": validation["severity"],
-                    "rule_id": validation["id"],
+                    "severity": source["severity"],
+                    "rule_id": validation.id,
                     "field": ",".join(missing),
-                    "message": validation.get("message"),
-                    "reference": validation.get("reference"),
-                    "needs_verification": validation.get("needs_verification", True),
+                    "message": source.get("message"),
+                    "reference": source.get("reference"),
+                    "needs_verification": source.get("needs_verification", True),
                 })
-                if validation["severity"] == "ERROR":
+                if source["severity"] == "ERROR":
                     invalid = True
+        if clock:
+            clock.lap("validations")
 
-        for rule in self.pack.get("rules", []):
-            applies = rule.get("applies_to")
-            if applies and payload.get("doc_type") not in applies:
-                continue
-            if self._evaluate_when(ctx, rule.get("when", {})):
-                debug_rules.append(rule["id"])
-                then = rule.get("then", {})
+        for rule, test in plan.matching("rules", ctx.payload):
+            if rule in reused:
+                fired = rule.id in previous_findings
+            else:
+                fired = test(ctx)
+            if fired:
+                debug_rules.append(rule.id)
+                then = rule.source.get("then", {})
                 if then.get("add_finding"):
-                    findings.append(build_finding(rule["id"], then["add_finding"]))
+                    findings.append(build_finding(rule.id, then["add_finding"]))
                 if then.get("invalidate"):
                     invalid = True
+        if clock:
+            clock.lap("rules")
 
-        for test_rule in self.pack.get("tests", []):
-            if self._evaluate_when(ctx, test_rule.get("when", {})):
+        for test_rule, test in plan.matching("tests", ctx.payload):
+            if test_rule in reused:
+                fired = test_rule.id in previous_tests
+            else:
+                fired = test(ctx)
+            if fired:
+                source = test_rule.source
                 required_tests.append({
-                    "id": test_rule["id"],
-                    "tests": test_rule.get("require", []),
-                    "reference": test_rule.get("reference"),
-                    "needs_verification": test_rule.get("needs_verification", True),
-                })
-
-        augmented_payload = {**payload, "computed": computed}
-        for range_rule in self.pack.get("ranges", []):
-            if self._evaluate_when(ctx, range_rule.get("when", {})):
-                result = self._apply_expression(range_rule["compute"]["expression"], augmented_payload)
-                out_field = range_rule["compute"]["output_field"]
-                if out_field.startswith("computed."):
-                    computed[out_field.split(".", 1)[1]] = result
-                approval_ranges.append({
-                    "id": range_rule["id"],
-                    "output_field": out_field,
-                    "value": result,
-                    "reference": range_rule.get("reference"),
-                    "needs_verification": range_rule.get("needs_verification", True),
+                    "id": test_rule.id,
+                    "tests": source.get("require", []),
+                    "reference": source.get("reference"),
+                    "needs_verification": source.get("needs_verification", True),
                 })
+        if clock:
+            clock.lap("tests")
+            clock.stop()
 
         severities = {f.get("severity") for f in findings}
         status = "INVALID" if invalid or "ERROR" in severities else "WARNING" if "WARNING" in severities else "VALID"
@@ -163,3 +207,15 @@ class RuleEvaluator:
         if self.debug:
             output["debug"] = {"triggered_rules": debug_rules}
         return output
+
+    def evaluate_many(
+        self,
+        payloads: Iterable[dict[str, Any]],
+        previous_payloads: Iterable[dict[str, Any] | None] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        if previous_payloads is None:
+            for payload in payloads:
+                yield self.evaluate(payload)
+            return
+        for payload, previous_payload in zip(payloads, previous_payloads, strict=True):
+            yield self.evaluate(payload, previous_payload=previous_payload)
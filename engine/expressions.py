@@ -0,0 +1,272 @@
+"""Parser and closure compiler for ``ranges[].compute.expression``.
+
+Grammar::
+
+    expr    := term (("+" | "-") term)*
+    term    := unary (("*" | "/" | "%") unary)*
+    unary   := "-" unary | primary
+    primary := NUMBER | STRING | "true" | "false" | "null"
+             | NAME "(" [expr ("," expr)*] ")"    function from FUNCTION_REGISTRY
+             | NAME ("." NAME)*                   payload path under PATH_ROOTS, e.g. inputs.thickness_tested_mm
+             | "(" expr ")"
+
+Expressions are parsed and their function names, arities and literal argument types checked once, when the pack
+is compiled; evaluation only runs the resulting closures.
+"""
+
+from __future__ import annotations
+
+import inspect
+import operator
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping
+
+from .compiler import resolve_path, split_path
+from .math.functions import FUNCTION_REGISTRY
+from .schema import RuleSchemaError
+
+Evaluate = Callable[[dict[str, Any]], Any]
+# A call argument that is a single payload path or literal: ("field", "inputs.x") / ("literal", 12); None otherwise.
+Argument = tuple[str, Any] | None
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>\d+\.\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?|\d+(?:[eE][-+]?\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+      | (?P<op>[-+*/%(),])
+    )""",
+    re.VERBOSE,
+)
+# Python types a declared pack variable type can hold, for checking function arguments read from ``inputs.<id>``.
+VARIABLE_TYPES = {
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "select": (str,),
+    "string": (str,),
+    "text": (str,),
+    "date": (str,),
+}
+# Top-level payload keys a path may start with; any other bare name is rejected rather than read as ``payload[name]``.
+PATH_ROOTS = frozenset({"inputs", "context", "computed", "history", "doc_type"})
+_BINARY = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "%": operator.mod}
+_CONSTANTS = {"true": True, "false": False, "null": None}
+_ESCAPE = re.compile(r"\\(.)")
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    source: str
+    evaluate: Evaluate
+    fields: frozenset[str]
+    functions: frozenset[str]
+    calls: tuple[tuple[str, tuple[Argument, ...]], ...] = ()
+    # Set when the whole expression is one call on paths/literals, which batch evaluation can vectorize.
+    call: tuple[str, tuple[Argument, ...]] | None = None
+
+
+def _tokenize(source: str) -> list[tuple[str, str, int]]:
+    tokens, position = [], 0
+    while position < len(source):
+        match = _TOKEN.match(source, position)
+        if match is None or match.end() == position:
+            if not source[position:].strip():
+                break
+            raise RuleSchemaError(f"Invalid expression {source!r}: unexpected character at {position}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind), match.start(kind)))
+        position = match.end()
+    return tokens
+
+
+def _type_names(types: tuple[type, ...]) -> str:
+    return "/".join("null" if t is type(None) else t.__name__ for t in types)
+
+
+def _check_call(name: str, functions: Mapping[str, Callable], args: list[Argument]) -> None:
+    spec = functions.spec(name) if hasattr(functions, "spec") else None
+    if spec is None:
+        _check_arity(name, functions[name], len(args))
+        return
+    if len(args) != spec.arity:
+        raise RuleSchemaError(f"{name}() called with {len(args)} argument(s): takes {spec.arity}")
+    for position, (arg, types) in enumerate(zip(args, spec.arg_types), start=1):
+        if arg is not None and arg[0] == "literal" and not isinstance(arg[1], types):
+            raise RuleSchemaError(f"{name}() argument {position} must be {_type_names(types)}, got {arg[1]!r}")
+
+
+def _check_arity(name: str, func: Callable, count: int) -> None:
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):  # builtins without introspectable signatures
+        return
+    try:
+        signature.bind(*range(count))
+    except TypeError as exc:
+        raise RuleSchemaError(f"{name}() called with {count} argument(s): {exc}") from exc
+
+
+class _Parser:
+    def __init__(self, source: str, functions: Mapping[str, Callable]):
+        self.source = source
+        self.functions = functions
+        self.tokens = _tokenize(source)
+        self.index = 0
+        self.fields: set[str] = set()
+        self.called: set[str] = set()
+        self.calls: list[tuple[str, tuple[Argument, ...]]] = []
+        self.whole: tuple[str, tuple[Argument, ...]] | None = None
+
+    def error(self, message: str) -> RuleSchemaError:
+        return RuleSchemaError(f"Invalid expression {self.source!r}: {message}")
+
+    def peek(self) -> tuple[str, str, int] | None:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def take(self, value: str | None = None) -> tuple[str, str, int]:
+        token = self.peek()
+        if token is None:
+            raise self.error(f"expected {value!r}" if value else "unexpected end")
+        if value is not None and token[1] != value:
+            raise self.error(f"expected {value!r} at {token[2]}, found {token[1]!r}")
+        self.index += 1
+        return token
+
+    def parse(self) -> Evaluate:
+        if not self.tokens:
+            raise self.error("empty expression")
+        node = self.expr()
+        token = self.peek()
+        if token is not None:
+            raise self.error(f"unexpected {token[1]!r} at {token[2]}")
+        return node
+
+    def _binary(self, operators: str, operand: Callable[[], Evaluate]) -> Evaluate:
+        node = operand()
+        while (token := self.peek()) is not None and token[0] == "op" and token[1] in operators:
+            self.index += 1
+            node = _apply_binary(_BINARY[token[1]], node, operand())
+        return node
+
+    def expr(self) -> Evaluate:
+        return self._binary("+-", self.term)
+
+    def term(self) -> Evaluate:
+        return self._binary("*/%", self.unary)
+
+    def unary(self) -> Evaluate:
+        token = self.peek()
+        if token is not None and token[0] == "op" and token[1] == "-":
+            self.index += 1
+            operand = self.unary()
+            return lambda payload: -operand(payload)
+        return self.primary()
+
+    def primary(self) -> Evaluate:
+        kind, value, position = self.take()
+        if kind == "number":
+            number = float(value) if any(c in value for c in ".eE") else int(value)
+            return lambda payload: number
+        if kind == "string":
+            text = _ESCAPE.sub(r"\1", value[1:-1])
+            return lambda payload: text
+        if kind == "op" and value == "(":
+            node = self.expr()
+            self.take(")")
+            return node
+        if kind != "name":
+            raise self.error(f"unexpected {value!r} at {position}")
+        following = self.peek()
+        if following is not None and following[1] == "(":
+            return self.call(value, position)
+        if value in _CONSTANTS:
+            constant = _CONSTANTS[value]
+            return lambda payload: constant
+        path = split_path(value)
+        if path[0] not in PATH_ROOTS:
+            roots = ", ".join(sorted(PATH_ROOTS))
+            raise self.error(f"unknown name {value!r} at {position}: paths start with {roots}; quote text literals")
+        self.fields.add(value)
+        return lambda payload: resolve_path(payload, path)
+
+    def call(self, name: str, position: int) -> Evaluate:
+        start = self.index - 1
+        func = self.functions.get(name)
+        if func is None:
+            raise self.error(f"unknown function {name!r} at {position}")
+        self.take("(")
+        args: list[Evaluate] = []
+        described: list[Argument] = []
+        if self.peek() is not None and self.peek()[1] != ")":
+            self.argument(args, described)
+            while self.peek() is not None and self.peek()[1] == ",":
+                self.index += 1
+                self.argument(args, described)
+        self.take(")")
+        _check_call(name, self.functions, described)
+        self.called.add(name)
+        self.calls.append((name, tuple(described)))
+        if start == 0 and self.index == len(self.tokens):
+            self.whole = self.calls[-1]
+        arguments = tuple(args)
+        return lambda payload: func(*[arg(payload) for arg in arguments])
+
+    def argument(self, args: list[Evaluate], described: list[Argument]) -> None:
+        start = self.index
+        args.append(self.expr())
+        described.append(self._describe(start) if self.index == start + 1 else None)
+
+    def _describe(self, index: int) -> Argument:
+        kind, value, _ = self.tokens[index]
+        if kind == "number":
+            return "literal", float(value) if any(c in value for c in ".eE") else int(value)
+        if kind == "string":
+            return "literal", _ESCAPE.sub(r"\1", value[1:-1])
+        if kind == "name":
+            return ("literal", _CONSTANTS[value]) if value in _CONSTANTS else ("field", value)
+        return None
+
+
+def _apply_binary(op: Callable[[Any, Any], Any], left: Evaluate, right: Evaluate) -> Evaluate:
+    return lambda payload: op(left(payload), right(payload))
+
+
+def compile_expression(source: str, functions: Mapping[str, Callable] | None = None) -> CompiledExpression:
+    """Parse ``source`` into a closure over the payload; raises RuleSchemaError for syntax, unknown functions,
+    wrong argument counts or literal arguments of the wrong type."""
+    if not isinstance(source, str):
+        raise RuleSchemaError(f"Invalid expression {source!r}: expected a string")
+    parser = _Parser(source, FUNCTION_REGISTRY if functions is None else functions)
+    evaluate = parser.parse()
+    whole = parser.whole
+    return CompiledExpression(
+        source=source,
+        evaluate=evaluate,
+        fields=frozenset(parser.fields),
+        functions=frozenset(parser.called),
+        calls=tuple(parser.calls),
+        call=whole if whole is not None and all(arg is not None for arg in whole[1]) else None,
+    )
+
+
+def check_field_types(
+    expression: CompiledExpression, variable_types: Mapping[str, str], functions: Mapping[str, Callable] | None = None
+) -> None:
+    """Reject ``inputs.<id>`` arguments whose declared variable type the function does not accept."""
+    functions = FUNCTION_REGISTRY if functions is None else functions
+    for name, args in expression.calls:
+        spec = functions.spec(name) if hasattr(functions, "spec") else None
+        if spec is None:
+            continue
+        for position, (arg, types) in enumerate(zip(args, spec.arg_types), start=1):
+            if arg is None or arg[0] != "field":
+                continue
+            root, _, variable = arg[1].partition(".")
+            declared = VARIABLE_TYPES.get(variable_types.get(variable)) if root == "inputs" else None
+            if declared and not any(issubclass(t, types) for t in declared):
+                raise RuleSchemaError(
+                    f"{name}() argument {position} must be {_type_names(types)}, "
+                    f"but {arg[1]} is declared as {variable_types[variable]}"
+                )
@@ -0,0 +1,178 @@
+"""Change-impact analysis between two versions of a rule pack.
+
+``diff_packs`` pairs the entries of two compiled packs by section and id and keeps the ones that were added,
+removed, edited or moved. ``PackImpact.may_affect`` then decides, per stored payload, whether any of those entries
+can produce a different outcome (fires or not, and what it outputs when it fires) under the new version, so only
+the affected fraction of an archive has to be re-evaluated. Packs are diffed after includes are merged, so an edit
+to an included pack shows up in every pack that includes it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .compiler import COMPUTED_PREFIX, SECTIONS, CompiledEntry, CompiledPack, compile_pack, resolve_path
+from .evaluator import EvalContext
+from .hashing import canonical_json
+from .loader import RulePackLoader, discover_rule_packs
+
+_FAILED = object()
+
+
+@dataclass(frozen=True)
+class EntryChange:
+    section: str
+    id: str
+    kind: str  # "added" | "removed" | "changed" | "moved"
+    old: CompiledEntry | None
+    new: CompiledEntry | None
+
+    @property
+    def versions(self) -> tuple[CompiledEntry, ...]:
+        return tuple(entry for entry in (self.old, self.new) if entry is not None)
+
+    @property
+    def fields(self) -> frozenset[str]:
+        return frozenset().union(*(entry.fields for entry in self.versions))
+
+    @property
+    def doc_types(self) -> frozenset[str] | None:
+        """Doc types the change can reach; None when either version applies to every doc type."""
+        if any(entry.applies_to is None for entry in self.versions):
+            return None
+        return frozenset().union(*(entry.applies_to for entry in self.versions))
+
+    @property
+    def reads_computed(self) -> bool:
+        return any(field.startswith(COMPUTED_PREFIX) for field in self.fields)
+
+    def as_dict(self) -> dict[str, Any]:
+        doc_types = self.doc_types
+        return {
+            "section": self.section,
+            "id": self.id,
+            "kind": self.kind,
+            "fields": sorted(self.fields),
+            "doc_types": sorted(doc_types) if doc_types is not None else None,
+        }
+
+
+def _output(entry: CompiledEntry, ctx: EvalContext) -> Any:
+    """What ``entry`` contributes to the result for ``ctx``, or None when it does not fire."""
+    source = entry.source
+    if entry.section == "validations":
+        missing = [field for field, path in entry.required if resolve_path(ctx.payload, path) is None]
+        if not missing:
+            return None
+        keys = ("severity", "message", "reference", "needs_verification")
+        return missing, canonical_json({key: source.get(key) for key in keys})
+    if not entry.condition.test(ctx):
+        return None
+    if entry.section == "rules":
+        return canonical_json(source.get("then", {}))
+    if entry.section == "tests":
+        return canonical_json([source.get("require", []), source.get("reference"), source.get("needs_verification", True)])
+    try:
+        value = entry.compute.evaluate(ctx.payload)
+    except Exception:
+        return _FAILED
+    output = [value, source["compute"].get("output_field"), source.get("reference"), source.get("needs_verification", True)]
+    return canonical_json(output)
+
+
+@dataclass(frozen=True)
+class PackImpact:
+    changes: tuple[EntryChange, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    @property
+    def fields(self) -> frozenset[str]:
+        return frozenset().union(*(change.fields for change in self.changes))
+
+    @property
+    def doc_types(self) -> frozenset[str] | None:
+        doc_types: set[str] = set()
+        for change in self.changes:
+            if change.doc_types is None:
+                return None
+            doc_types |= change.doc_types
+        return frozenset(doc_types)
+
+    def may_affect(self, payload: dict[str, Any], previous_payload: dict[str, Any] | None = None) -> bool:
+        """Whether evaluating ``payload`` under the new pack can give a different result than under the old one."""
+        doc_type = payload.get("doc_type")
+        ctx = EvalContext(payload={**payload, "computed": {}}, previous_payload=previous_payload)
+        for change in self.changes:
+            versions = [entry if entry is not None and entry.applies(doc_type) else None for entry in (change.old, change.new)]
+            if versions == [None, None]:
+                continue
+            # Values computed by ranges are not known without a full evaluation: stay conservative.
+            if change.reads_computed:
+                return True
+            old, new = (_output(entry, ctx) if entry is not None else None for entry in versions)
+            if old is _FAILED or new is _FAILED or old != new:
+                return True
+            if change.kind == "moved" and old is not None:
+                return True
+        return False
+
+    def as_dict(self) -> dict[str, Any]:
+        doc_types = self.doc_types
+        return {
+            "changes": [change.as_dict() for change in self.changes],
+            "fields": sorted(self.fields),
+            "doc_types": sorted(doc_types) if doc_types is not None else None,
+        }
+
+
+def _keyed(entries: tuple[CompiledEntry, ...]) -> dict[tuple[str, int], CompiledEntry]:
+    """Entries keyed by ``(id, occurrence)`` so duplicated ids still pair up in order."""
+    keyed, seen = {}, {}
+    for entry in entries:
+        occurrence = seen[entry.id] = seen.get(entry.id, -1) + 1
+        keyed[(entry.id, occurrence)] = entry
+    return keyed
+
+
+def diff_packs(old: dict[str, Any] | CompiledPack, new: dict[str, Any] | CompiledPack) -> PackImpact:
+    old = old if isinstance(old, CompiledPack) else compile_pack(old)
+    new = new if isinstance(new, CompiledPack) else compile_pack(new)
+    changes: list[EntryChange] = []
+    for section in SECTIONS:
+        before, after = _keyed(getattr(old, section)), _keyed(getattr(new, section))
+        kept_before = [key for key in before if key in after]
+        kept_after = [key for key in after if key in before]
+        # Output order follows pack order (ranges: dependency order), so a reordering touches every kept entry.
+        moved = kept_before != kept_after
+        for key, entry in before.items():
+            if key not in after:
+                changes.append(EntryChange(section, entry.id, "removed", entry, None))
+        for key, entry in after.items():
+            previous = before.get(key)
+            if previous is None:
+                changes.append(EntryChange(section, entry.id, "added", None, entry))
+            elif canonical_json(previous.source) != canonical_json(entry.source):
+                changes.append(EntryChange(section, entry.id, "changed", previous, entry))
+            elif moved:
+                changes.append(EntryChange(section, entry.id, "moved", previous, entry))
+    return PackImpact(tuple(changes))
+
+
+def load_compiled(rules_root: Path | str, relative_rule_path: str) -> CompiledPack:
+    """Compiled pack at ``rules_root``; a pack missing from the tree compiles as empty."""
+    if not (Path(rules_root) / relative_rule_path).exists():
+        return compile_pack({})
+    return compile_pack(RulePackLoader(rules_root).load(relative_rule_path))
+
+
+def pack_impacts(
+    old_root: Path | str, new_root: Path | str, packs: list[str] | None = None
+) -> dict[str, PackImpact]:
+    """Impact of every pack (default: all packs found in either tree) between two rules trees."""
+    if packs is None:
+        packs = sorted(set(discover_rule_packs(old_root)) | set(discover_rule_packs(new_root)))
+    return {pack: diff_packs(load_compiled(old_root, pack), load_compiled(new_root, pack)) for pack in packs}
@@ -1,28 +1,46 @@
 from __future__ import annotations
 
 import json
-from copy import deepcopy
 from pathlib import Path
 from typing import Any
 
-from .schema import validate_rule_pack
+from .schema import RuleSchemaError, validate_rule_pack
+
+PACK_FILENAME = "rules.json"
+
+
+def discover_rule_packs(rules_root: Path | str) -> list[str]:
+    """Relative paths of every ``<pack>/rules.json`` under ``rules_root`` (catalogs like ``common/*.json`` excluded)."""
+    root = Path(rules_root)
+    return sorted(path.relative_to(root).as_posix() for path in root.glob(f"*/{PACK_FILENAME}"))
+
+
+class RuleIncludeCycleError(RuleSchemaError):
+    pass
 
 
 class RulePackLoader:
-    def __init__(self, rules_root: Path | str):
+    """Loads a pack and its include graph; every file in the graph is read, merged and validated once per load.
+
+    Aggregates share entry dicts with the included packs they were built from instead of deep-copying them,
+    so loaded packs must be treated as read-only.
+    """
+
+    def __init__(self, rules_root: Path | str, validate_includes: bool = True):
         self.rules_root = Path(rules_root)
+        self.validate_includes = validate_includes
+        self.loaded_files: set[Path] = set()
 
     def _read_json(self, path: Path) -> dict[str, Any]:
+        self.loaded_files.add(path.resolve())
         with path.open("r", encoding="utf-8") as handle:
             return json.load(handle)
 
-    def _merge(self, base: dict[str, Any], incoming: dict[str, Any]) -> dict[str, Any]:
-        merged = deepcopy(base)
+    def _merge(self, merged: dict[str, Any], incoming: dict[str, Any]) -> None:
+        """Fold ``incoming`` into the aggregate being built; only the aggregate's own containers are written."""
         for key in ("variables", "rules", "ranges", "tests", "validations"):
-            merged.setdefault(key, [])
             merged[key].extend(incoming.get(key, []))
 
-        merged.setdefault("definitions", {})
         defs = incoming.get("definitions", {})
         for k, v in defs.items():
             if isinstance(v, dict):
@@ -35,34 +53,43 @@ class RulePackLoader:
         for key in ("standard", "part", "version", "scope", "metadata"):
             if key in incoming:
                 merged[key] = incoming[key]
-        return merged
 
     def load(self, relative_rule_path: str) -> dict[str, Any]:
-        path = self.rules_root / relative_rule_path
-        pack = self._read_json(path)
-
-        aggregate: dict[str, Any] = {
-            "standard": pack.get("standard"),
-            "part": pack.get("part", ""),
-            "version": pack.get("version", ""),
-            "scope": pack.get("scope", ""),
-            "metadata": pack.get("metadata", {}),
-            "definitions": {},
-            "variables": [],
-            "rules": [],
-            "ranges": [],
-            "tests": [],
-            "validations": [],
-        }
-
-        for include in pack.get("includes", []):
-            included_pack = self.load(include)
-            aggregate = self._merge(aggregate, included_pack)
-
-        aggregate = self._merge(aggregate, pack)
-
-        for override in pack.get("overrides", []):
-            aggregate = self._merge(aggregate, override)
-
-        validate_rule_pack(aggregate)
+        return self._load(relative_rule_path, validate=True, graph={}, stack=[])
+
+    def _load(self, relative_rule_path: str, validate: bool, graph: dict[str, dict[str, Any]], stack: list[str]) -> dict[str, Any]:
+        key = Path(relative_rule_path).as_posix()
+        if key in stack:
+            cycle = " -> ".join(stack[stack.index(key):] + [key])
+            raise RuleIncludeCycleError(f"Rule pack include cycle: {cycle}")
+        if key in graph:
+            return graph[key]
+
+        stack.append(key)
+        try:
+            pack = self._read_json(self.rules_root / relative_rule_path)
+            aggregate: dict[str, Any] = {
+                "standard": pack.get("standard"),
+                "part": pack.get("part", ""),
+                "version": pack.get("version", ""),
+                "scope": pack.get("scope", ""),
+                "metadata": pack.get("metadata", {}),
+                "definitions": {},
+                "variables": [],
+                "rules": [],
+                "ranges": [],
+                "tests": [],
+                "validations": [],
+            }
+            for include in pack.get("includes", []):
+                self._merge(aggregate, self._load(include, self.validate_includes, graph, stack))
+            self._merge(aggregate, pack)
+            for override in pack.get("overrides", []):
+                self._merge(aggregate, override)
+        finally:
+            stack.pop()
+
+        if validate:
+            validate_rule_pack(aggregate)
+        graph[key] = aggregate
         return aggregate
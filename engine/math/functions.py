@@ -1,31 +1,162 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable
 
+NUMBER = (int, float)
+TEXT = (str,)
+OPTIONAL_TEXT = (str, type(None))
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _fresh(value: Any) -> Any:
+    """Copy of a JSON-like result (dicts, lists, scalars)."""
+    if isinstance(value, dict):
+        return {key: _fresh(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fresh(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class FunctionSpec:
+    """A range function: ``arg_types`` gives the accepted types per positional argument (checked at pack load).
+
+    Pure functions are memoized in a bounded LRU; every call returns a fresh copy of the cached result, so callers
+    may mutate what they get. ``vectorized``, when given, takes one NumPy array per argument (float64 for numeric
+    arguments, object otherwise) and returns the list of results the scalar function would give row by row.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    arg_types: tuple[tuple[type, ...], ...]
+    pure: bool = True
+    cache_size: int = DEFAULT_CACHE_SIZE
+    vectorized: Callable[..., list[Any]] | None = None
+    call: Callable[..., Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "call", self._memoized() if self.pure and self.cache_size else self.func)
+
+    def _memoized(self) -> Callable[..., Any]:
+        func = self.func
+        cached = lru_cache(maxsize=self.cache_size, typed=True)(func)
+
+        def call(*args):
+            try:
+                return _fresh(cached(*args))
+            except TypeError:  # unhashable argument, e.g. a list from the payload
+                return func(*args)
+
+        call.__wrapped__ = func
+        call.cache_info = cached.cache_info
+        call.cache_clear = cached.cache_clear
+        return call
+
+    @property
+    def arity(self) -> int:
+        return len(self.arg_types)
+
+
+class FunctionRegistry(Mapping[str, Callable[..., Any]]):
+    """Name -> callable used by range expressions; ``spec(name)`` exposes arity, types, purity and batch support."""
+
+    def __init__(self):
+        self._specs: dict[str, FunctionSpec] = {}
+
+    def register(
+        self,
+        name: str,
+        arg_types: tuple[tuple[type, ...], ...],
+        pure: bool = True,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        vectorized: Callable[..., list[Any]] | None = None,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            self._specs[name] = FunctionSpec(name, func, tuple(arg_types), pure, cache_size, vectorized)
+            return func
+
+        return decorator
+
+    def spec(self, name: str) -> FunctionSpec | None:
+        return self._specs.get(name)
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        return self._specs[name].call
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+FUNCTION_REGISTRY = FunctionRegistry()
+
+POSITION_APPROVALS: Mapping[str, tuple[str, ...]] = {
+    "PA": ("PA",),
+    "PF": ("PA", "PC", "PF"),
+    "HL": ("PA", "PC", "HL"),
+}
+
+
+def round_array(values, digits: int = 3) -> list[float]:
+    """``[round(v, digits) for v in values]`` with identical results: NumPy rounds every element that is clearly
+    away from a decimal tie, Python's correctly-rounded ``round`` handles near-ties and very large magnitudes."""
+    import numpy as np
+
+    scale = 10.0**digits
+    scaled = values * scale
+    nearest = np.rint(scaled)
+    result = (nearest / scale).tolist()
+    exact = values.tolist()
+    with np.errstate(invalid="ignore"):
+        fallback = (np.abs(np.abs(scaled - nearest) - 0.5) < 1e-6) | ~(np.abs(scaled) < 2.0**30)
+    for index in np.flatnonzero(fallback):
+        result[index] = round(exact[index], digits)
+    return result
+
+
+def _range_thickness_batch(tested, product_form) -> list[dict[str, float | str]]:
+    import numpy as np
+
+    factor = np.where(product_form == "plate", 2.0, 1.5)
+    return [
+        {"min": low, "max": high, "unit": "mm"}
+        for low, high in zip(round_array(tested * 0.5), round_array(tested * factor))
+    ]
+
+
+def _range_diameter_batch(diameter) -> list[dict[str, float | str]]:
+    return [
+        {"min": low, "max": high, "unit": "mm"}
+        for low, high in zip(round_array(diameter * 0.5), round_array(diameter * 2.0))
+    ]
+
+
+def _range_position_batch(position) -> list[dict[str, str | list[str]]]:
+    return [range_position(value) for value in position.tolist()]
+
+
+@FUNCTION_REGISTRY.register("RANGE_THICKNESS", (NUMBER, OPTIONAL_TEXT), vectorized=_range_thickness_batch)
 def range_thickness(tested: float, product_form: str) -> dict[str, float | str]:
     factor = 2.0 if product_form == "plate" else 1.5
     return {"min": round(tested * 0.5, 3), "max": round(tested * factor, 3), "unit": "mm"}
 
 
+@FUNCTION_REGISTRY.register("RANGE_DIAMETER", (NUMBER,), vectorized=_range_diameter_batch)
 def range_diameter(diameter: float) -> dict[str, float | str]:
     return {"min": round(diameter * 0.5, 3), "max": round(diameter * 2.0, 3), "unit": "mm"}
 
 
+@FUNCTION_REGISTRY.register("RANGE_POSITION", (TEXT,), vectorized=_range_position_batch)
 def range_position(position: str) -> dict[str, str | list[str]]:
-    mapping = {
-        "PA": ["PA"],
-        "PF": ["PA", "PC", "PF"],
-        "HL": ["PA", "PC", "HL"],
-    }
-    return {"approved": mapping.get(position, [position]), "basis": position}
+    return {"approved": list(POSITION_APPROVALS.get(position, (position,))), "basis": position}
 
 
+# Pure, but its dict/list arguments cannot be cache keys.
+@FUNCTION_REGISTRY.register("NEEDS_REQUALIFICATION", ((dict,), (list,)), cache_size=0)
 def needs_requalification(changeset: dict, essential_vars: list[str]) -> bool:
     return any(changeset.get(field, False) for field in essential_vars)
-
-
-FUNCTION_REGISTRY = {
-    "RANGE_THICKNESS": range_thickness,
-    "RANGE_DIAMETER": range_diameter,
-    "RANGE_POSITION": range_position,
-    "NEEDS_REQUALIFICATION": needs_requalification,
-}
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+from .compiler import CompiledPack, resolve_path
+from .hashing import canonical_json
+
+
+class ResultBackend(Protocol):
+    def get(self, key: str) -> dict[str, Any] | None: ...
+
+    def set(self, key: str, value: dict[str, Any]) -> None: ...
+
+
+class InProcessResultBackend:
+    """Thread-safe LRU with an optional time-to-live (seconds)."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float | None, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class EvaluationCache:
+    """Memoizes evaluation results by pack content and the values of the fields the pack actually reads.
+
+    Fields no entry references (``history``, free-text notes, ...) are not part of the key, so editing them is
+    a cache hit. Previous values only matter for fields used by ``changed`` predicates.
+    """
+
+    def __init__(self, backend: ResultBackend | None = None):
+        self.backend = backend if backend is not None else InProcessResultBackend()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        plan: CompiledPack,
+        payload: dict[str, Any],
+        previous_payload: dict[str, Any] | None,
+        debug: bool,
+    ) -> str:
+        current = {field: resolve_path(payload, path) for field, path in plan.field_paths.items()}
+        previous = {
+            field: resolve_path(previous_payload, plan.field_paths[field]) if previous_payload else None
+            for field in plan.changed_fields
+        }
+        digest = hashlib.sha256(canonical_json([current, previous, debug]).encode("utf-8")).hexdigest()
+        return f"{plan.content_hash}:{digest}"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return copy.deepcopy(value) if value is not None else None
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        self.backend.set(key, copy.deepcopy(value))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,110 @@
+"""JSON-patch style deltas between payloads (``add``/``replace``/``remove`` ops on JSON pointer paths).
+
+``diff`` recurses into objects and into arrays of equal length; an array that changes length is replaced whole.
+``apply_patch`` never mutates its input: containers on the patched paths are copied and the rest is shared with
+the base document, so results must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+Patch = list[dict[str, Any]]
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def split_pointer(path: str) -> list[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {path!r}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+
+def diff(old: Any, new: Any, path: str = "") -> Patch:
+    """Ops turning ``old`` into ``new``; empty when they are equal (``1``, ``1.0`` and ``True`` differ)."""
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    if isinstance(old, dict):
+        ops: Patch = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff(old[key], value, child))
+        return ops
+    if isinstance(old, list):
+        if len(old) != len(new):
+            return [{"op": "replace", "path": path, "value": new}]
+        ops = []
+        for index, (before, after) in enumerate(zip(old, new)):
+            ops.extend(diff(before, after, f"{path}/{index}"))
+        return ops
+    return [] if old == new else [{"op": "replace", "path": path, "value": new}]
+
+
+def _index(container: list, token: str, path: str, allow_end: bool = False) -> int:
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise ValueError(f"Invalid array index in {path!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise ValueError(f"Array index out of range in {path!r}")
+    return index
+
+
+def apply_patch(document: Any, patch: Patch) -> Any:
+    """``document`` with ``patch`` applied, as produced by ``diff(document, result)``."""
+    root = {"": document}
+    copied: set[int] = set()
+
+    def writable(parent: Any, key: Any, path: str) -> Any:
+        child = parent[key]
+        if not isinstance(child, (dict, list)):  # a scalar on the way: the pointer goes nowhere
+            raise ValueError(f"Path not found: {path!r}")
+        if id(child) not in copied:
+            child = parent[key] = child.copy()
+            copied.add(id(child))
+        return child
+
+    copied.add(id(root))
+    for op in patch:
+        path, kind = op["path"], op["op"]
+        if kind not in ("add", "remove", "replace"):
+            raise ValueError(f"Unsupported op: {kind!r}")
+        tokens = ["", *split_pointer(path)]
+        parent = root
+        for token in tokens[:-1]:
+            if isinstance(parent, list):
+                token = _index(parent, token, path)
+            elif token not in parent:
+                raise ValueError(f"Path not found: {path!r}")
+            parent = writable(parent, token, path)
+        key = tokens[-1]
+        if isinstance(parent, list):
+            key = _index(parent, key, path, allow_end=kind == "add")
+            if kind == "add":
+                parent.insert(key, op["value"])
+            elif kind == "remove":
+                del parent[key]
+            else:
+                parent[key] = op["value"]
+        elif kind == "add":
+            parent[key] = op["value"]
+        elif key not in parent:
+            raise ValueError(f"Path not found: {path!r}")
+        elif kind == "remove":
+            del parent[key]
+        else:
+            parent[key] = op["value"]
+    return root[""]
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import replace
+from time import perf_counter
+from typing import Any, Callable
+
+from .compiler import CompiledCondition, CompiledEntry, CompiledPack, _all, _any
+from .expressions import compile_expression
+from .math.functions import FUNCTION_REGISTRY
+
+
+def _pack_label(plan: CompiledPack) -> str:
+    pack = plan.pack
+    return f"{pack.get('standard')}:{pack.get('version')}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class SectionClock:
+    def __init__(self, profiler: EvaluationProfiler, pack: str):
+        self.profiler = profiler
+        self.pack = pack
+        self.started = self.last = perf_counter()
+
+    def lap(self, section: str) -> None:
+        now = perf_counter()
+        self.profiler.record_section(self.pack, section, now - self.last)
+        self.last = now
+
+    def stop(self) -> None:
+        self.profiler.record_evaluation(self.pack, perf_counter() - self.started)
+
+
+class EvaluationProfiler:
+    """Opt-in, in-process aggregation of evaluation timings and predicate counts.
+
+    ``instrument(plan)`` returns a copy of a compiled plan whose conditions are wrapped with timers and
+    predicate counters; evaluators built without a profiler run the original closures untouched.
+    """
+
+    max_plans = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plans: OrderedDict[int, tuple[CompiledPack, CompiledPack]] = OrderedDict()
+        self.evaluations: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+        self.sections: dict[tuple[str, str], float] = defaultdict(float)
+        # (pack, section, entry id) -> [evaluations, fired, seconds, predicates evaluated, predicates available]
+        self.entries: dict[tuple[str, str, str], list[float]] = defaultdict(lambda: [0, 0, 0.0, 0, 0])
+        self.functions: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+
+    def instrument(self, plan: CompiledPack) -> CompiledPack:
+        with self._lock:
+            cached = self._plans.get(id(plan))
+            if cached is not None and cached[0] is plan:
+                self._plans.move_to_end(id(plan))
+                return cached[1]
+        pack = _pack_label(plan)
+        instrumented = plan.map_entries(lambda entry: self._instrument_entry(pack, entry))
+        with self._lock:
+            self._plans[id(plan)] = (plan, instrumented)
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return instrumented
+
+    def _instrument_entry(self, pack: str, entry: CompiledEntry) -> CompiledEntry:
+        if entry.compute is not None:
+            functions = {name: self.timed_function(name, FUNCTION_REGISTRY[name]) for name in entry.compute.functions}
+            entry = replace(entry, compute=compile_expression(entry.compute.source, functions))
+        if entry.condition.mode == "always":
+            return entry
+        state = threading.local()
+        condition = _counted(entry.condition, state)
+        available = sum(1 for _ in entry.condition.iter_predicates())
+        key = (pack, entry.section, entry.id)
+        entry = replace(entry, condition=replace(condition, test=self._timed(key, condition.test, state, available)))
+        if entry.discriminator is not None:
+            # Alpha index hits only run the residual; the discriminator was checked by the hash lookup.
+            rest = tuple(_counting(p.test, state) for p in condition.predicates if p is not entry.discriminator)
+            entry = replace(entry, residual=self._timed(key, _all(rest), state, available, already_evaluated=1))
+        return entry
+
+    def _timed(self, key, inner, state: threading.local, available: int, already_evaluated: int = 0):
+        def timed(ctx) -> bool:
+            state.evaluated = already_evaluated
+            started = perf_counter()
+            fired = inner(ctx)
+            self.record_entry(key, perf_counter() - started, fired, state.evaluated, available)
+            return fired
+
+        return timed
+
+    def timed_function(self, name: str, func: Callable) -> Callable:
+        def timed(*args):
+            started = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self.record_function(name, perf_counter() - started)
+
+        return timed
+
+    def clock(self, plan: CompiledPack) -> SectionClock:
+        return SectionClock(self, _pack_label(plan))
+
+    def record_entry(self, key, seconds: float, fired: bool, evaluated: int, available: int) -> None:
+        with self._lock:
+            stats = self.entries[key]
+            stats[0] += 1
+            stats[1] += 1 if fired else 0
+            stats[2] += seconds
+            stats[3] += evaluated
+            stats[4] += available
+
+    def record_section(self, pack: str, section: str, seconds: float) -> None:
+        with self._lock:
+            self.sections[(pack, section)] += seconds
+
+    def record_evaluation(self, pack: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.evaluations[pack]
+            stats[0] += 1
+            stats[1] += seconds
+
+    def record_function(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.functions[name]
+            stats[0] += 1
+            stats[1] += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.evaluations.clear()
+            self.sections.clear()
+            self.entries.clear()
+            self.functions.clear()
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            evaluations = {k: list(v) for k, v in self.evaluations.items()}
+            sections = dict(self.sections)
+            entries = {k: list(v) for k, v in self.entries.items()}
+            functions = {k: list(v) for k, v in self.functions.items()}
+
+        lines: list[str] = []
+
+        def metric(name: str, help_text: str, samples) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{_labels(**labels)} {value}" for labels, value in samples)
+
+        metric("rule_engine_evaluations_total", "Evaluations run per pack.",
+               ((dict(pack=p), v[0]) for p, v in evaluations.items()))
+        metric("rule_engine_evaluation_seconds_total", "Wall time spent evaluating per pack.",
+               ((dict(pack=p), v[1]) for p, v in evaluations.items()))
+        metric("rule_engine_section_seconds_total", "Wall time spent per pack section.",
+               ((dict(pack=p, section=s), v) for (p, s), v in sections.items()))
+        metric("rule_engine_entry_evaluations_total", "Condition evaluations per entry.",
+               ((dict(pack=p, section=s, entry=e), v[0]) for (p, s, e), v in entries.items()))
+        metric("rule_engine_entry_fired_total", "Condition evaluations that matched per entry.",
+               ((dict(pack=p, section=s, entry=e), v[1]) for (p, s, e), v in entries.items()))
+        metric("rule_engine_entry_seconds_total", "Time spent evaluating each entry's condition.",
+               ((dict(pack=p, section=s, entry=e), v[2]) for (p, s, e), v in entries.items()))
+        metric("rule_engine_predicates_evaluated_total", "Predicates actually evaluated per entry.",
+               ((dict(pack=p, section=s, entry=e), v[3]) for (p, s, e), v in entries.items()))
+        metric("rule_engine_predicates_short_circuited_total", "Predicates skipped by all/any short-circuiting.",
+               ((dict(pack=p, section=s, entry=e), v[4] - v[3]) for (p, s, e), v in entries.items()))
+        metric("rule_engine_function_calls_total", "Range function calls.",
+               ((dict(function=f), v[0]) for f, v in functions.items()))
+        metric("rule_engine_function_seconds_total", "Time spent in range functions.",
+               ((dict(function=f), v[1]) for f, v in functions.items()))
+        return "\n".join(lines) + "\n"
+
+
+def _counting(test, state: threading.local):
+    def run(ctx) -> bool:
+        state.evaluated += 1
+        return test(ctx)
+
+    return run
+
+
+def _counted(condition: CompiledCondition, state: threading.local) -> CompiledCondition:
+    if condition.mode in ("all", "any"):
+        tests = tuple(_counting(predicate.test, state) for predicate in condition.predicates)
+        return replace(condition, test=_all(tests) if condition.mode == "all" else _any(tests))
+    if condition.mode == "not":
+        inner = _counted(condition.negated, state)
+        inner_test = inner.test
+        return replace(condition, negated=inner, test=lambda ctx: not inner_test(ctx))
+    return condition
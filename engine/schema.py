@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+from .hashing import content_hash
+
 try:
     from jsonschema import Draft202012Validator
 except Exception:  # pragma: no cover
     Draft202012Validator = None
 
 SCHEMA_PATH = Path(__file__).resolve().parent / "schema" / "rule_pack.schema.json"
+VALIDATED_CACHE_SIZE = 256
 REQUIRED_KEYS = {"standard", "part", "version", "scope", "metadata", "definitions", "variables", "rules", "ranges", "tests", "validations"}
 
 
@@ -30,13 +36,47 @@ def _fallback_validate(rule_pack: dict[str, Any]) -> None:
         raise RuleSchemaError("Rule pack validation failed: rules must be an array")
 
 
-def validate_rule_pack(rule_pack: dict[str, Any]) -> None:
+@lru_cache(maxsize=1)
+def get_validator():
+    return Draft202012Validator(load_schema())
+
+
+_validated: OrderedDict[str, None] = OrderedDict()
+_validated_lock = threading.Lock()
+
+
+def _already_validated(digest: str) -> bool:
+    with _validated_lock:
+        if digest in _validated:
+            _validated.move_to_end(digest)
+            return True
+        return False
+
+
+def _remember_validated(digest: str) -> None:
+    with _validated_lock:
+        _validated[digest] = None
+        while len(_validated) > VALIDATED_CACHE_SIZE:
+            _validated.popitem(last=False)
+
+
+def clear_validation_cache() -> None:
+    with _validated_lock:
+        _validated.clear()
+
+
+def validate_rule_pack(rule_pack: dict[str, Any], memoize: bool = True) -> None:
+    """Validate against the pack schema; packs whose canonical content already passed are not re-checked."""
     if Draft202012Validator is None:
         _fallback_validate(rule_pack)
         return
 
-    validator = Draft202012Validator(load_schema())
-    errors = sorted(validator.iter_errors(rule_pack), key=lambda err: err.path)
+    digest = content_hash(rule_pack) if memoize else None
+    if digest is not None and _already_validated(digest):
+        return
+    errors = sorted(get_validator().iter_errors(rule_pack), key=lambda err: err.path)
     if errors:
         details = "; ".join(error.message for error in errors)
         raise RuleSchemaError(f"Rule pack validation failed: {details}")
+    if digest is not None:
+        _remember_validated(digest)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from .compiler import (
+    COMPUTED_PREFIX,
+    CompiledCondition,
+    CompiledEntry,
+    CompiledPack,
+    CompiledPredicate,
+    resolve_path,
+    split_path,
+    value_test,
+)
+from .evaluator import EvalContext, RuleEvaluator
+from .explanations import build_finding
+from .math.functions import FUNCTION_REGISTRY
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+# Integers beyond this lose precision as float64, so such columns stay on the object path.
+_EXACT_FLOAT_INT = 2**53
+
+
+def _is_number(value: Any) -> bool:
+    if type(value) is float:
+        return True
+    return type(value) is int and abs(value) <= _EXACT_FLOAT_INT
+
+
+class ColumnBatch:
+    """N payloads exploded into one NumPy column per referenced field path."""
+
+    def __init__(self, payloads: Sequence[dict[str, Any]], previous_payloads: Sequence[dict[str, Any] | None]):
+        self.payloads = payloads
+        self.previous_payloads = previous_payloads
+        self.size = len(payloads)
+        self._columns: dict[tuple[str, ...], Any] = {}
+        self._previous_columns: dict[tuple[str, ...], Any] = {}
+        self._none_masks: dict[tuple[str, ...], Any] = {}
+        self._numeric: dict[tuple[str, ...], Any] = {}
+
+    def column(self, path: tuple[str, ...]):
+        if path not in self._columns:
+            self._columns[path] = np.fromiter((resolve_path(p, path) for p in self.payloads), dtype=object, count=self.size)
+        return self._columns[path]
+
+    def previous_column(self, path: tuple[str, ...]):
+        if path not in self._previous_columns:
+            values = (resolve_path(p, path) if p else None for p in self.previous_payloads)
+            self._previous_columns[path] = np.fromiter(values, dtype=object, count=self.size)
+        return self._previous_columns[path]
+
+    def none_mask(self, path: tuple[str, ...]):
+        if path not in self._none_masks:
+            self._none_masks[path] = np.fromiter((v is None for v in self.column(path)), dtype=bool, count=self.size)
+        return self._none_masks[path]
+
+    def numeric(self, path: tuple[str, ...]):
+        """Float64 view of the column (NaN for missing), or None when any value is not a plain number."""
+        if path not in self._numeric:
+            column = self.column(path)
+            if all(v is None or _is_number(v) for v in column):
+                self._numeric[path] = np.fromiter((np.nan if v is None else v for v in column), dtype=float, count=self.size)
+            else:
+                self._numeric[path] = None
+        return self._numeric[path]
+
+    def apply(self, check, column):
+        return np.fromiter(map(check, column), dtype=bool, count=self.size)
+
+    def context(self, index: int) -> EvalContext:
+        return EvalContext(payload=self.payloads[index], previous_payload=self.previous_payloads[index])
+
+
+class ColumnarEvaluator:
+    """Evaluates a whole batch predicate-by-predicate as boolean masks.
+
+    Produces exactly ``RuleEvaluator.evaluate`` output for every row. Comparisons on purely numeric columns run
+    as NumPy array ops; other operators are mapped over the column once. If a condition raises for the batch
+    (e.g. ordering a string against a number), that entry is re-evaluated row by row with the scalar closures so
+    short-circuiting and exceptions match the per-document engine.
+    """
+
+    def __init__(self, pack: dict[str, Any] | CompiledPack, debug: bool = False):
+        if np is None:
+            raise RuntimeError("Columnar evaluation requires numpy to be installed.")
+        self.evaluator = RuleEvaluator(pack, debug=debug)
+        self.plan = self.evaluator.plan
+        self.debug = debug
+
+    def _predicate_mask(self, batch: ColumnBatch, predicate: CompiledPredicate):
+        op, expected, path = predicate.op, predicate.value, predicate.path
+        if op in ("exists", "not_exists"):
+            missing = batch.none_mask(path)
+            wants_missing = (op == "exists") is not bool(expected)
+            return missing if wants_missing else ~missing
+        if op == "changed":
+            changed = np.fromiter(
+                (p != c for p, c in zip(batch.previous_column(path), batch.column(path))), dtype=bool, count=batch.size
+            )
+            return changed if bool(expected) else ~changed
+        if op in ("eq", "neq", "gt", "gte", "lt", "lte") and _is_number(expected):
+            values = batch.numeric(path)
+            if values is not None:
+                with np.errstate(invalid="ignore"):
+                    return {
+                        "eq": np.equal,
+                        "neq": np.not_equal,
+                        "gt": np.greater,
+                        "gte": np.greater_equal,
+                        "lt": np.less,
+                        "lte": np.less_equal,
+                    }[op](values, expected)
+        return batch.apply(value_test(op, expected), batch.column(path))
+
+    def _condition_mask(self, batch: ColumnBatch, condition: CompiledCondition):
+        if condition.mode == "all":
+            mask = np.ones(batch.size, dtype=bool)
+            for predicate in condition.predicates:
+                mask &= self._predicate_mask(batch, predicate)
+            return mask
+        if condition.mode == "any":
+            mask = np.zeros(batch.size, dtype=bool)
+            for predicate in condition.predicates:
+                mask |= self._predicate_mask(batch, predicate)
+            return mask
+        if condition.mode == "not":
+            return ~self._condition_mask(batch, condition.negated)
+        return np.ones(batch.size, dtype=bool)
+
+    def _entry_mask(self, batch: ColumnBatch, entry: CompiledEntry, applies):
+        try:
+            return applies & self._condition_mask(batch, entry.condition)
+        except Exception:
+            mask = np.zeros(batch.size, dtype=bool)
+            for index in np.flatnonzero(applies):
+                mask[index] = entry.condition.test(batch.context(index))
+            return mask
+
+    def _range_values(self, batch: ColumnBatch, range_rule: CompiledEntry, rows) -> list[Any]:
+        """Range results for ``rows``: one call to the function's array implementation when the expression is a
+        single registered call on paths/literals and every argument has an accepted type; row by row otherwise."""
+        call = range_rule.compute.call
+        spec = FUNCTION_REGISTRY.spec(call[0]) if call is not None else None
+        if spec is not None and spec.vectorized is not None and len(rows):
+            columns = []
+            for (kind, value), types in zip(call[1], spec.arg_types):
+                if all(issubclass(t, (int, float)) for t in types):
+                    # Numeric arguments: the batch's float64 view, as long as no selected row is missing or non-numeric.
+                    if kind == "field":
+                        numeric = batch.numeric(split_path(value))
+                        column = numeric[rows] if numeric is not None else None
+                    else:
+                        column = np.full(len(rows), float(value)) if _is_number(value) else None
+                    if column is None or np.isnan(column).any():
+                        break
+                else:
+                    column = batch.column(split_path(value))[rows] if kind == "field" else np.full(len(rows), value, dtype=object)
+                    if not all(isinstance(v, types) for v in column):
+                        break
+                columns.append(column)
+            else:
+                return spec.vectorized(*columns)
+        return [range_rule.compute.evaluate(batch.payloads[index]) for index in rows]
+
+    def _applies_mask(self, batch: ColumnBatch, entry: CompiledEntry, cache: dict):
+        if entry.applies_to is None:
+            return np.ones(batch.size, dtype=bool)
+        if entry.applies_to not in cache:
+            cache[entry.applies_to] = batch.apply(entry.applies, batch.column(("doc_type",)))
+        return cache[entry.applies_to]
+
+    def evaluate_batch(
+        self,
+        payloads: Sequence[dict[str, Any]],
+        previous_payloads: Sequence[dict[str, Any] | None] | None = None,
+    ) -> list[dict[str, Any]]:
+        payloads = list(payloads)
+        size = len(payloads)
+        previous_payloads = [None] * size if previous_payloads is None else list(previous_payloads)
+        if len(previous_payloads) != size:
+            raise ValueError("previous_payloads must have the same length as payloads.")
+        findings: list[list[dict[str, Any]]] = [[] for _ in range(size)]
+        required_tests: list[list[dict[str, Any]]] = [[] for _ in range(size)]
+        approval_ranges: list[list[dict[str, Any]]] = [[] for _ in range(size)]
+        computed: list[dict[str, Any]] = [{} for _ in range(size)]
+        debug_rules: list[list[str]] = [[] for _ in range(size)]
+        invalid = np.zeros(size, dtype=bool)
+        augmented = [{**payload, "computed": row_computed} for payload, row_computed in zip(payloads, computed)]
+        batch = ColumnBatch(augmented, previous_payloads)
+        applies_cache: dict = {}
+
+        for range_rule in self.plan.ranges:
+            source = range_rule.source
+            out_field = source["compute"]["output_field"]
+            applies = self._applies_mask(batch, range_rule, applies_cache)
+            if any(field.startswith(COMPUTED_PREFIX) for field in range_rule.fields):
+                # Reads values produced earlier in this loop; columns built now would be cached incomplete.
+                mask = np.zeros(size, dtype=bool)
+                for index in np.flatnonzero(applies):
+                    mask[index] = range_rule.condition.test(batch.context(index))
+            else:
+                mask = self._entry_mask(batch, range_rule, applies)
+            rows = np.flatnonzero(mask)
+            for index, result in zip(rows, self._range_values(batch, range_rule, rows)):
+                if out_field.startswith(COMPUTED_PREFIX):
+                    computed[index][out_field.split(".", 1)[1]] = result
+                approval_ranges[index].append({
+                    "id": range_rule.id,
+                    "output_field": out_field,
+                    "value": result,
+                    "reference": source.get("reference"),
+                    "needs_verification": source.get("needs_verification", True),
+                })
+
+        for validation in self.plan.validations:
+            if not validation.required:
+                continue
+            applies = self._applies_mask(batch, validation, applies_cache)
+            missing_masks = [(field, batch.none_mask(path)) for field, path in validation.required]
+            any_missing = applies & np.logical_or.reduce([mask for _, mask in missing_masks])
+            source = validation.source
+            for index in np.flatnonzero(any_missing):
+                findings[index].append({
+                    "severity": source["severity"],
+                    "rule_id": validation.id,
+                    "field": ",".join(field for field, mask in missing_masks if mask[index]),
+                    "message": source.get("message"),
+                    "reference": source.get("reference"),
+                    "needs_verification": source.get("needs_verification", True),
+                })
+            if source["severity"] == "ERROR":
+                invalid |= any_missing
+
+        for rule in self.plan.rules:
+            mask = self._entry_mask(batch, rule, self._applies_mask(batch, rule, applies_cache))
+            then = rule.source.get("then", {})
+            for index in np.flatnonzero(mask):
+                debug_rules[index].append(rule.id)
+                if then.get("add_finding"):
+                    findings[index].append(build_finding(rule.id, then["add_finding"]))
+            if then.get("invalidate"):
+                invalid |= mask
+
+        for test_rule in self.plan.tests:
+            source = test_rule.source
+            mask = self._entry_mask(batch, test_rule, self._applies_mask(batch, test_rule, applies_cache))
+            for index in np.flatnonzero(mask):
+                required_tests[index].append({
+                    "id": test_rule.id,
+                    "tests": source.get("require", []),
+                    "reference": source.get("reference"),
+                    "needs_verification": source.get("needs_verification", True),
+                })
+
+        outputs = []
+        for index in range(size):
+            severities = {f.get("severity") for f in findings[index]}
+            status = "INVALID" if invalid[index] or "ERROR" in severities else "WARNING" if "WARNING" in severities else "VALID"
+            output = {
+                "status": status,
+                "findings": findings[index],
+                "required_tests": required_tests[index],
+                "approval_ranges": approval_ranges[index],
+                "computed": computed[index],
+            }
+            if self.debug:
+                output["debug"] = {"triggered_rules": debug_rules[index]}
+            outputs.append(output)
+        return outputs
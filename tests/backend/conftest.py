@@ -0,0 +1,75 @@
+"""Django-backed tests: an in-memory SQLite test database for the session, each test inside a rolled-back
+transaction. ``backend/`` is appended after the repo root so ``engine`` stays the top-level package."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).resolve().parent
+BACKEND = HERE.parents[1] / "backend"
+for path in (str(HERE), str(BACKEND)):
+    if path not in sys.path:
+        sys.path.append(path)
+os.environ["DJANGO_SETTINGS_MODULE"] = "django_settings"
+
+import django  # noqa: E402
+
+django.setup()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def django_test_database():
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+    setup_test_environment()
+    databases = setup_databases(verbosity=0, interactive=False)
+    yield
+    teardown_databases(databases, verbosity=0)
+    teardown_test_environment()
+
+
+@pytest.fixture(autouse=True)
+def db(django_test_database):
+    from django.db import transaction
+
+    from core.coverage import COVERAGE
+    from core.history import HISTORY_CACHE
+
+    # Primary keys are reused after each rollback: drop process-wide state keyed by them.
+    HISTORY_CACHE.clear()
+    COVERAGE.reset()
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+@pytest.fixture
+def user():
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create(username="tester")
+
+
+@pytest.fixture
+def organization():
+    from core.models import Organization
+
+    return Organization.objects.create(name="Shop")
+
+
+@pytest.fixture
+def make_document(user, organization):
+    """``make_document(slug, payloads)``: a document on rule set ``slug`` with one version per payload."""
+    from core.history import append_version
+    from core.models import Document, RuleSet
+
+    def make(slug, payloads, title="doc"):
+        rule_set, _ = RuleSet.objects.get_or_create(slug=slug, defaults={"standard": slug, "version": "1"})
+        document = Document.objects.create(organization=organization, title=title, active_rule_set=rule_set)
+        for payload in payloads:
+            append_version(document, payload, user)
+        return document
+
+    return make
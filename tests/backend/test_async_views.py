@@ -0,0 +1,131 @@
+import json
+from contextlib import contextmanager
+
+from asgiref.sync import async_to_sync
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import AsyncClient
+
+from core.models import Document, RuleEvaluationResult
+
+from test_rule_engine import base_payload
+
+URL = "/api/rules/evaluate/async/"
+
+
+def wpq(months: int) -> dict:
+    payload = base_payload("WPQ")
+    payload["inputs"]["months_since_last_continuity"] = months
+    return payload
+
+
+def post(body: dict):
+    async def request():
+        return await AsyncClient().post(URL, json.dumps(body), content_type="application/json")
+
+    # async_to_sync from the test thread runs the view's ORM calls on it, inside the test transaction.
+    return async_to_sync(request)()
+
+
+@contextmanager
+def keep_connection():
+    """As the test client does: stop the request signals from closing the connection holding the test transaction."""
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        yield
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+def test_async_evaluation_persists_result_for_the_given_version(make_document):
+    document = make_document("iso_9606_1", [wpq(1), wpq(9)])
+    version = document.versions.get(version=2)
+    response = post({"rule_pack": "iso_9606_1/rules.json", "payload": wpq(9), "document": document.pk, "document_version": version.pk})
+    assert response.status_code == 200 and response.json()["status"] == "INVALID"
+    stored = RuleEvaluationResult.objects.get(document=document)
+    assert stored.document_version_id == version.pk and stored.status == "INVALID"
+    assert Document.objects.get(pk=document.pk).status == "INVALID"
+
+    # An older version is stored but leaves the document status to its latest version.
+    first = document.versions.get(version=1)
+    response = post({"rule_pack": "iso_9606_1/rules.json", "payload": wpq(1), "document": document.pk, "document_version": first.pk})
+    assert response.status_code == 200 and response.json()["status"] == "VALID"
+    assert Document.objects.get(pk=document.pk).status == "INVALID"
+
+    response = post({"rule_pack": "iso_9606_1/rules.json", "payload": wpq(1)})
+    assert response.status_code == 200 and response.json()["status"] == "VALID"
+    assert RuleEvaluationResult.objects.count() == 2
+
+
+def test_async_evaluation_rejects_a_version_of_another_document(make_document):
+    document = make_document("iso_9606_1", [wpq(1)])
+    other = make_document("iso_9606_1", [wpq(1)], title="other")
+    foreign = other.versions.get().pk
+    body = {"rule_pack": "iso_9606_1/rules.json", "payload": wpq(1), "document": document.pk, "document_version": foreign}
+
+    response = post(body)
+    assert response.status_code == 400 and "document_version" in response.json()
+    response = post({**body, "document": None})
+    assert response.status_code == 400 and "document" in response.json()
+    response = post({**body, "rule_pack": "../rules.json"})
+    assert response.status_code == 400 and "rule_pack" in response.json()
+    assert not RuleEvaluationResult.objects.exists()
+
+
+def test_async_evaluation_only_persists_stored_versions_under_their_rule_set(make_document):
+    document = make_document("iso_9606_1", [wpq(9), wpq(1)])
+    body = {"rule_pack": "iso_9606_1/rules.json", "payload": wpq(1), "document": document.pk}
+
+    for forged, field in (
+        ({"payload": wpq(9)}, "payload"),
+        ({"previous_payload": wpq(1)}, "previous_payload"),
+        ({"rule_pack": "iso_15614_1/rules.json"}, "rule_pack"),
+        ({"document": document.pk + 100}, "document"),
+    ):
+        response = post({**body, **forged})
+        assert response.status_code == 400 and field in response.json()
+    assert not RuleEvaluationResult.objects.exists()
+
+    Document.objects.filter(pk=document.pk).update(status="INVALID")
+    response = post(body)
+    assert response.status_code == 200 and response.json()["status"] == "VALID"
+    stored = RuleEvaluationResult.objects.get(document=document)
+    assert stored.document_version == document.versions.get(version=2)
+    assert Document.objects.get(pk=document.pk).status == "VALID"
+
+
+def test_asgi_application_routes_async_evaluation():
+    from config.asgi import application
+
+    body = json.dumps({"rule_pack": "iso_9606_1/rules.json", "payload": wpq(9)}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": URL,
+        "raw_path": URL.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    with keep_connection():
+        async_to_sync(application)(scope, receive, send)
+    assert sent[0]["type"] == "http.response.start" and sent[0]["status"] == 200
+    result = json.loads(b"".join(message.get("body", b"") for message in sent[1:]))
+    assert result["status"] == "INVALID"
+    assert [finding["rule_id"] for finding in result["findings"]] == ["iso9606_missing_continuity_event"]
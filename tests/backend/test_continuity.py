@@ -0,0 +1,162 @@
+import io
+import json
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core import continuity
+from core.continuity import (
+    ExpiryQueue,
+    add_months,
+    confirmed_cutoff,
+    continuity_dates,
+    continuity_period_months,
+    months_between,
+    qualification_payload,
+)
+from core.models import Procedure, Qualification, Welder
+from engine.cache import RulePackCache
+
+from test_rule_engine import base_payload
+
+def schedule(*args) -> str:
+    out = io.StringIO()
+    call_command("schedule_continuity", *args, stdout=out)
+    return out.getvalue()
+
+
+def make_qualification(make_document, organization, confirmed_on, identifier="W1"):
+    document = make_document("iso_15614_1", [base_payload("WPS")])
+    procedure = Procedure.objects.create(document=document, procedure_type=Procedure.TYPE_WPS)
+    welder = Welder.objects.create(organization=organization, full_name="Welder", identifier=identifier)
+    return Qualification.objects.create(welder=welder, procedure=procedure, continuity_confirmed_on=confirmed_on)
+
+
+def test_add_months_gives_first_day_reaching_the_month_count():
+    day = date(2023, 1, 1)
+    while day < date(2025, 1, 1):
+        for months in (1, 6, 7):
+            crossing = add_months(day, months)
+            assert months_between(day, crossing) >= months > months_between(day, crossing - timedelta(days=1))
+            cutoff = confirmed_cutoff(day, months)
+            assert continuity_dates(cutoff, months)[1] <= day < continuity_dates(cutoff + timedelta(days=1), months)[1]
+        day += timedelta(days=1)
+
+
+def test_payload_carries_real_confirmation_date_and_elapsed_months():
+    procedure_payload = base_payload("WPS")
+    payload = qualification_payload(date(2024, 1, 31), procedure_payload, date(2024, 8, 30))
+    assert payload["doc_type"] == "WPQ"
+    assert payload["inputs"]["continuity_last_date"] == "2024-01-31"
+    assert payload["inputs"]["months_since_last_continuity"] == 6
+    assert payload["inputs"]["process"] == procedure_payload["inputs"]["process"]
+    assert qualification_payload(date(2024, 1, 31), None, date(2024, 8, 31))["inputs"] == {
+        "continuity_last_date": "2024-01-31",
+        "months_since_last_continuity": 7,
+    }
+
+
+def set_threshold(root, monkeypatch, months):
+    path = root / "iso_9606_1" / "rules.json"
+    pack = json.loads(path.read_text(encoding="utf-8"))
+    rule = next(r for r in pack["rules"] if r["id"] == "iso9606_missing_continuity_event")
+    rule["when"]["all"][0]["value"] = months
+    path.write_text(json.dumps(pack), encoding="utf-8")
+    monkeypatch.setattr(continuity, "RULE_PACKS", RulePackCache(root))
+
+
+def test_period_is_the_rule_threshold(rules_copy, monkeypatch):
+    assert continuity_period_months() == 6
+    set_threshold(rules_copy, monkeypatch, 3)
+    assert continuity_period_months() == 3
+
+
+def test_schedule_follows_writes_that_bypass_save(make_document, organization, rules_copy, monkeypatch):
+    qualification = make_qualification(make_document, organization, date(2024, 1, 31))
+    Qualification.objects.filter(pk=qualification.pk).update(continuity_confirmed_on=date(2024, 3, 10))
+    assert "Evaluated 0 qualifications" in schedule("--today", "2024-10-09")
+    assert "Evaluated 1 qualifications" in schedule("--today", "2024-10-10")
+    assert "Evaluated 0 qualifications" in schedule("--today", "2024-10-11")
+
+    qualification.refresh_from_db()
+    assert qualification.continuity_checked_for == date(2024, 3, 10)
+    qualification.continuity_confirmed_on = date(2024, 5, 2)
+    Qualification.objects.bulk_update([qualification], ["continuity_confirmed_on"])
+    assert "Evaluated 0 qualifications" in schedule("--today", "2024-12-01")
+
+    # A changed threshold applies to every stored confirmation, with nothing to recompute.
+    set_threshold(rules_copy, monkeypatch, 3)
+    assert "Evaluated 1 qualifications" in schedule("--today", "2024-09-02")
+
+
+def test_schedule_continuity_evaluates_only_crossed_qualifications(make_document, organization):
+    due = make_qualification(make_document, organization, date(2024, 1, 31), "W1")
+    covered = make_qualification(make_document, organization, date(2024, 3, 1), "W2")
+
+    assert "Evaluated 0 qualifications" in schedule("--today", "2024-08-30")
+    assert "Evaluated 1 qualifications" in schedule("--today", "2024-08-31", "--batch-size", "1")
+    due.refresh_from_db()
+    covered.refresh_from_db()
+    assert due.status == "INVALID"
+    assert [f["rule_id"] for f in due.findings] == ["iso9606_missing_continuity_event"]
+    assert due.evaluated_at is not None and due.continuity_checked_for == date(2024, 1, 31)
+    assert covered.evaluated_at is None and covered.continuity_checked_for is None
+
+    assert "Evaluated 0 qualifications" in schedule("--today", "2024-09-02")
+    assert "Evaluated 1 qualifications" in schedule("--today", "2024-10-01")
+    covered.refresh_from_db()
+    assert covered.status == "INVALID" and covered.continuity_checked_for == date(2024, 3, 1)
+
+
+def test_expiry_queue_orders_updates_and_drops_keys():
+    queue = ExpiryQueue()
+    queue.push(1, date(2024, 5, 3))
+    queue.push(2, date(2024, 5, 1))
+    queue.push(3, date(2024, 5, 2))
+    queue.push(1, date(2024, 5, 1))  # moved earlier
+    queue.push(3, None)  # no longer due
+    queue.push(2, date(2024, 5, 1))  # unchanged
+    assert len(queue) == 2 and queue.peek() == date(2024, 5, 1)
+    assert queue.pop_due(date(2024, 4, 30)) == []
+    assert sorted(queue.pop_due(date(2024, 5, 1))) == [1, 2]
+    assert len(queue) == 0 and queue.peek() is None
+
+    queue.push(4, date(2024, 6, 1))
+    queue.push(4, date(2024, 7, 1))  # moved later: the stale heap entry is skipped
+    assert queue.pop_due(date(2024, 6, 30)) == [] and queue.peek() == date(2024, 7, 1)
+
+
+class StopLoop(Exception):
+    pass
+
+
+def test_loop_picks_up_qualifications_entering_the_horizon(make_document, organization, monkeypatch):
+    from core.management.commands import schedule_continuity
+
+    soon = make_qualification(make_document, organization, date(2024, 1, 31), "W1")  # due 2024-08-31
+    later = make_qualification(make_document, organization, date(2024, 3, 1), "W2")  # due 2024-10-01, never changes
+    days = iter([date(2024, 8, 31), date(2024, 10, 1)])
+    today = {"value": next(days)}
+    localdate = timezone.localdate
+
+    def fake_localdate(value=None, timezone=None):
+        return today["value"] if value is None else localdate(value)
+
+    def fake_sleep(seconds):
+        today["value"] = next(days, None)
+        if today["value"] is None:
+            raise StopLoop
+
+    monkeypatch.setattr(schedule_continuity.timezone, "localdate", fake_localdate)
+    monkeypatch.setattr(schedule_continuity.time, "sleep", fake_sleep)
+    out = io.StringIO()
+    with pytest.raises(StopLoop):
+        call_command("schedule_continuity", "--loop", "--horizon-days", "7", stdout=out)
+
+    assert out.getvalue().count("evaluated 1 qualifications") == 2
+    for qualification in (soon, later):
+        qualification.refresh_from_db()
+        assert qualification.status == "INVALID"
+        assert qualification.continuity_checked_for == qualification.continuity_confirmed_on
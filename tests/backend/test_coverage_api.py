@@ -0,0 +1,73 @@
+from datetime import date
+
+from rest_framework.test import APIClient
+
+from core.coverage import COVERAGE, CoverageRegistry
+from core.models import Procedure, Qualification, RuleEvaluationResult, Welder
+
+from test_rule_engine import base_payload
+
+
+def evaluate(document, low, high, pk=None):
+    return RuleEvaluationResult.objects.create(
+        pk=pk,
+        document=document,
+        document_version=document.versions.latest("version"),
+        rule_set=document.active_rule_set,
+        status="VALID",
+        computed={"thickness_approved_mm": {"min": low, "max": high}, "positions_approved": ["PA", "PF"]},
+    )
+
+
+def procedure(make_document, title):
+    document = make_document("iso_15614_1", [base_payload("WPS")], title=title)
+    return Procedure.objects.create(document=document, procedure_type=Procedure.TYPE_WPS)
+
+
+def test_coverage_lists_covering_procedures_and_their_welders(make_document, organization):
+    thick, thin = procedure(make_document, "thick"), procedure(make_document, "thin")
+    evaluate(thick.document, 6, 24)
+    evaluate(thin.document, 1, 4)
+    welder = Welder.objects.create(organization=organization, full_name="Welder", identifier="W1")
+    qualification = Qualification.objects.create(welder=welder, procedure=thick, continuity_confirmed_on=date(2024, 1, 31))
+    Qualification.objects.create(welder=welder, procedure=thick, status="INVALID")
+
+    client = APIClient()
+    response = client.get("/api/coverage/", {"process": "135", "thickness": 10, "position": "PF"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["id"] for p in body["procedures"]] == [thick.pk]
+    assert body["welders"] == [{
+        "welder": welder.pk,
+        "full_name": "Welder",
+        "identifier": "W1",
+        "qualification": qualification.pk,
+        "procedure": thick.pk,
+        "continuity_until": "2024-08-30",
+    }]
+    assert client.get("/api/coverage/", {"thickness": 30}).json() == {"procedures": [], "welders": []}
+    assert client.get("/api/coverage/").status_code == 400
+
+
+def test_sync_finds_results_committed_behind_the_newest_primary_key(make_document):
+    early, late = procedure(make_document, "early"), procedure(make_document, "late")
+    # A pk handed to a transaction that commits after a later one.
+    reserved = evaluate(late.document, 1, 2)
+    reserved_pk = reserved.pk
+    reserved.delete()
+    evaluate(early.document, 6, 24)
+    assert COVERAGE.index().query(thickness=10) == [early.document_id]
+
+    evaluate(late.document, 6, 24, pk=reserved_pk)
+    assert COVERAGE.sync() == 1
+    assert sorted(COVERAGE.index().query(thickness=10)) == sorted([early.document_id, late.document_id])
+    assert COVERAGE.sync() == 0
+
+
+def test_periodic_rebuild_drops_deleted_results(make_document):
+    registry = CoverageRegistry(sync_interval=3600, rebuild_interval=0)
+    covered = procedure(make_document, "covered")
+    result = evaluate(covered.document, 6, 24)
+    assert registry.index().query(thickness=10) == [covered.document_id]
+    result.delete()
+    assert registry.index().query(thickness=10) == []
@@ -0,0 +1,68 @@
+import json
+
+from rest_framework.test import APIClient
+
+from test_rule_engine import base_payload
+
+BATCH_URL = "/api/rules/evaluate/batch/"
+PACK = "iso_9606_1/rules.json"
+
+
+def wpq(months: int) -> dict:
+    payload = base_payload("WPQ")
+    payload["inputs"]["months_since_last_continuity"] = months
+    return payload
+
+
+def stream(lines: list[str]) -> list[dict]:
+    body = "\n".join(lines) + "\n"
+    response = APIClient().post(f"{BATCH_URL}?rule_pack={PACK}", body, content_type="application/x-ndjson")
+    assert response.status_code == 200 and response["Content-Type"] == "application/x-ndjson"
+    return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+
+def test_batch_evaluates_payloads_in_order():
+    client = APIClient()
+    response = client.post(BATCH_URL, {"rule_pack": PACK, "payloads": [wpq(1), wpq(9), wpq(2)]}, format="json")
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == ["VALID", "INVALID", "VALID"]
+
+    body = {"rule_pack": PACK, "payloads": [wpq(1), wpq(9)], "previous_payloads": [None, wpq(1)]}
+    assert [r["status"] for r in client.post(BATCH_URL, body, format="json").json()["results"]] == ["VALID", "INVALID"]
+
+
+def test_batch_rejects_non_object_payloads_and_mismatched_lengths():
+    client = APIClient()
+    for body, field in (
+        ({"rule_pack": PACK, "payloads": [wpq(1), [1, 2]]}, "payloads"),
+        ({"rule_pack": PACK, "payloads": ["WPQ"]}, "payloads"),
+        ({"rule_pack": PACK, "payloads": [wpq(1)], "previous_payloads": [7]}, "previous_payloads"),
+        ({"rule_pack": PACK, "payloads": [wpq(1)], "previous_payloads": []}, "non_field_errors"),
+    ):
+        response = client.post(BATCH_URL, body, format="json")
+        assert response.status_code == 400 and field in response.json()
+
+    response = client.post("/api/rules/evaluate/", {"rule_pack": PACK, "payload": 3}, format="json")
+    assert response.status_code == 400 and "payload" in response.json()
+
+
+def test_stream_reports_bad_lines_in_place():
+    results = stream([
+        json.dumps({"payload": wpq(9)}),
+        "",
+        "{not json",
+        json.dumps([wpq(1)]),
+        json.dumps({"payload": "WPQ"}),
+        json.dumps({"payload": wpq(1), "previous_payload": 4}),
+        json.dumps({"previous_payload": wpq(1)}),
+        json.dumps({"payload": wpq(1), "previous_payload": wpq(9)}),
+    ])
+    assert results[0]["status"] == "INVALID"
+    assert [result.get("line") for result in results[1:6]] == [3, 4, 5, 6, 7]
+    assert all("error" in result for result in results[1:6])
+    assert results[6]["status"] == "VALID" and len(results) == 7
+
+
+def test_stream_requires_a_known_rule_pack():
+    response = APIClient().post(f"{BATCH_URL}?rule_pack=nope/rules.json", "{}\n", content_type="application/x-ndjson")
+    assert response.status_code == 400 and "rule_pack" in response.json()
@@ -0,0 +1,103 @@
+import io
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from core.history import HISTORY_CACHE, append_version, iter_version_pairs, payload_at, version_pairs
+from core.models import DocumentVersion
+
+from test_rule_engine import base_payload
+
+
+def revisions(count: int, seed: int = 0) -> list[dict]:
+    payloads = []
+    for index in range(count):
+        payload = base_payload("WPS")
+        payload["inputs"]["thickness_tested_mm"] = float(seed * 100 + index)
+        if index % 3 == 0:
+            payload["context"]["revision_note"] = f"r{index}"
+        payloads.append(payload)
+    return payloads
+
+
+def full_versions(document) -> set[int]:
+    rows = DocumentVersion.objects.filter(document=document).values_list("version", "delta")
+    return {version for version, delta in rows if delta is None}
+
+
+def compact(*args) -> str:
+    out = io.StringIO()
+    call_command("compact_history", *args, stdout=out)
+    return out.getvalue()
+
+
+@override_settings(HISTORY_SNAPSHOT_INTERVAL=4)
+def test_append_keeps_latest_and_snapshots_full_and_rebuilds_every_version(make_document):
+    payloads = revisions(10)
+    document = make_document("iso_15614_1", payloads)
+
+    assert full_versions(document) == {4, 8, 10}
+    assert DocumentVersion.objects.get(document=document, version=3).payload == {}
+
+    HISTORY_CACHE.clear()
+    assert [payload_at(document.pk, version) for version in range(1, 11)] == payloads
+    HISTORY_CACHE.clear()
+    pairs = version_pairs(document.pk)
+    assert [pair.version for pair in pairs] == list(range(1, 11))
+    assert [pair.payload for pair in pairs] == payloads
+    assert [pair.previous_payload for pair in pairs] == [None, *payloads[:-1]]
+
+    # A range straddling a snapshot only reads up to the snapshot that anchors its end.
+    HISTORY_CACHE.clear()
+    middle = version_pairs(document.pk, 3, 6)
+    assert [(pair.version, pair.payload, pair.previous_payload) for pair in middle] == [
+        (version, payloads[version - 1], payloads[version - 2]) for version in range(3, 7)
+    ]
+
+
+def test_version_pairs_over_several_documents(make_document):
+    expected = {}
+    for seed, count in enumerate((3, 1, 5)):
+        document = make_document("iso_15614_1", revisions(count, seed), title=f"d{seed}")
+        expected[document.pk] = revisions(count, seed)
+    documents = list(expected)
+
+    HISTORY_CACHE.clear()
+    pairs = list(iter_version_pairs(documents))
+    assert [pair.document_id for pair in pairs] == sorted(pair.document_id for pair in pairs)
+    for document_id, payloads in expected.items():
+        mine = [pair for pair in pairs if pair.document_id == document_id]
+        assert [pair.version for pair in mine] == list(range(1, len(payloads) + 1))
+        assert [pair.payload for pair in mine] == payloads
+        assert [pair.previous_payload for pair in mine] == [None, *payloads[:-1]]
+
+    ranged = list(iter_version_pairs(documents, start=2, end=3))
+    assert [(pair.document_id, pair.version) for pair in ranged] == [
+        (documents[0], 2), (documents[0], 3), (documents[2], 2), (documents[2], 3)
+    ]
+    assert all(pair.previous_payload == expected[pair.document_id][pair.version - 2] for pair in ranged)
+
+
+def test_compaction_is_idempotent_and_follows_interval_changes(make_document, user):
+    payloads = revisions(9)
+    document = make_document("iso_15614_1", [])
+    # Rows written before delta encoding: every version full.
+    for version, payload in enumerate(payloads, start=1):
+        DocumentVersion.objects.create(document=document, version=version, payload=payload, changed_by=user)
+
+    with override_settings(HISTORY_SNAPSHOT_INTERVAL=4):
+        assert "6 versions stored as deltas, 0 restored" in compact("--chunk-size", "1")
+        assert full_versions(document) == {4, 8, 9}
+        assert "0 versions stored as deltas, 0 restored" in compact()
+
+    with override_settings(HISTORY_SNAPSHOT_INTERVAL=3):
+        assert "2 versions stored as deltas, 2 restored" in compact()
+        assert full_versions(document) == {3, 6, 9}
+        assert "0 versions stored as deltas, 0 restored" in compact()
+        HISTORY_CACHE.clear()
+        assert [pair.payload for pair in version_pairs(document.pk)] == payloads
+
+        append_version(document, base_payload("WPS"), user)
+        assert "0 versions stored as deltas, 0 restored" in compact()
+        HISTORY_CACHE.clear()
+        assert [pair.payload for pair in version_pairs(document.pk)] == [*payloads, base_payload("WPS")]
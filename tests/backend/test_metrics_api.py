@@ -0,0 +1,45 @@
+import re
+
+from rest_framework.test import APIClient
+
+from core import views
+from engine import EvaluationCache, InProcessResultBackend
+from engine.cache import PackLoadStat
+from engine.profiling import EvaluationProfiler
+
+from test_rule_engine import base_payload
+
+
+def sample(body: str, name: str, **labels) -> float:
+    """Value of the ``name`` sample whose labels include ``labels``."""
+    for line in body.splitlines():
+        match = re.fullmatch(rf"{name}(?:\{{(.*)\}})? (\S+)", line)
+        if match and all(f'{key}="{value}"' in (match.group(1) or "") for key, value in labels.items()):
+            return float(match.group(2))
+    raise AssertionError(f"no {name} {labels} sample in:\n{body}")
+
+
+def test_metrics_expose_counters_after_an_evaluation(monkeypatch):
+    monkeypatch.setattr(views, "PROFILER", EvaluationProfiler())
+    monkeypatch.setattr(views, "RESULT_CACHE", EvaluationCache(InProcessResultBackend(maxsize=16)))
+    monkeypatch.setattr(views, "PRELOADED", [PackLoadStat("iso_9606_1/rules.json", 0.25, 4096)])
+    client = APIClient()
+
+    response = client.get("/api/metrics/")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "rule_engine_evaluations_total{" not in response.content.decode()
+
+    body = {"rule_pack": "iso_15614_1/rules.json", "payload": base_payload("WPS")}
+    for _ in range(2):
+        assert client.post("/api/rules/evaluate/", body, format="json").status_code == 200
+
+    metrics = client.get("/api/metrics/").content.decode()
+    assert "# TYPE rule_engine_evaluations_total counter" in metrics
+    assert sample(metrics, "rule_engine_evaluations_total") == 1
+    assert sample(metrics, "rule_engine_evaluation_seconds_total") > 0
+    assert sample(metrics, "rule_engine_entry_evaluations_total", section="rules") >= 1
+    assert sample(metrics, "rule_engine_result_cache_misses_total") == 1
+    assert sample(metrics, "rule_engine_result_cache_hits_total") == 1
+    assert sample(metrics, "rule_engine_pack_preload_seconds", pack="iso_9606_1/rules.json") == 0.25
+    assert sample(metrics, "rule_engine_pack_preload_rss_bytes", pack="iso_9606_1/rules.json") == 4096
@@ -0,0 +1,69 @@
+import gc
+import importlib.util
+from pathlib import Path
+
+import pytest
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from core import rule_packs
+from engine.cache import RulePackCache, discover_rule_packs
+
+REPO = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def packs(rules_copy, monkeypatch):
+    """``rules_copy`` behind a fresh ``RULE_PACKS``, with ``PRELOADED`` emptied for the test."""
+    monkeypatch.setattr(rule_packs, "RULE_PACKS", RulePackCache(rules_copy, maxsize=1))
+    monkeypatch.setattr(rule_packs, "PRELOADED", [])
+    return rules_copy
+
+
+def test_ready_preloads_every_pack_when_enabled(packs):
+    core = apps.get_app_config("core")
+    with override_settings(RULE_PACK_PRELOAD=False):
+        core.ready()
+    assert rule_packs.PRELOADED == [] and len(rule_packs.RULE_PACKS) == 0
+
+    with override_settings(RULE_PACK_PRELOAD=True):
+        core.ready()
+    assert [stat.path for stat in rule_packs.PRELOADED] == discover_rule_packs(packs)
+    assert len(rule_packs.RULE_PACKS) == len(rule_packs.PRELOADED)
+
+
+def test_ready_stops_the_boot_on_a_broken_pack(packs):
+    (packs / "iso_3834" / "rules.json").write_text("{", encoding="utf-8")
+    with override_settings(RULE_PACK_PRELOAD=True), pytest.raises(ImproperlyConfigured, match="iso_3834/rules.json"):
+        apps.get_app_config("core").ready()
+    assert rule_packs.PRELOADED == []
+
+
+class FakeLog:
+    def __init__(self):
+        self.lines = []
+
+    def info(self, message, *args):
+        self.lines.append(message % args)
+
+
+def test_gunicorn_when_ready_reports_packs_and_freezes_the_heap(packs, monkeypatch):
+    monkeypatch.setenv("RULE_PACK_PRELOAD", "0")  # the config only sets it when absent
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", REPO / "backend" / "gunicorn.conf.py")
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    assert config.preload_app is True and config.wsgi_app == "config.wsgi:application"
+
+    rule_packs.preload_rule_packs()
+    server = type("Server", (), {"log": FakeLog()})()
+    try:
+        config.when_ready(server)
+        frozen = gc.get_freeze_count()
+    finally:
+        gc.unfreeze()
+    assert frozen > 0
+    lines = server.log.lines
+    assert len(lines) == len(rule_packs.PRELOADED) + 1
+    assert lines[0].startswith(f"Rule pack {rule_packs.PRELOADED[0].path} loaded in ")
+    assert lines[-1] == f"Preloaded {len(rule_packs.PRELOADED)} rule packs; froze {frozen} objects before forking"
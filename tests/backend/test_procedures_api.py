@@ -0,0 +1,21 @@
+from rest_framework.test import APIClient
+
+from core.models import Procedure
+
+from test_rule_engine import base_payload
+
+
+def test_procedure_list_is_cursor_paginated(make_document):
+    procedures = [
+        Procedure.objects.create(document=make_document("iso_15614_1", [base_payload("WPS")]), procedure_type=Procedure.TYPE_WPS)
+        for _ in range(3)
+    ]
+    client = APIClient()
+    page = client.get("/api/procedures/", {"page_size": 2}).json()
+    assert set(page) == {"next", "previous", "results"} and page["previous"] is None
+    assert [row["id"] for row in page["results"]] == [procedures[2].pk, procedures[1].pk]
+    assert page["results"][0]["rule_set"] == "iso_15614_1" and page["results"][0]["latest_version"] == 1
+
+    last = client.get(page["next"]).json()
+    assert [row["id"] for row in last["results"]] == [procedures[0].pk]
+    assert last["next"] is None and last["previous"] is not None
@@ -0,0 +1,139 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from core.coverage import COVERAGE
+from core.management.commands import reevaluate_documents
+from core.models import Document, Procedure, RuleEvaluationResult
+
+from test_rule_engine import base_payload
+
+def wpq(months: int) -> dict:
+    payload = base_payload("WPQ")
+    payload["inputs"]["months_since_last_continuity"] = months
+    return payload
+
+
+def reevaluate(*args) -> str:
+    out = io.StringIO()
+    call_command("reevaluate_documents", "--workers", "1", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_selective_run_keeps_latest_version_as_current_evaluation(make_document, rules_copy):
+    old_root = rules_copy
+    path = old_root / "iso_9606_1" / "rules.json"
+    pack = json.loads(path.read_text(encoding="utf-8"))
+    pack["rules"][0]["when"]["all"][0]["value"] = 3
+    path.write_text(json.dumps(pack), encoding="utf-8")
+
+    # Version 1 (4 months) changes outcome between the packs; the latest (8 months) is invalid under both.
+    document = make_document("iso_9606_1", [wpq(4), wpq(8)])
+    Procedure.objects.create(document=document, procedure_type=Procedure.TYPE_WPS)
+    reevaluate()
+    assert COVERAGE.index().query(process="135") == []
+
+    reevaluate("--old-rules-root", str(old_root))
+    newest = RuleEvaluationResult.objects.filter(document=document).latest("created_at", "pk")
+    assert newest.document_version.version == 1 and newest.status == "VALID"
+
+    procedure = Procedure.objects.with_latest().get(document=document)
+    assert procedure.latest_version == 2 and procedure.latest_evaluation_status == "INVALID"
+    COVERAGE.sync()  # the old version's result is found, but the document keeps its latest evaluation
+    assert COVERAGE.index().query(process="135") == []
+    COVERAGE.reset()
+    assert COVERAGE.index().query(process="135") == []
+
+
+def test_run_writes_every_version_in_chunks_and_updates_status(make_document):
+    documents = [
+        make_document("iso_9606_1", [wpq(1), wpq(9)], title="expired"),
+        make_document("iso_9606_1", [wpq(9), wpq(2)], title="renewed"),
+        make_document("iso_9606_1", [wpq(3)], title="single"),
+    ]
+    output = reevaluate("--chunk-size", "2")
+    assert "Re-evaluated 2 documents (4 versions)." in output
+    assert "Done: 3 documents, 5 versions." in output
+
+    results = RuleEvaluationResult.objects.order_by("document_id", "document_version__version")
+    assert [(r.document_id, r.document_version.version, r.status) for r in results] == [
+        (documents[0].pk, 1, "VALID"), (documents[0].pk, 2, "INVALID"),
+        (documents[1].pk, 1, "INVALID"), (documents[1].pk, 2, "VALID"),
+        (documents[2].pk, 1, "VALID"),
+    ]
+    assert [Document.objects.get(pk=d.pk).status for d in documents] == ["INVALID", "VALID", "VALID"]
+    assert "Done: 0 documents" in reevaluate("--rule-set", "iso_15614_1")
+
+
+def test_interrupted_run_resumes_after_the_last_written_chunk(make_document, tmp_path, monkeypatch):
+    documents = [make_document("iso_9606_1", [wpq(1), wpq(9)], title=f"d{index}") for index in range(5)]
+    checkpoint = tmp_path / "reevaluate.json"
+    evaluate_version = reevaluate_documents.evaluate_version
+
+    def fail_on_last(task):
+        if task[0] == documents[-1].pk:
+            raise RuntimeError("worker lost")
+        return evaluate_version(task)
+
+    monkeypatch.setattr(reevaluate_documents, "evaluate_version", fail_on_last)
+    with pytest.raises(RuntimeError):
+        reevaluate("--chunk-size", "2", "--checkpoint", str(checkpoint))
+    assert json.loads(checkpoint.read_text(encoding="utf-8"))["last_document_id"] == documents[3].pk
+    assert RuleEvaluationResult.objects.count() == 8
+
+    monkeypatch.setattr(reevaluate_documents, "evaluate_version", evaluate_version)
+    output = reevaluate("--chunk-size", "2", "--checkpoint", str(checkpoint))
+    assert f"Resuming after document {documents[3].pk}." in output
+    assert "Done: 1 documents, 2 versions." in output
+    assert not checkpoint.exists()
+    counts = RuleEvaluationResult.objects.values_list("document_id").annotate(n=Count("pk")).order_by("document_id")
+    assert list(counts) == [(d.pk, 2) for d in documents]
+    assert set(Document.objects.values_list("status", flat=True)) == {"INVALID"}
+
+
+def test_crash_between_commit_and_checkpoint_does_not_duplicate_results(make_document, tmp_path, monkeypatch):
+    documents = [make_document("iso_9606_1", [wpq(1), wpq(9)], title=f"d{index}") for index in range(3)]
+    checkpoint = tmp_path / "reevaluate.json"
+    write_checkpoint = reevaluate_documents.Command._write_checkpoint
+    calls = []
+
+    def crash_after_first_chunk(self, path, last_document_id, started_at):
+        calls.append(last_document_id)
+        if len(calls) == 2:  # the first chunk has committed; its checkpoint is never written
+            raise RuntimeError("killed")
+        write_checkpoint(self, path, last_document_id, started_at)
+
+    monkeypatch.setattr(reevaluate_documents.Command, "_write_checkpoint", crash_after_first_chunk)
+    with pytest.raises(RuntimeError):
+        reevaluate("--chunk-size", "1", "--checkpoint", str(checkpoint))
+    assert json.loads(checkpoint.read_text(encoding="utf-8"))["last_document_id"] == 0
+    assert RuleEvaluationResult.objects.count() == 2
+
+    monkeypatch.setattr(reevaluate_documents.Command, "_write_checkpoint", write_checkpoint)
+    output = reevaluate("--chunk-size", "1", "--checkpoint", str(checkpoint))
+    assert "Resuming after document 0." in output and "Done: 3 documents, 4 versions." in output
+    counts = RuleEvaluationResult.objects.values_list("document_id").annotate(n=Count("pk")).order_by("document_id")
+    assert list(counts) == [(d.pk, 2) for d in documents]
+
+    # A later run is a new run: it writes every version again.
+    assert "Done: 3 documents, 6 versions." in reevaluate("--chunk-size", "2")
+
+
+def test_process_pool_matches_the_serial_run(make_document):
+    documents = [make_document("iso_9606_1", [wpq(months) for months in (1, 9, 4)], title=f"d{index}") for index in range(4)]
+    output = io.StringIO()
+    call_command("reevaluate_documents", "--workers", "2", "--chunk-size", "3", stdout=output)
+    assert "Done: 4 documents, 12 versions." in output.getvalue()
+    parallel = list(RuleEvaluationResult.objects.order_by("document_id", "document_version__version").values_list(
+        "document_id", "document_version__version", "status", "errors"
+    ))
+    RuleEvaluationResult.objects.all().delete()
+    reevaluate("--chunk-size", "3")
+    serial = list(RuleEvaluationResult.objects.order_by("document_id", "document_version__version").values_list(
+        "document_id", "document_version__version", "status", "errors"
+    ))
+    assert parallel == serial and len(serial) == 12
+    assert set(Document.objects.filter(pk__in=[d.pk for d in documents]).values_list("status", flat=True)) == {"VALID"}
@@ -1,6 +1,19 @@
+import shutil
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+RULES_ROOT = ROOT / "rules"
+
+
+@pytest.fixture
+def rules_copy(tmp_path) -> Path:
+    """A writable copy of the ``rules/`` tree at ``tmp_path / "rules"``, for tests that edit packs."""
+    root = tmp_path / "rules"
+    shutil.copytree(RULES_ROOT, root)
+    return root
@@ -0,0 +1,68 @@
+from benchmarks.synthetic import payload_corpus, synthetic_pack
+from engine import compiler
+from engine.compiler import compile_pack
+from engine.evaluator import RuleEvaluator
+from engine.profiling import EvaluationProfiler
+from test_rule_engine import minimal_pack
+
+
+def process_rule(index, process, extra=None):
+    predicates = [{"field": "inputs.process", "op": "eq", "value": process}, *(extra or [])]
+    return {"id": f"r{index}", "when": {"all": predicates}, "then": {"add_finding": {"severity": "WARNING", "message": str(index)}}}
+
+
+def test_indexed_evaluation_matches_linear_scan(monkeypatch):
+    pack = synthetic_pack("alpha", 400, seed=5)
+    payloads, previous = payload_corpus(100, seed=5)
+    indexed = RuleEvaluator(compile_pack(pack), debug=True)
+    assert indexed.plan.default_plan.indexes
+    monkeypatch.setattr(compiler, "INDEX_MIN_ENTRIES", 10**9)
+    linear = RuleEvaluator(compile_pack(pack), debug=True)
+    assert not linear.plan.default_plan.indexes
+    for payload, previous_payload in zip(payloads, previous):
+        assert indexed.evaluate(payload, previous_payload) == linear.evaluate(payload, previous_payload)
+
+
+def test_index_only_runs_candidates_and_shares_identical_predicates():
+    rules = [process_rule(i, ["135", "141", "111"][i % 3], [{"field": "inputs.t", "op": "gt", "value": i}]) for i in range(30)]
+    rules.append({"id": "any", "when": {"any": [{"field": "inputs.t", "op": "gt", "value": 0}]}, "then": {"add_finding": {"severity": "INFO", "message": "any"}}})
+    plan = compile_pack(minimal_pack(rules=rules))
+    assert plan.rules[0].condition.predicates[0] is plan.rules[3].condition.predicates[0]
+    candidates = plan.default_plan.matching("rules", {"inputs": {"process": "141", "t": 5}})
+    assert [entry.id for entry, _ in candidates] == [f"r{i}" for i in range(1, 30, 3)] + ["any"]
+    assert plan.default_plan.matching("rules", {"inputs": {"process": ["unhashable"]}})[-1][0].id == "any"
+
+    profiler = EvaluationProfiler()
+    result = RuleEvaluator(plan, debug=True, profiler=profiler).evaluate({"doc_type": "X", "inputs": {"process": "141", "t": 5}})
+    assert result["debug"]["triggered_rules"] == ["r1", "r4", "any"]
+    assert len(profiler.entries) == 11
+
+
+def test_sections_are_indexed_from_enough_discriminated_entries():
+    unindexed = [{"id": f"u{i}", "when": {"any": [{"field": "inputs.t", "op": "gt", "value": i}]}} for i in range(20)]
+    below = [process_rule(i, "135") for i in range(compiler.INDEX_MIN_ENTRIES - 1)]
+    assert not compile_pack(minimal_pack(rules=below + unindexed)).default_plan.indexes
+    at = [process_rule(i, "135") for i in range(compiler.INDEX_MIN_ENTRIES)]
+    assert "rules" in compile_pack(minimal_pack(rules=at)).default_plan.indexes
+
+
+class CountedValue(str):
+    comparisons = 0
+
+    def __eq__(self, other):
+        CountedValue.comparisons += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+def test_shared_predicates_run_once_per_evaluation():
+    shared = {"field": "inputs.code", "op": "eq", "value": "A"}
+    then = {"add_finding": {"severity": "INFO", "message": "m"}}
+    rules = [{"id": f"r{i}", "when": {"any": [shared, {"field": "inputs.t", "op": "gt", "value": i}]}, "then": then} for i in range(5)]
+    evaluator = RuleEvaluator(compile_pack(minimal_pack(rules=rules)), debug=True)
+    payload = {"doc_type": "X", "inputs": {"code": CountedValue("B"), "t": 2}}
+    for _ in range(2):
+        CountedValue.comparisons = 0
+        assert evaluator.evaluate(payload)["debug"]["triggered_rules"] == ["r0", "r1"]
+        assert CountedValue.comparisons == 1
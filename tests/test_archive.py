@@ -0,0 +1,57 @@
+import io
+import json
+
+from engine.archive import build_payload, read_records, validate_archive
+from engine.cli import main
+from test_rule_engine import RULES_ROOT
+
+CSV_ARCHIVE = """id,doc_type,Processo,thickness_tested_mm,context.product_form,position,months_since_last_continuity,wpq_valid
+a1,WPQ,135,12,plate,PF,2,true
+a2,WPQ,141,,pipe,PA,9,false
+a3,,111,8.5,plate,HL,1,true
+"""
+
+
+def test_build_payload_maps_and_coerces_columns():
+    record_id, payload = build_payload(
+        {"id": "a2", "doc_type": "WPQ", "Processo": "141", "thickness_tested_mm": "", "context.product_form": "pipe", "wpq_valid": "false", "od": "60.3"},
+        {"Processo": "inputs.process"},
+        keep_text=frozenset({"process"}),
+    )
+    assert record_id == "a2"
+    assert payload == {
+        "doc_type": "WPQ",
+        "inputs": {"process": "141", "wpq_valid": False, "od": 60.3},
+        "context": {"product_form": "pipe"},
+    }
+    assert build_payload({"id": 7, "payload": {"inputs": {"x": "1"}}}, {}, doc_type="WPS") == (7, {"inputs": {"x": "1"}, "doc_type": "WPS"})
+
+
+def test_validate_archive_streams_rows_in_order_with_summary():
+    output = io.StringIO()
+    summary = validate_archive(
+        read_records(io.StringIO(CSV_ARCHIVE), "csv"), RULES_ROOT, "iso_9606_1/rules.json", output,
+        mapping={"Processo": "inputs.process"}, doc_type="WPQ", chunk_size=2,
+    )
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [row["id"] for row in rows] == ["a1", "a2", "a3"]
+    assert [row["line"] for row in rows] == [2, 3, 4]
+    assert all("debug" not in row for row in rows)
+    result = summary.as_dict(top=1)
+    assert result["records"] == 3 and result["statuses"] == {"INVALID": 3}
+    assert result["top_rules"] == [{"rule_id": "required_fields_wpq", "count": 3}]
+
+
+def test_cli_validates_ndjson_across_workers(tmp_path, capsys):
+    archive = tmp_path / "archive.ndjson"
+    lines = [json.dumps({"id": i, "doc_type": "WPQ", "inputs": {"process": "135", "months_since_last_continuity": i}}) for i in range(10)]
+    archive.write_text("\n".join(lines[:5] + ["{broken"] + lines[5:]) + "\n")
+    output = tmp_path / "results.ndjson"
+    argv = ["--rules-root", str(RULES_ROOT), "validate-archive", "iso_9606_1/rules.json", str(archive), "--workers", "2", "--chunk-size", "3", "--output", str(output)]
+    assert main(argv) == 0
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["line"] for row in rows] == list(range(1, 12))
+    assert "invalid JSON" in rows[5]["error"]
+    summary = json.loads(capsys.readouterr().err)
+    assert summary["records"] == 11 and summary["statuses"]["ERROR"] == 1
+    assert {"rule_id": "iso9606_missing_continuity_event", "count": 3} in summary["top_rules"]
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+
+from engine import artifact
+from engine.artifact import _HEADER, _MAGIC, FORMAT_VERSION, ArtifactError, artifact_path, build_artifact, read_artifact
+from engine.cache import RulePackCache
+from engine.cli import main
+from engine.loader import RulePackLoader
+from engine.schema import RuleSchemaError
+
+RULES_ROOT = Path(__file__).resolve().parent.parent / "rules"
+
+
+def test_artifact_round_trips_aggregated_pack(rules_copy):
+    root = rules_copy
+    target = build_artifact(root, "ped_2014_68_eu/rules.json")
+    assert target == artifact_path(root, "ped_2014_68_eu/rules.json")
+    pack, sources = read_artifact(target, root)
+    assert pack == RulePackLoader(root).load("ped_2014_68_eu/rules.json")
+    assert {p.parent.name for p in sources} == {"ped_2014_68_eu", "iso_15614_1", "iso_9606_1"}
+
+
+def test_cache_prefers_fresh_artifact_and_ignores_stale_or_corrupt_ones(rules_copy, monkeypatch):
+    root = rules_copy
+    assert main(["--rules-root", str(root), "compile", "iso_9606_1/rules.json"]) == 0
+
+    monkeypatch.setattr(RulePackLoader, "load", lambda self, path: (_ for _ in ()).throw(AssertionError("parsed JSON")))
+    assert RulePackCache(root).load("iso_9606_1/rules.json")["standard"] == "ISO_9606"
+    monkeypatch.undo()
+
+    source = root / "iso_9606_1" / "rules.json"
+    data = json.loads(source.read_text(encoding="utf-8"))
+    data["standard"] = "ISO_9606_EDITED"
+    source.write_text(json.dumps(data), encoding="utf-8")
+    assert RulePackCache(root).load("iso_9606_1/rules.json")["standard"] == "ISO_9606_EDITED"
+
+    artifact_path(root, "iso_9606_1/rules.json").write_bytes(b"WRPK\x00\x01garbage")
+    assert RulePackCache(root).load("iso_9606_1/rules.json")["standard"] == "ISO_9606_EDITED"
+
+
+def test_pack_paths_cannot_leave_the_rules_root(rules_copy, tmp_path):
+    root = rules_copy
+    outside = tmp_path / "outside"
+    shutil.copytree(RULES_ROOT / "iso_9606_1", outside)
+    build_artifact(tmp_path, "outside/rules.json")
+    cache = RulePackCache(root)
+    for path in ("../outside/rules.json", str(outside / "rules.json"), "iso_9606_1/../../outside/rules.json"):
+        with pytest.raises(RuleSchemaError, match="outside the rules root"):
+            cache.load(path)
+    (root / "linked").symlink_to(outside, target_is_directory=True)
+    with pytest.raises(RuleSchemaError):
+        cache.load("linked/rules.json")
+
+
+def plant(target, value) -> None:
+    body = pickle.dumps(value)
+    target.write_bytes(_HEADER.pack(_MAGIC, FORMAT_VERSION, hashlib.sha256(body).digest()) + body)
+
+
+def test_artifacts_referencing_globals_are_rejected(rules_copy):
+    root = rules_copy
+    target = artifact_path(root, "iso_9606_1/rules.json")
+    plant(target, os.system)  # a valid hash does not make a planted artifact trusted
+    with pytest.raises(ArtifactError, match="posix.system|nt.system"):
+        read_artifact(target, root)
+    assert RulePackCache(root).load("iso_9606_1/rules.json")["standard"] == "ISO_9606"
+
+
+def test_malformed_bodies_and_other_engine_versions_are_rejected(rules_copy, monkeypatch):
+    root = rules_copy
+    target = build_artifact(root, "iso_9606_1/rules.json")
+    data = pickle.loads(target.read_bytes()[_HEADER.size:])
+    source = next(iter(data["sources"]))
+    for body in (
+        [1, 2],
+        {k: v for k, v in data.items() if k != "sources"},
+        {**data, "pack": "not a pack"},
+        {**data, "sources": {source: (1, 2)}},
+        {**data, "sources": [source]},
+    ):
+        plant(target, body)
+        with pytest.raises(ArtifactError, match="malformed artifact"):
+            read_artifact(target, root)
+        assert RulePackCache(root).load("iso_9606_1/rules.json")["standard"] == "ISO_9606"
+
+    build_artifact(root, "iso_9606_1/rules.json")
+    read_artifact(target, root)
+    monkeypatch.setattr(artifact, "engine_version", lambda: "0" * 64)
+    with pytest.raises(ArtifactError, match="another engine version"):
+        read_artifact(target, root)
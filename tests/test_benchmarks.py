@@ -0,0 +1,38 @@
+import json
+
+from benchmarks.run import compare, main
+from benchmarks.synthetic import payload_corpus, write_synthetic_tree
+from engine.evaluator import RuleEvaluator
+from engine.loader import RulePackLoader
+
+
+def test_synthetic_tree_is_valid_and_deterministic(tmp_path):
+    pack_path = write_synthetic_tree(tmp_path / "a", rules=120, include_depth=3, seed=3)
+    loader = RulePackLoader(tmp_path / "a")
+    pack = loader.load(pack_path)
+    assert len(pack["rules"]) == 120 and len(loader.loaded_files) == 4
+    write_synthetic_tree(tmp_path / "b", rules=120, include_depth=3, seed=3)
+    assert RulePackLoader(tmp_path / "b").load(pack_path) == pack
+
+    payloads, previous = payload_corpus(20, seed=3)
+    assert payload_corpus(20, seed=3) == (payloads, previous)
+    results = list(RuleEvaluator(pack).evaluate_many(payloads, previous))
+    assert {result["status"] for result in results} <= {"VALID", "WARNING", "INVALID"}
+
+
+def test_compare_flags_median_regressions_over_threshold():
+    baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}, "gone": {"median": 1.0}}
+    cases = {"fast": {"median": 1.1}, "slow": {"median": 1.3}, "new": {"median": 1.0}, "skip": {"skipped": "x"}}
+    rows = {row["case"]: row["regressed"] for row in compare(cases, baseline, threshold=0.15)}
+    assert rows == {"fast": False, "slow": True}
+
+
+def test_runner_writes_results_and_compares_with_baseline(tmp_path):
+    output = tmp_path / "bench.json"
+    argv = ["--rules", "40", "--include-depth", "1", "--payloads", "5", "--repeat", "1", "--skip-api", "--output", str(output)]
+    assert main(argv) == 0
+    results = json.loads(output.read_text())
+    assert results["cases"]["evaluator.evaluate"]["median"] > 0
+    results["cases"]["evaluator.evaluate"]["median"] = 1e-12
+    output.write_text(json.dumps(results))
+    assert main(argv[:-2] + ["--baseline", str(output)]) == 1
@@ -0,0 +1,91 @@
+import random
+from pathlib import Path
+
+from engine import coverage
+from engine.coverage import CoverageEntry, CoverageIndex, coverage_entry, iter_bits
+from engine.evaluator import RuleEvaluator
+from engine.loader import RulePackLoader
+
+from test_rule_engine import base_payload
+
+RULES_ROOT = Path(__file__).resolve().parent.parent / "rules"
+POSITIONS = ["PA", "PC", "PF", "HL", "PE"]
+
+
+def random_entry(rng: random.Random) -> CoverageEntry:
+    tested = rng.uniform(2, 40)
+    diameter = rng.uniform(20, 400)
+    return CoverageEntry(
+        process=rng.choice(["135", "141", "111"]),
+        thickness=(tested * 0.5, tested * 2) if rng.random() < 0.9 else None,
+        diameter=(diameter * 0.5, diameter * 2) if rng.random() < 0.5 else None,
+        positions=frozenset(rng.sample(POSITIONS, rng.randint(1, 3))),
+    )
+
+
+def brute_force(entries, process=None, thickness=None, diameter=None, position=None):
+    def covers(interval, value):
+        return value is None or (interval is not None and interval[0] <= value <= interval[1])
+
+    return sorted(
+        key for key, e in entries.items()
+        if (process is None or e.process == process)
+        and (position is None or position in e.positions)
+        and covers(e.thickness, thickness)
+        and covers(e.diameter, diameter)
+    )
+
+
+def test_iter_bits_lists_set_positions():
+    assert list(iter_bits(0)) == []
+    assert list(iter_bits(0b1011 | 1 << 300)) == [0, 1, 3, 300]
+
+
+def test_coverage_index_matches_brute_force_through_updates(monkeypatch):
+    monkeypatch.setattr(coverage, "BLOCK", 8)
+    monkeypatch.setattr(coverage, "DELTA_LIMIT", 20)
+    rng = random.Random(7)
+    entries = {key: random_entry(rng) for key in range(500)}
+    index = CoverageIndex(entries)
+
+    # Replacements, removals and new keys, crossing several delta rebuilds.
+    for _ in range(90):
+        key = rng.randrange(600)
+        if rng.random() < 0.2:
+            entries.pop(key, None)
+            index.update(key, None)
+        else:
+            entries[key] = random_entry(rng)
+            index.update(key, entries[key])
+
+        query = {
+            "process": rng.choice([None, "135", "141"]),
+            "thickness": rng.choice([None, rng.uniform(1, 80)]),
+            "diameter": rng.choice([None, rng.uniform(10, 800)]),
+            "position": rng.choice([None, *POSITIONS]),
+        }
+        assert sorted(index.query(**query)) == brute_force(entries, **query)
+    assert len(index) == len(entries)
+
+
+def test_query_limit_and_unknown_values():
+    index = CoverageIndex({n: CoverageEntry(process="135", thickness=(1.0, 10.0)) for n in range(10)})
+    assert len(index.query(process="135", limit=3)) == 3
+    assert index.query(process="999") == []
+    assert index.query(position="PF") == []
+    assert index.query(diameter=50) == []
+
+
+def test_coverage_entry_reads_evaluated_ranges():
+    pack = RulePackLoader(RULES_ROOT).load("iso_15614_1/rules.json")
+    payload = base_payload("PQR")
+    result = RuleEvaluator(pack).evaluate(payload)
+    entry = coverage_entry(result, payload)
+    assert entry.process == payload["inputs"]["process"]
+    assert entry.thickness == (6.0, 24.0)
+    assert entry.diameter is None
+
+    wpq = base_payload("WPQ")
+    wpq["inputs"]["position"] = "PF"
+    result = RuleEvaluator(RulePackLoader(RULES_ROOT).load("iso_9606_1/rules.json")).evaluate(wpq)
+    assert coverage_entry(result, wpq).positions == {"PA", "PC", "PF"}
@@ -0,0 +1,110 @@
+import pytest
+
+from engine.compiler import compile_pack
+from engine.evaluator import RuleEvaluator
+from engine.expressions import compile_expression
+from engine.math.functions import FunctionRegistry, NUMBER
+from engine.schema import RuleSchemaError
+from test_rule_engine import base_payload, load_pack, minimal_pack
+
+
+def test_arithmetic_literals_and_paths():
+    payload = {"inputs": {"t": 12, "od": 60.3}, "computed": {"k": 0.5}}
+    assert compile_expression("inputs.t * 2 + -inputs.od / (1 + 1)").evaluate(payload) == pytest.approx(24 - 30.15)
+    assert compile_expression("7 % 4 - 1.5e1").evaluate(payload) == 3 - 15.0
+    assert compile_expression("inputs.missing").evaluate(payload) is None
+    assert compile_expression("true").evaluate(payload) is True
+    assert compile_expression("doc_type").evaluate({"doc_type": "WPS"}) == "WPS"
+    assert compile_expression("inputs.t * computed.k").fields == frozenset({"inputs.t", "computed.k"})
+
+
+def test_nested_calls_and_quoted_commas():
+    functions = {"JOIN": lambda *parts: "".join(map(str, parts)), "TWICE": lambda value: value * 2}
+    expression = compile_expression("JOIN('a, b', TWICE(inputs.t + 1), \"c\\\"d\")", functions)
+    assert expression.evaluate({"inputs": {"t": 2}}) == 'a, b6c"d'
+    assert expression.functions == frozenset({"JOIN", "TWICE"})
+
+
+def test_registry_functions_resolve_payload_arguments():
+    expression = compile_expression("RANGE_THICKNESS(inputs.thickness_tested_mm, context.product_form)")
+    assert expression.evaluate({"inputs": {"thickness_tested_mm": 10}, "context": {"product_form": "pipe"}}) == {
+        "min": 5.0, "max": 15.0, "unit": "mm"
+    }
+
+
+@pytest.mark.parametrize("source, message", [
+    ("RANGE_POSITION(inputs.a, inputs.b)", "RANGE_POSITION\\(\\) called with 2"),
+    ("RANGE_THICKNESS(inputs.a)", "RANGE_THICKNESS\\(\\) called with 1"),
+    ("NOPE(inputs.a)", "unknown function 'NOPE'"),
+    ("RANGE_POSITION(inputs.a", "expected '\\)'"),
+    ("inputs.a +", "unexpected end"),
+    ("inputs.a inputs.b", "unexpected 'inputs.b'"),
+    ("inputs.a $ 2", "unexpected character"),
+    ("", "empty expression"),
+    ("RANGE_POSITION(12)", "RANGE_POSITION\\(\\) argument 1 must be str"),
+    ("RANGE_DIAMETER('big')", "RANGE_DIAMETER\\(\\) argument 1 must be int/float"),
+    ("RANGE_THICKNESS(inputs.t, plate)", "unknown name 'plate' at 26"),
+    ("payload.inputs.t * 2", "unknown name 'payload.inputs.t'"),
+])
+def test_invalid_expressions_rejected(source, message):
+    with pytest.raises(RuleSchemaError, match=message):
+        compile_expression(source)
+
+
+def test_range_expressions_checked_when_the_pack_compiles():
+    bad = {"id": "r", "when": {}, "compute": {"output_field": "computed.x", "expression": "RANGE_DIAMETER()"}}
+    with pytest.raises(RuleSchemaError, match=r"ranges\[r\]"):
+        compile_pack(minimal_pack(ranges=[bad]))
+
+    pack = minimal_pack(ranges=[
+        {"id": "first", "when": {}, "compute": {"output_field": "computed.od", "expression": "inputs.od * 2"}},
+        {"id": "second", "when": {}, "compute": {"output_field": "computed.range", "expression": "RANGE_DIAMETER(computed.od - 10)"}},
+    ])
+    result = RuleEvaluator(pack).evaluate({"doc_type": "X", "inputs": {"od": 30}})
+    assert result["computed"] == {"od": 60, "range": {"min": 25.0, "max": 100.0, "unit": "mm"}}
+
+
+def test_declared_variable_types_checked_against_function_arguments():
+    expression = "RANGE_POSITION(inputs.position)"
+    ranges = [{"id": "r", "when": {}, "compute": {"output_field": "computed.p", "expression": expression}}]
+    variable = {"id": "position", "type": "number", "applies_to": ["X"], "classification": "essential"}
+    with pytest.raises(RuleSchemaError, match=r"ranges\[r\]: RANGE_POSITION\(\) argument 1 .* declared as number"):
+        compile_pack(minimal_pack(ranges=ranges, variables=[variable]))
+    compile_pack(minimal_pack(ranges=ranges, variables=[{**variable, "type": "select"}]))
+
+
+def test_registry_memoizes_pure_functions():
+    registry = FunctionRegistry()
+    calls = []
+
+    @registry.register("DOUBLE", (NUMBER,), cache_size=8)
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    @registry.register("COUNT", ((list,),), pure=False)
+    def count(values):
+        calls.append(values)
+        return len(values)
+
+    assert [registry["DOUBLE"](3), registry["DOUBLE"](3), registry["DOUBLE"](3.0)] == [6, 6, 6.0]
+    assert calls == [3, 3.0]
+    assert registry["COUNT"]([1, 2]) == registry["COUNT"]([1, 2]) == 2
+    assert len(calls) == 4
+    assert registry.spec("DOUBLE").arity == 1 and registry.spec("COUNT").pure is False
+
+    expression = compile_expression("DOUBLE(inputs.x)", registry)
+    assert expression.call == ("DOUBLE", (("field", "inputs.x"),))
+    assert compile_expression("DOUBLE(inputs.x) + 1", registry).call is None
+    assert compile_expression("DOUBLE(DOUBLE(2))", registry).call is None
+
+
+def test_memoized_range_results_are_not_shared_between_evaluations():
+    evaluator = RuleEvaluator(load_pack("iso_15614_1/rules.json"))
+    first = evaluator.evaluate(base_payload())
+    expected = dict(first["computed"]["thickness_approved_mm"])
+    first["computed"]["thickness_approved_mm"]["max"] = 999
+    first["approval_ranges"][0]["value"]["min"] = -1
+    second = evaluator.evaluate(base_payload())
+    assert second["computed"]["thickness_approved_mm"] == expected
+    assert second["approval_ranges"][0]["value"] == expected
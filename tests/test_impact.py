@@ -0,0 +1,86 @@
+import copy
+import json
+from pathlib import Path
+
+from engine.cli import main
+from engine.impact import diff_packs, pack_impacts
+from engine.loader import RulePackLoader
+
+from test_rule_engine import base_payload
+
+RULES_ROOT = Path(__file__).resolve().parent.parent / "rules"
+
+
+def load(relative_rule_path: str) -> dict:
+    return RulePackLoader(RULES_ROOT).load(relative_rule_path)
+
+
+def wpq(months: int) -> dict:
+    payload = base_payload("WPQ")
+    payload["inputs"]["months_since_last_continuity"] = months
+    return payload
+
+
+def test_identical_packs_have_no_impact():
+    pack = load("iso_9606_1/rules.json")
+    assert not diff_packs(pack, copy.deepcopy(pack))
+
+
+def test_changed_threshold_only_affects_payloads_on_either_side():
+    old = load("iso_9606_1/rules.json")
+    new = copy.deepcopy(old)
+    new["rules"][0]["when"]["all"][0]["value"] = 3
+    impact = diff_packs(old, new)
+
+    assert [(c.section, c.id, c.kind) for c in impact.changes] == [("rules", "iso9606_missing_continuity_event", "changed")]
+    assert "inputs.months_since_last_continuity" in impact.fields
+    assert impact.doc_types == {"WPQ"}
+    assert impact.may_affect(wpq(4))
+    assert not impact.may_affect(wpq(1))
+    assert not impact.may_affect(wpq(8))  # fires under both versions with the same finding
+    assert not impact.may_affect({**wpq(4), "doc_type": "PQR"})
+
+
+def test_changed_output_and_added_or_removed_entries():
+    old = load("iso_15614_1/rules.json")
+    new = copy.deepcopy(old)
+    new["tests"][0]["require"] = ["VT"]
+    new["tests"].pop(1)
+    new["rules"].append({"id": "new_rule", "when": {"all": [{"field": "inputs.joint_type", "op": "eq", "value": "FW"}]}, "then": {}})
+    impact = diff_packs(old, new)
+
+    assert {(c.id, c.kind) for c in impact.changes} == {
+        ("tests_for_process_135", "changed"), ("tests_for_pipe_profile", "removed"), ("new_rule", "added")
+    }
+    payload = base_payload("PQR")
+    assert payload["inputs"]["process"] == "135" and impact.may_affect(payload)
+    other = {**payload, "inputs": {**payload["inputs"], "process": "141"}}
+    assert not impact.may_affect(other)
+    assert impact.may_affect({**other, "inputs": {**other["inputs"], "joint_type": "FW"}})
+
+
+def test_reordered_entries_affect_payloads_where_they_fire():
+    old = load("iso_15614_1/rules.json")
+    new = copy.deepcopy(old)
+    new["tests"].reverse()
+    impact = diff_packs(old, new)
+
+    assert {c.kind for c in impact.changes} == {"moved"}
+    payload = base_payload("PQR")
+    assert impact.may_affect(payload)
+    assert not impact.may_affect({**payload, "inputs": {**payload["inputs"], "process": "141"}})
+
+
+def test_included_pack_edit_propagates_to_including_packs(rules_copy, capsys):
+    old_root = rules_copy
+    path = old_root / "iso_15614_1" / "rules.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["tests"][0]["require"] = ["VT"]
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    impacts = pack_impacts(old_root, RULES_ROOT)
+    assert {pack for pack, impact in impacts.items() if impact} == {"iso_15614_1/rules.json", "ped_2014_68_eu/rules.json"}
+
+    assert main(["--rules-root", str(RULES_ROOT), "impact", "--old-rules-root", str(old_root)]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["ped_2014_68_eu/rules.json"]["changes"][0]["id"] == "tests_for_process_135"
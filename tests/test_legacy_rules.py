@@ -0,0 +1,79 @@
+import json
+import shutil
+
+import pytest
+
+from backend.engine import evaluator
+from backend.engine.evaluator import LEGACY_RULESETS, evaluate_rules
+from backend.engine.loader import RULES_BASE_PATH, LegacyRulesetCache, translate_rule
+from engine.schema import RuleSchemaError
+
+
+def test_legacy_rules_keep_their_result_shape():
+    result = evaluate_rules(
+        "iso_15614",
+        {"process": "135", "base_material_group": "FM1"},
+        {"process": "141", "base_material_group": "FM2"},
+    )
+    assert result["status"] == "INVALID"
+    assert [e["rule_id"] for e in result["errors"]] == ["material_group_change"]
+    assert result["errors"][0]["severity"] == "error"
+    assert result["errors"][0]["variable"] == "base_material_group"
+    assert [w["rule_id"] for w in result["warnings"]] == ["process_135_needs_rt"]
+    assert [e["rule_id"] for e in result["explanations"]] == ["material_group_change", "process_135_needs_rt"]
+    assert set(result["explanations"][0]) == {"rule_id", "message", "reference"}
+
+
+def test_legacy_change_trigger_compares_against_previous():
+    current = {"process": "141", "base_material_group": "FM1"}
+    assert evaluate_rules("iso_15614", current, dict(current)) == {
+        "status": "VALID", "errors": [], "warnings": [], "explanations": []
+    }
+    # As before, a missing previous value counts as a change.
+    assert evaluate_rules("iso_15614", current)["status"] == "INVALID"
+
+
+def test_legacy_variables_are_flat_keys_even_with_dots(tmp_path, monkeypatch):
+    (tmp_path / "dotted").mkdir()
+    ruleset = {"rules": [
+        {
+            "id": "group_change",
+            "trigger": {"variable": "base.material~group", "change": True},
+            "effect": {"require_new_test": True},
+        },
+        {"id": "process_135", "trigger": {"variable": "process", "equals": "135"}, "effect": {}},
+    ]}
+    (tmp_path / "dotted" / "rules.json").write_text(json.dumps(ruleset), encoding="utf-8")
+    monkeypatch.setattr(evaluator, "LEGACY_RULESETS", LegacyRulesetCache(tmp_path))
+
+    previous = {"base.material~group": "FM1", "process": "135"}
+    result = evaluate_rules("dotted", {**previous, "base.material~group": "FM2"}, previous)
+    assert [(e["rule_id"], e["variable"]) for e in result["errors"]] == [("group_change", "base.material~group")]
+    assert [(w["rule_id"], w["variable"]) for w in result["warnings"]] == [("process_135", "process")]
+    # A nested object is not the flat legacy key the dotted name stands for.
+    nested = {"base": {"material~group": "FM2"}, "process": "141"}
+    assert evaluate_rules("dotted", {**previous, **nested}, {**previous, "process": "141"})["status"] == "VALID"
+
+
+def test_legacy_ruleset_is_compiled_once():
+    assert LEGACY_RULESETS.compiled("iso_15614") is LEGACY_RULESETS.compiled("iso_15614")
+
+
+def test_legacy_cache_reloads_changed_file(tmp_path):
+    shutil.copytree(RULES_BASE_PATH / "iso_15614", tmp_path / "iso_15614")
+    cache = LegacyRulesetCache(tmp_path)
+    first = cache.compiled("iso_15614")
+
+    path = tmp_path / "iso_15614" / "rules.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["rules"].append({"id": "extra", "trigger": {"variable": "position", "equals": "PF"}, "effect": {}})
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    reloaded = cache.compiled("iso_15614")
+    assert reloaded is not first
+    assert [rule["id"] for rule in reloaded.pack["rules"]][-1] == "extra"
+
+
+def test_legacy_rule_without_variable_is_rejected():
+    with pytest.raises(RuleSchemaError):
+        translate_rule({"id": "broken", "trigger": {"change": True}})
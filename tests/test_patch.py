@@ -0,0 +1,67 @@
+import copy
+import json
+import random
+
+import pytest
+
+from engine.patch import apply_patch, diff
+
+from test_rule_engine import base_payload
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    roll = rng.random()
+    if depth < 3 and roll < 0.3:
+        return {rng.choice(["a", "b", "a/b", "~c"]): random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+    if depth < 3 and roll < 0.45:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return rng.choice([0, 1, 1.0, True, False, None, "x", "y"])
+
+
+def canonical(value) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+def test_small_revision_gives_small_patch():
+    old = base_payload("WPS")
+    new = copy.deepcopy(old)
+    new["inputs"]["thickness_tested_mm"] = 14.0
+    del new["inputs"]["process"]
+    new["context"]["shop"] = "A/1"
+
+    patch = diff(old, new)
+    assert patch == [
+        {"op": "add", "path": "/context/shop", "value": "A/1"},
+        {"op": "remove", "path": "/inputs/process"},
+        {"op": "replace", "path": "/inputs/thickness_tested_mm", "value": 14.0},
+    ]
+    assert apply_patch(old, patch) == new
+    assert diff(old, copy.deepcopy(old)) == []
+
+
+def test_round_trip_never_mutates_inputs():
+    rng = random.Random(11)
+    for _ in range(5000):
+        old, new = random_value(rng), random_value(rng)
+        before = canonical(old)
+        assert canonical(apply_patch(old, diff(old, new))) == canonical(new)
+        assert canonical(old) == before
+
+
+def test_patched_payload_shares_untouched_parts():
+    old = {"inputs": {"a": 1}, "context": {"big": list(range(100))}}
+    new = apply_patch(old, [{"op": "replace", "path": "/inputs/a", "value": 2}])
+    assert new["inputs"] == {"a": 2} and old["inputs"] == {"a": 1}
+    assert new["context"] is old["context"]
+
+
+def test_invalid_patches_raise():
+    with pytest.raises(ValueError):
+        apply_patch({"a": 1}, [{"op": "remove", "path": "/b"}])
+    with pytest.raises(ValueError):
+        apply_patch({"a": [1]}, [{"op": "replace", "path": "/a/3", "value": 0}])
+    with pytest.raises(ValueError):
+        apply_patch({"a": 1}, [{"op": "move", "path": "/a"}])
+    for document, path in (({"a": 1}, "/a/b"), ({"a": "text"}, "/a/0"), ({"a": [None]}, "/a/0/b"), (5, "/a")):
+        with pytest.raises(ValueError, match="Path not found"):
+            apply_patch(document, [{"op": "add", "path": path, "value": 0}])
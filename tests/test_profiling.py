@@ -0,0 +1,39 @@
+from engine.compiler import compile_pack
+from engine.evaluator import RuleEvaluator
+from engine.profiling import EvaluationProfiler
+from test_rule_engine import base_payload, load_pack, minimal_pack
+
+
+def test_profiled_evaluation_matches_plain_evaluation():
+    pack = load_pack("iso_15614_1/rules.json")
+    previous = base_payload()
+    previous["inputs"]["process"] = "141"
+    expected = RuleEvaluator(pack, debug=True).evaluate(base_payload(), previous_payload=previous)
+    profiler = EvaluationProfiler()
+    assert RuleEvaluator(pack, debug=True, profiler=profiler).evaluate(base_payload(), previous_payload=previous) == expected
+    metrics = profiler.render_prometheus()
+    assert 'rule_engine_evaluations_total{pack="ISO_15614:20XX"} 1' in metrics
+    assert 'rule_engine_section_seconds_total{' in metrics and 'section="ranges"' in metrics
+    assert "rule_engine_function_calls_total{function=" in metrics
+
+
+def test_profiler_counts_fired_entries_and_short_circuited_predicates():
+    pack = minimal_pack(rules=[
+        {"id": "both", "when": {"all": [{"field": "inputs.a", "op": "eq", "value": 1}, {"field": "inputs.b", "op": "eq", "value": 2}]}, "then": {"invalidate": True}},
+    ])
+    profiler = EvaluationProfiler()
+    plan = compile_pack(pack)
+    evaluator = RuleEvaluator(plan, profiler=profiler)
+    evaluator.evaluate({"doc_type": "X", "inputs": {"a": 0}})
+    evaluator.evaluate({"doc_type": "X", "inputs": {"a": 1, "b": 2}})
+    key = next(key for key in profiler.entries if key[2] == "both")
+    evaluations, fired, _, evaluated, available = profiler.entries[key]
+    assert (evaluations, fired, evaluated, available) == (2, 1, 3, 4)
+    assert 'rule_engine_predicates_short_circuited_total{pack=' in profiler.render_prometheus()
+    assert RuleEvaluator(plan, profiler=profiler).plan is evaluator.plan
+
+
+def test_prometheus_labels_are_escaped():
+    profiler = EvaluationProfiler()
+    profiler.record_function('we"ird\\name', 0.5)
+    assert 'rule_engine_function_calls_total{function="we\\"ird\\\\name"} 1' in profiler.render_prometheus()
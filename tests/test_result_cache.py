@@ -0,0 +1,64 @@
+from engine.evaluator import RuleEvaluator
+from engine.memo import EvaluationCache, InProcessResultBackend
+from test_rule_engine import base_payload, load_pack
+
+
+def test_unreferenced_fields_do_not_bust_the_cache():
+    cache = EvaluationCache()
+    evaluator = RuleEvaluator(load_pack("iso_15614_1/rules.json"), result_cache=cache)
+    first = evaluator.evaluate(base_payload())
+    payload = base_payload()
+    payload["history"]["previous_versions"] = [{"version": 1}]
+    payload["inputs"]["notes"] = "free text"
+    assert evaluator.evaluate(payload) == first
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+    payload["inputs"]["thickness_tested_mm"] = 20
+    assert evaluator.evaluate(payload)["computed"]["thickness_approved_mm"]["max"] == 40.0
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_previous_values_only_matter_for_changed_predicates():
+    cache = EvaluationCache()
+    evaluator = RuleEvaluator(load_pack("iso_15614_1/rules.json"), result_cache=cache)
+    previous = base_payload()
+    previous["inputs"]["process"] = "141"
+    assert evaluator.evaluate(base_payload(), previous_payload=previous)["status"] == "INVALID"
+    previous["inputs"]["thickness_tested_mm"] = 99
+    assert evaluator.evaluate(base_payload(), previous_payload=previous)["status"] == "INVALID"
+    assert cache.stats()["hits"] == 1
+    assert evaluator.evaluate(base_payload(), previous_payload=base_payload())["status"] == "VALID"
+
+
+def test_cached_results_are_isolated_from_callers():
+    evaluator = RuleEvaluator(load_pack("iso_15614_1/rules.json"), result_cache=EvaluationCache())
+    first = evaluator.evaluate(base_payload())
+    expected = [dict(f) for f in first["findings"]]
+    first["findings"].append({"rule_id": "mutated"})
+    assert evaluator.evaluate(base_payload())["findings"] == expected
+
+
+def test_results_built_from_previous_result_are_not_cached():
+    cache = EvaluationCache()
+    evaluator = RuleEvaluator(load_pack("iso_15614_1/rules.json"), result_cache=cache)
+    previous = base_payload()
+    forged = {"status": "VALID", "findings": [], "required_tests": [], "approval_ranges": [], "computed": {}}
+    payload = base_payload()
+    payload["history"]["previous_versions"] = [1]
+    evaluator.evaluate(payload, previous_payload=previous, previous_result=forged)
+
+    honest = evaluator.evaluate(payload, previous_payload=previous)
+    assert "tests_for_process_135" in {t["id"] for t in honest["required_tests"]}
+    assert honest == RuleEvaluator(load_pack("iso_15614_1/rules.json")).evaluate(payload, previous_payload=previous)
+
+
+def test_in_process_backend_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("engine.memo.time.monotonic", lambda: now[0])
+    backend = InProcessResultBackend(maxsize=2, ttl=10)
+    backend.set("a", {"v": 1})
+    backend.set("b", {"v": 2})
+    backend.set("c", {"v": 3})
+    assert backend.get("a") is None and backend.get("b") == {"v": 2}
+    now[0] = 111.0
+    assert backend.get("b") is None
@@ -1,9 +1,11 @@
+import json
 from pathlib import Path
 
 import pytest
 
 from engine.evaluator import RuleEvaluator
-from engine.loader import RulePackLoader
+from engine.loader import RuleIncludeCycleError, RulePackLoader
+from engine import schema
 from engine.schema import RuleSchemaError, validate_rule_pack
 
 RULES_ROOT = Path(__file__).resolve().parent.parent / "rules"
@@ -132,3 +134,211 @@ def test_operator_matrix_smoke():
     payload = base_payload()
     result = RuleEvaluator(pack).evaluate(payload)
     assert len(result["findings"]) == 3
+
+
+def minimal_pack(**sections):
+    pack = {
+        "standard": "TEST", "part": "1", "version": "1", "scope": "test", "metadata": {"source": "x", "compiled_by": "x", "compiled_at": "x", "coverage_notes": "x", "copyright_notice": "x"},
+        "definitions": {}, "variables": [], "rules": [], "ranges": [], "tests": [], "validations": [],
+    }
+    pack.update(sections)
+    return pack
+
+
+def test_unknown_operator_rejected_at_compile_time():
+    pack = minimal_pack(rules=[{"id": "bad", "applies_to": ["WPS"], "when": {"all": [{"field": "inputs.process", "op": "startswith", "value": "1"}]}, "then": {}}])
+    with pytest.raises(RuleSchemaError, match="startswith"):
+        RuleEvaluator(pack)
+
+
+def test_compiled_membership_handles_unhashable_values():
+    pack = minimal_pack(rules=[{"id": "in_list", "when": {"all": [{"field": "inputs.layers", "op": "in", "value": [[1, 2], "135"]}]}, "then": {"add_finding": {"severity": "INFO", "message": "in"}}}])
+    payload = base_payload()
+    payload["inputs"]["layers"] = [1, 2]
+    result = RuleEvaluator(pack).evaluate(payload)
+    assert [f["rule_id"] for f in result["findings"]] == ["in_list"]
+
+
+def test_evaluate_many_matches_single_evaluations_in_order():
+    evaluator = RuleEvaluator(load_pack("iso_9606_1/rules.json"))
+    payloads = [base_payload(doc_type="WPQ") for _ in range(3)]
+    payloads[1]["inputs"]["months_since_last_continuity"] = 9
+    previous = [None, base_payload(doc_type="WPQ"), None]
+    results = list(evaluator.evaluate_many(payloads, previous_payloads=previous))
+    assert [r["status"] for r in results] == ["VALID", "INVALID", "VALID"]
+    assert results == [evaluator.evaluate(p, previous_payload=q) for p, q in zip(payloads, previous)]
+
+
+def test_evaluate_many_rejects_misaligned_previous_payloads():
+    evaluator = RuleEvaluator(load_pack("iso_9606_1/rules.json"))
+    with pytest.raises(ValueError):
+        list(evaluator.evaluate_many([base_payload("WPQ"), base_payload("WPQ")], previous_payloads=[None]))
+
+
+def test_incremental_evaluation_matches_full_evaluation():
+    evaluator = RuleEvaluator(load_pack("ped_2014_68_eu/rules.json"), debug=True)
+    edits = [
+        ("inputs", "process", "141"),
+        ("inputs", "thickness_tested_mm", 30),
+        ("inputs", "months_since_last_continuity", 9),
+        ("inputs", "wps_valid", False),
+        ("context", "product_form", "pipe"),
+        ("history", "previous_versions", [1]),
+    ]
+    for doc_type in ("PQR", "WPS", "WPQ", "pressure_dossier"):
+        previous = base_payload(doc_type)
+        previous_result = evaluator.evaluate(previous)
+        for section, key, value in edits:
+            payload = base_payload(doc_type)
+            payload[section][key] = value
+            full = evaluator.evaluate(payload, previous_payload=previous)
+            assert evaluator.evaluate(payload, previous_payload=previous, previous_result=previous_result) == full
+            previous, previous_result = payload, full
+
+
+def test_incremental_evaluation_reuses_entries_with_unchanged_fields():
+    evaluator = RuleEvaluator(load_pack("iso_15614_1/rules.json"))
+    previous = base_payload()
+    previous_result = evaluator.evaluate(previous)
+    previous_result["required_tests"].append({"id": "tests_for_pipe_profile", "tests": ["VT", "macro"]})
+    payload = base_payload()
+    payload["history"]["previous_versions"] = [1]
+    result = evaluator.evaluate(payload, previous_payload=previous, previous_result=previous_result)
+    assert "tests_for_pipe_profile" in {t["id"] for t in result["required_tests"]}
+
+
+def test_malformed_previous_result_falls_back_to_full_evaluation():
+    evaluator = RuleEvaluator(load_pack("iso_15614_1/rules.json"))
+    previous = base_payload()
+    payload = base_payload()
+    payload["history"]["previous_versions"] = [1]
+    full = evaluator.evaluate(payload, previous_payload=previous)
+    for malformed in ({"findings": 1}, {"approval_ranges": [{"id": "x"}]}, {"required_tests": ["x"]}, []):
+        assert evaluator.evaluate(payload, previous_payload=previous, previous_result=malformed) == full
+
+
+def test_applies_to_filters_tests_and_ranges():
+    pack = minimal_pack(
+        tests=[{"id": "wps_only_test", "applies_to": ["WPS"], "when": {}, "require": ["VT"]}],
+        ranges=[{"id": "pqr_only_range", "applies_to": ["PQR"], "when": {}, "compute": {"output_field": "computed.positions", "expression": "RANGE_POSITION(inputs.position)"}}],
+    )
+    evaluator = RuleEvaluator(pack)
+    pqr = evaluator.evaluate(base_payload("PQR"))
+    wps = evaluator.evaluate(base_payload("WPS"))
+    assert [r["id"] for r in pqr["approval_ranges"]] == ["pqr_only_range"] and pqr["required_tests"] == []
+    assert [t["id"] for t in wps["required_tests"]] == ["wps_only_test"] and wps["approval_ranges"] == []
+
+
+def test_doc_type_index_only_holds_applicable_entries():
+    plan = RuleEvaluator(load_pack("ped_2014_68_eu/rules.json")).plan
+    wpq = plan.for_doc_type("WPQ")
+    assert {r.id for r in wpq.rules} == {"iso9606_missing_continuity_event"}
+    assert "range_thickness_approval" not in {r.id for r in wpq.ranges}
+    assert plan.for_doc_type("unknown") is plan.default_plan
+    assert all(e.applies_to is None for section in ("validations", "rules", "tests", "ranges") for e in getattr(plan.default_plan, section))
+
+
+def count_validations(monkeypatch):
+    calls = []
+    original = validate_rule_pack
+
+    def counting(rule_pack, memoize=True):
+        calls.append(rule_pack.get("standard"))
+        return original(rule_pack, memoize=memoize)
+
+    monkeypatch.setattr("engine.loader.validate_rule_pack", counting)
+    return calls
+
+
+def test_loader_can_validate_only_the_final_aggregate(monkeypatch):
+    calls = count_validations(monkeypatch)
+    RulePackLoader(RULES_ROOT).load("ped_2014_68_eu/rules.json")
+    assert len(calls) == 3
+    calls.clear()
+    RulePackLoader(RULES_ROOT, validate_includes=False).load("ped_2014_68_eu/rules.json")
+    assert calls == ["PED_2014_68_EU"]
+
+
+def test_validation_is_memoized_by_content_hash(monkeypatch):
+    pytest.importorskip("jsonschema")
+    pack = minimal_pack(standard="MEMO_TEST")
+    validate_rule_pack(pack)
+    with pytest.raises(RuleSchemaError):
+        validate_rule_pack({**pack, "rules": "not-a-list"})
+    monkeypatch.setattr(schema, "get_validator", lambda: pytest.fail("validated twice"))
+    validate_rule_pack(dict(pack))
+
+
+def write_pack(root, relative, **fields):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(minimal_pack(**fields)), encoding="utf-8")
+
+
+def test_include_cycle_is_reported(tmp_path):
+    write_pack(tmp_path, "a/rules.json", includes=["b/rules.json"])
+    write_pack(tmp_path, "b/rules.json", includes=["a/rules.json"])
+    with pytest.raises(RuleIncludeCycleError, match="a/rules.json -> b/rules.json -> a/rules.json"):
+        RulePackLoader(tmp_path).load("a/rules.json")
+
+
+def test_shared_include_is_read_once_and_left_untouched(tmp_path, monkeypatch):
+    write_pack(tmp_path, "common/rules.json", rules=[{"id": "shared", "when": {}, "then": {}}])
+    write_pack(tmp_path, "b/rules.json", includes=["common/rules.json"])
+    write_pack(tmp_path, "c/rules.json", includes=["common/rules.json"])
+    write_pack(tmp_path, "top/rules.json", includes=["b/rules.json", "c/rules.json"], rules=[{"id": "top", "when": {}, "then": {}}])
+    reads = []
+    loader = RulePackLoader(tmp_path)
+    original = loader._read_json
+    monkeypatch.setattr(loader, "_read_json", lambda path: reads.append(path.parent.name) or original(path))
+    pack = loader.load("top/rules.json")
+    assert sorted(reads) == ["b", "c", "common", "top"]
+    assert [r["id"] for r in pack["rules"]] == ["shared", "shared", "top"]
+    assert [r["id"] for r in RulePackLoader(tmp_path).load("b/rules.json")["rules"]] == ["shared"]
+
+
+def derived_range_pack():
+    return minimal_pack(
+        ranges=[
+            {"id": "covers", "when": {"all": [{"field": "computed.thickness.max", "op": "exists", "value": True}]}, "compute": {"output_field": "computed.margin", "expression": "computed.thickness_max - inputs.production_mm"}},
+            {"id": "thickness", "when": {"all": [{"field": "inputs.thickness_tested_mm", "op": "exists", "value": True}]}, "compute": {"output_field": "computed.thickness", "expression": "RANGE_THICKNESS(inputs.thickness_tested_mm, context.product_form)"}},
+            {"id": "thickness_max", "when": {"all": [{"field": "inputs.thickness_tested_mm", "op": "exists", "value": True}]}, "compute": {"output_field": "computed.thickness_max", "expression": "inputs.thickness_tested_mm * 2"}},
+        ],
+        rules=[{"id": "production_outside_range", "when": {"all": [{"field": "computed.margin", "op": "lt", "value": 0}]}, "then": {"add_finding": {"severity": "ERROR", "message": "out of range"}}}],
+    )
+
+
+def test_ranges_run_in_dependency_order_before_rules():
+    evaluator = RuleEvaluator(derived_range_pack())
+    assert [entry.id for entry in evaluator.plan.ranges] == ["thickness", "thickness_max", "covers"]
+    payload = base_payload()
+    payload["inputs"]["production_mm"] = 30
+    result = evaluator.evaluate(payload)
+    assert [r["id"] for r in result["approval_ranges"]] == ["thickness", "thickness_max", "covers"]
+    assert result["computed"]["margin"] == -6
+    assert result["status"] == "INVALID"
+    payload["inputs"]["production_mm"] = 20
+    assert evaluator.evaluate(payload)["status"] == "VALID"
+
+
+def test_range_dependency_cycles_rejected_at_compile_time():
+    pack = minimal_pack(ranges=[
+        {"id": "a", "when": {}, "compute": {"output_field": "computed.a", "expression": "computed.c + 1"}},
+        {"id": "b", "when": {}, "compute": {"output_field": "computed.b", "expression": "computed.a + 1"}},
+        {"id": "c", "when": {"all": [{"field": "computed.b", "op": "exists", "value": True}]}, "compute": {"output_field": "computed.c", "expression": "1"}},
+    ])
+    with pytest.raises(RuleSchemaError, match="Range dependency cycle: a -> b -> c -> a"):
+        RuleEvaluator(pack)
+
+
+def test_incremental_evaluation_recomputes_rules_reading_computed_values():
+    evaluator = RuleEvaluator(derived_range_pack())
+    previous = base_payload()
+    previous["inputs"]["production_mm"] = 20
+    previous_result = evaluator.evaluate(previous)
+    payload = base_payload()
+    payload["inputs"]["production_mm"] = 20
+    payload["inputs"]["thickness_tested_mm"] = 5
+    full = evaluator.evaluate(payload)
+    assert full["status"] == "INVALID"
+    assert evaluator.evaluate(payload, previous_payload=previous, previous_result=previous_result) == full
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from engine.cache import RulePackCache
+from engine.loader import discover_rule_packs
+from engine.schema import RuleSchemaError
+
+
+def bump_mtime(path: Path) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_cache_returns_same_pack_until_source_changes(rules_copy):
+    root = rules_copy
+    cache = RulePackCache(root)
+    first = cache.load("ped_2014_68_eu/rules.json")
+    assert cache.load("ped_2014_68_eu/rules.json") is first
+
+    bump_mtime(root / "iso_9606_1" / "rules.json")
+    assert cache.load("ped_2014_68_eu/rules.json") is first
+
+    included = root / "iso_9606_1" / "rules.json"
+    data = json.loads(included.read_text(encoding="utf-8"))
+    data["tests"].append({"id": "extra_test", "when": {}, "require": ["MT"]})
+    included.write_text(json.dumps(data), encoding="utf-8")
+    bump_mtime(included)
+
+    reloaded = cache.load("ped_2014_68_eu/rules.json")
+    assert reloaded is not first
+    assert any(t["id"] == "extra_test" for t in reloaded["tests"])
+
+
+def test_cache_evicts_least_recently_used(rules_copy):
+    cache = RulePackCache(rules_copy, maxsize=2)
+    cache.load("iso_15614_1/rules.json")
+    cache.load("iso_9606_1/rules.json")
+    cache.load("iso_15614_1/rules.json")
+    cache.load("iso_3834/rules.json")
+    assert len(cache) == 2
+    assert "iso_9606_1/rules.json" not in cache._entries
+
+
+def test_preload_compiles_every_pack_and_names_the_broken_one(rules_copy):
+    root = rules_copy
+    cache = RulePackCache(root, maxsize=1)
+    stats = cache.preload()
+    assert [stat.path for stat in stats] == discover_rule_packs(root)
+    assert len(cache) == len(stats) and all(stat.seconds >= 0 for stat in stats)
+
+    (root / "iso_3834" / "rules.json").write_text("{", encoding="utf-8")
+    with pytest.raises(RuleSchemaError, match="iso_3834/rules.json"):
+        RulePackCache(root).preload()
+
+
+def test_concurrent_loads_build_each_pack_once(rules_copy, monkeypatch):
+    cache = RulePackCache(rules_copy)
+    build, builds = RulePackCache._build, []
+    start = threading.Barrier(8)
+
+    def slow_build(self, relative_rule_path):
+        builds.append(relative_rule_path)
+        time.sleep(0.05)  # keep the other threads waiting on the same pack
+        return build(self, relative_rule_path)
+
+    def load(index):
+        start.wait()
+        return cache.load("iso_9606_1/rules.json" if index % 2 else "ped_2014_68_eu/rules.json")
+
+    monkeypatch.setattr(RulePackCache, "_build", slow_build)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        packs = list(pool.map(load, range(8)))
+    assert sorted(builds) == ["iso_9606_1/rules.json", "ped_2014_68_eu/rules.json"]
+    assert all(pack is packs[index % 2] for index, pack in enumerate(packs))